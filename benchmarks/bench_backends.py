@@ -0,0 +1,108 @@
+"""
+Benchmark pandas vs Arrow para transform + validate.
+
+Genera transacciones y clientes sintéticos, corre las mismas reglas con
+ambos motores (mejor de N repeticiones), verifica que las salidas sean
+equivalentes y reporta el speed-up.
+
+Uso:
+    python benchmarks/bench_backends.py --n-tx 5000000 --repeat 3
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from benchmarks.run_benchmarks import RESULTS_DIR, TX_PER_CLIENTE  # noqa: E402
+
+
+def _best_of(repeat: int, func):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _assert_equivalent(df_pandas, table_arrow, entity: str):
+    import pandas as pd
+
+    left = df_pandas.reset_index(drop=True)
+    right = table_arrow.to_pandas()
+    if left.shape != right.shape:
+        raise AssertionError(f"{entity}: forma distinta pandas={left.shape} arrow={right.shape}")
+    for column in left.columns:
+        a, b = left[column], right[column]
+        if a.dtype.kind == "M" or b.dtype.kind == "M":
+            a, b = pd.to_datetime(a), pd.to_datetime(b)
+        same = (a == b) | (a.isna() & b.isna())
+        if not same.all():
+            raise AssertionError(f"{entity}: la columna '{column}' difiere en {(~same).sum()} filas")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de motores pandas vs Arrow")
+    parser.add_argument("--n-tx", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from src.utils.mock_data_generator import generate_chunked
+    from src.transform.transformer import DataTransformer
+    from src.quality.validator import DataValidator
+
+    workdir = tempfile.mkdtemp(prefix="etl_bench_backends_")
+    try:
+        n_clientes = max(args.n_tx // TX_PER_CLIENTE, 10)
+        generate_chunked(output_dir=workdir, n_clientes=n_clientes, n_tx=args.n_tx, fmt="parquet", seed=args.seed)
+        tx_table = pq.read_table(os.path.join(workdir, "transacciones_raw.parquet"))
+        # Ambos motores reciben las fechas como texto, igual que desde el JSON crudo
+        idx = tx_table.column_names.index("fecha_transaccion")
+        tx_table = tx_table.set_column(idx, "fecha_transaccion",
+                                       pc.strftime(tx_table["fecha_transaccion"], "%Y-%m-%d %H:%M:%S"))
+        tx_frame = tx_table.to_pandas()
+
+        report = {"n_tx": args.n_tx, "repeat": args.repeat, "stages": {}}
+        outputs = {}
+        for backend, data in (("pandas", tx_frame), ("arrow", tx_table)):
+            transformer, validator = DataTransformer(backend), DataValidator(backend)
+            t_clean, clean = _best_of(args.repeat, lambda: transformer.clean_transacciones(data))
+            t_valid, valid = _best_of(args.repeat, lambda: validator.validate_transacciones(clean))
+            outputs[backend] = valid
+            report["stages"][backend] = {
+                "transform_s": round(t_clean, 4),
+                "validate_s": round(t_valid, 4),
+                "rows_per_s": round(args.n_tx / (t_clean + t_valid), 2),
+            }
+
+        _assert_equivalent(outputs["pandas"], outputs["arrow"], "transacciones")
+        speedup = report["stages"]["arrow"]["rows_per_s"] / report["stages"]["pandas"]["rows_per_s"]
+        report["speedup"] = round(speedup, 2)
+        report["equivalent"] = True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n📊 pandas: {report['stages']['pandas']} \n📊 arrow:  {report['stages']['arrow']}")
+    print(f"🚀 Speed-up Arrow vs pandas: x{report['speedup']} (salidas equivalentes)")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"backends_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Resultados -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
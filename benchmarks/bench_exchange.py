@@ -0,0 +1,122 @@
+"""
+Benchmark del traspaso entre etapas por Arrow IPC memory-mapped.
+
+Escribe una tabla del tamaño pedido como archivo IPC y la abre desde un
+proceso nuevo (como lo haría la etapa siguiente o un worker), midiendo
+tiempo y RSS adicional de la apertura. Como referencia mide lo mismo con
+una lectura de Parquet, que deserializa y copia todos los datos.
+
+Uso:
+    python benchmarks/bench_exchange.py --gb 10 --work-dir /data/tmp
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from benchmarks.run_benchmarks import RESULTS_DIR  # noqa: E402
+
+# Filas del bloque base que se repite hasta alcanzar el tamaño pedido
+CHUNK_ROWS = 1_000_000
+
+
+def _rss_mb() -> float:
+    """RSS actual del proceso (Linux); None donde /proc no existe."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2, 1)
+    except (OSError, ValueError):
+        return None
+
+
+def _consume(path: str, fmt: str) -> dict:
+    """Proceso consumidor: abre el archivo y reporta costo del traspaso."""
+    import pyarrow.parquet as pq
+    from src.utils.exchange import open_ipc
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    table = open_ipc(path) if fmt == "ipc" else pq.read_table(path)
+    elapsed = time.perf_counter() - start
+    rss_after = _rss_mb()
+    return {
+        "open_s": round(elapsed, 4),
+        "rss_extra_mb": None if rss_before is None else round(rss_after - rss_before, 1),
+        "rows": table.num_rows,
+    }
+
+
+def _chunk(seed: int):
+    import numpy as np
+    import pyarrow as pa
+
+    rng = np.random.default_rng(seed)
+    return pa.table({
+        "transaccion_id": pa.array(np.arange(CHUNK_ROWS, dtype=np.int64)),
+        "cliente_id": pa.array(rng.integers(1, 100_000, CHUNK_ROWS)).cast(pa.string()),
+        "monto": pa.array(rng.uniform(1, 5000, CHUNK_ROWS).round(2)),
+        "fecha_transaccion": pa.array(rng.integers(1.6e9, 1.7e9, CHUNK_ROWS).astype("datetime64[s]")),
+    })
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del traspaso Arrow IPC entre etapas")
+    parser.add_argument("--gb", type=float, default=1.0, help="Tamaño aproximado de la tabla")
+    parser.add_argument("--work-dir", default=None, help="Directorio para los archivos (por defecto temporal)")
+    parser.add_argument("--skip-parquet", action="store_true", help="No medir la referencia Parquet")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from src.utils.exchange import write_ipc
+
+    workdir = tempfile.mkdtemp(prefix="etl_bench_exchange_", dir=args.work_dir)
+    try:
+        chunk = _chunk(args.seed)
+        copies = max(int(args.gb * 1024 ** 3 / chunk.nbytes), 1)
+        # Las copias comparten buffers: el productor no necesita la tabla entera en memoria
+        table = pa.concat_tables([chunk] * copies)
+        print(f"📦 {table.num_rows} filas (~{table.nbytes / 1024 ** 3:.2f} GB)")
+
+        report = {"rows": table.num_rows, "gb": round(table.nbytes / 1024 ** 3, 2), "formats": {}}
+        start = time.perf_counter()
+        ipc_path = write_ipc(table, os.path.join(workdir, "handoff.arrow"))
+        report["formats"]["ipc"] = {"write_s": round(time.perf_counter() - start, 4)}
+        if not args.skip_parquet:
+            start = time.perf_counter()
+            pq.write_table(table, os.path.join(workdir, "handoff.parquet"))
+            report["formats"]["parquet"] = {"write_s": round(time.perf_counter() - start, 4)}
+        del table
+
+        context = multiprocessing.get_context("spawn")
+        for fmt in report["formats"]:
+            path = ipc_path if fmt == "ipc" else os.path.join(workdir, "handoff.parquet")
+            # Un proceso nuevo por formato: el RSS de uno no contamina al otro
+            with context.Pool(1) as pool:
+                report["formats"][fmt].update(pool.apply(_consume, (path, fmt)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for fmt, stats in report["formats"].items():
+        print(f"📊 {fmt:8s} {stats}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"exchange_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Resultados -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
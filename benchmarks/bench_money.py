@@ -0,0 +1,105 @@
+"""
+Reconciliación de montos en punto fijo (centavos int64).
+
+Genera montos en bloques con un total conocido de antemano (en centavos),
+los pasa como texto crudo por la limpieza de ambos motores y por la
+codificación decimal de la carga, y verifica que los totales coincidan al
+centavo. Como referencia reporta la deriva de sumar los mismos montos en
+float64. Sale con código 1 si algún total no concilia.
+
+Uso:
+    python benchmarks/bench_money.py --n-tx 100000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from benchmarks.run_benchmarks import RESULTS_DIR  # noqa: E402
+
+CHUNK_ROWS = 1_000_000
+
+
+def _render(cents):
+    """Centavos -> texto '-123.45' (forma en que llegan los montos crudos)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    magnitude = pc.abs(cents)
+    units = pc.cast(pc.divide(magnitude, 100), pa.string())
+    fraction = pc.utf8_lpad(pc.cast(pc.subtract(magnitude, pc.multiply(pc.divide(magnitude, 100), 100)),
+                                    pa.string()), 2, "0")
+    sign = pc.if_else(pc.less(cents, 0), "-", "")
+    return pc.binary_join_element_wise(sign, units, ".", fraction, "")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reconciliación exacta de montos en centavos")
+    parser.add_argument("--n-tx", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-pandas", action="store_true", help="Solo motor Arrow (más rápido)")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from src.transform import arrow_backend, money
+
+    rng = np.random.default_rng(args.seed)
+    totals = {"esperado": 0, "arrow": 0, "decimal_carga": Decimal(0), "float64": 0.0}
+    if not args.skip_pandas:
+        totals["pandas"] = 0
+
+    start = time.perf_counter()
+    for offset in range(0, args.n_tx, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, args.n_tx - offset)
+        cents = pa.array(rng.integers(-500_000, 50_000_000, n, dtype=np.int64))
+        raw = _render(cents)
+        totals["esperado"] += pc.sum(cents).as_py()
+
+        parsed = arrow_backend.to_cents(raw)
+        totals["arrow"] += money.total_cents(parsed)
+        totals["decimal_carga"] += pc.sum(money.cents_to_decimal(parsed)).as_py()
+        totals["float64"] += pc.sum(arrow_backend.to_float(raw)).as_py()
+        if not args.skip_pandas:
+            series = money.cents_from_float(pd.to_numeric(raw.to_pandas(), errors="coerce"))
+            totals["pandas"] += money.total_cents(series)
+    elapsed = time.perf_counter() - start
+
+    expected = totals["esperado"]
+    checks = {
+        "arrow": totals["arrow"] == expected,
+        "decimal_carga": totals["decimal_carga"] == Decimal(expected) / money.CENTS_PER_UNIT,
+    }
+    if "pandas" in totals:
+        checks["pandas"] = totals["pandas"] == expected
+    report = {
+        "n_tx": args.n_tx,
+        "elapsed_s": round(elapsed, 2),
+        "total_esperado": str(Decimal(expected) / money.CENTS_PER_UNIT),
+        "concilia": checks,
+        "deriva_float64": float(Decimal(totals["float64"]) - Decimal(expected) / money.CENTS_PER_UNIT),
+    }
+
+    print(f"\n💰 Total esperado: {report['total_esperado']} ({args.n_tx} montos, {report['elapsed_s']}s)")
+    for name, ok in checks.items():
+        print(f"   {'✔' if ok else '❌'} {name}")
+    print(f"   ℹ️  Deriva de la suma en float64: {report['deriva_float64']}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"money_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Resultados -> {path}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Punto de entrada de línea de comandos del pipeline ETL financiero.
+
+    etl-financiero init-db
+    etl-financiero extract   --entity transacciones
+    etl-financiero transform --entity clientes,productos
+    etl-financiero load      --entity transacciones
+    etl-financiero run       [--tasks ...] [--workers N] [--resume]
+    etl-financiero status    [--json]
+    etl-financiero reprocess [--entity transacciones] [--desde 2024-01-01] [--hasta 2024-01-31]
+    etl-financiero bench     -- --scales 10k,100k
+
+Este módulo solo importa la librería estándar: pandas, pyarrow, SQLAlchemy y
+psycopg2 se importan dentro de cada subcomando que los necesita, de modo que
+'--help' y 'status' responden en pocos milisegundos.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "data", "checkpoints")
+METRICS_DIR = os.path.join(BASE_DIR, "logs", "metrics")
+
+# Duplicado de run_pipeline.ENTITIES para no importar el pipeline al parsear argumentos
+ENTITIES = ("clientes", "productos", "transacciones")
+
+# Duplicado de reprocess.REPROCESSABLE: productos no tiene cuarentena
+REPROCESSABLE = ("clientes", "transacciones")
+
+# Duplicado de run_pipeline.TASK_PREPARE
+PREPARE_TASK = "preparar_db"
+
+# Entidades que preparar_db vacía (TRUNCATE de productos, en cascada a
+# transacciones): 'load' las recarga juntas. Clientes (SCD2) se carga por
+# diferencias y repetir su carga no duplica filas.
+FULL_RELOAD_ENTITIES = ("productos", "transacciones")
+
+
+def _ensure_importable():
+    """Permite 'python src/cli.py' sin instalar el paquete."""
+    if BASE_DIR not in sys.path:
+        sys.path.append(BASE_DIR)
+
+
+def _entities(value: str, options: tuple = ENTITIES) -> list:
+    if value in (None, "all"):
+        return list(options)
+    selected = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [v for v in selected if v not in options]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Entidad no admitida: {', '.join(unknown)}. Opciones: {options}")
+    return selected
+
+
+def _reprocessable(value: str) -> list:
+    return _entities(value, REPROCESSABLE)
+
+
+# ----------------------------------------------------------------------
+# Subcomandos
+# ----------------------------------------------------------------------
+def cmd_init_db(args) -> int:
+    _ensure_importable()
+    from src.config import init_db
+
+    init_db.create_database()
+    init_db.create_tables()
+    return 0
+
+
+def _run_stages(entities: list, last_stage: str) -> int:
+    """Corre extract (y transform/validate) reutilizando los checkpoints vigentes."""
+    _ensure_importable()
+    from src import run_pipeline
+    from src.extract.extractor import DataExtractor
+    from src.transform.transformer import DataTransformer
+    from src.quality.validator import DataValidator
+    from src.orchestration.checkpoint import CheckpointStore
+    from src.utils.frames import is_empty
+
+    checkpoints = CheckpointStore(CHECKPOINT_DIR, resume=True)
+    extractor, transformer, validator = DataExtractor(), DataTransformer(), DataValidator()
+    failed = []
+    for entity in entities:
+        path, steps = run_pipeline.entity_stages(entity, extractor, transformer, validator, RAW_DIR)
+        if last_stage == "extract":
+            steps = steps[:1]
+        result = checkpoints.run_stages(entity, path, steps)
+        if is_empty(result):
+            failed.append(entity)
+        print(f"📦 {entity}: {len(result)} filas tras '{steps[-1][0]}'")
+    return 1 if failed else 0
+
+
+def cmd_extract(args) -> int:
+    return _run_stages(args.entity, "extract")
+
+
+def cmd_transform(args) -> int:
+    return _run_stages(args.entity, "validate")
+
+
+def load_tasks(entities: list) -> list:
+    """
+    Tareas del DAG que corre 'load': repetirlo deja la base igual. Con
+    productos o transacciones se incluye preparar_db y ambas se recargan
+    completas (append sobre filas ya cargadas violaría las llaves primarias).
+    """
+    if not set(entities) & set(FULL_RELOAD_ENTITIES):
+        return list(entities)
+    selected = set(entities) | set(FULL_RELOAD_ENTITIES)
+    return [PREPARE_TASK] + [entity for entity in ENTITIES if entity in selected]
+
+
+def cmd_load(args) -> int:
+    _ensure_importable()
+    from src import run_pipeline
+    from src.config import init_db
+
+    # Solo clientes no pasa por preparar_db: en una base nueva el esquema aún no existe
+    if not init_db.create_tables():
+        return 1
+    run_pipeline.run_pipeline(only=load_tasks(args.entity), max_workers=args.workers, reuse_checkpoints=True)
+    return 0
+
+
+def cmd_run(args) -> int:
+    _ensure_importable()
+    from src import run_pipeline
+
+    run_pipeline.run_pipeline(
+        only=args.tasks.split(",") if args.tasks else None,
+        max_workers=args.workers,
+        resume=args.resume,
+    )
+    return 0
+
+
+def cmd_reprocess(args) -> int:
+    _ensure_importable()
+    from src.load.loader import DataLoader
+    from src.quality.reprocess import QuarantineReprocessor
+
+    reprocessor = QuarantineReprocessor(DataLoader(), chunk_rows=args.chunk_rows)
+    reprocessor.run(args.entity, desde=args.desde, hasta=args.hasta)
+    return 0
+
+
+def cmd_bench(args) -> int:
+    _ensure_importable()
+    from benchmarks import run_benchmarks
+
+    extra = args.bench_args[1:] if args.bench_args[:1] == ["--"] else args.bench_args
+    return run_benchmarks.main(extra)
+
+
+def _latest_metrics() -> dict:
+    files = glob.glob(os.path.join(METRICS_DIR, "run_*.json"))
+    if not files:
+        return None
+    with open(max(files, key=os.path.getmtime), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def collect_status() -> dict:
+    """Estado local del pipeline: manifiesto de checkpoints y métricas de la última corrida."""
+    manifest_path = os.path.join(CHECKPOINT_DIR, "manifest.json")
+    manifest = {"stages": {}, "run": {"run_id": None, "completed_tasks": []}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    status = {
+        "pending_run": manifest["run"] if manifest["run"].get("completed_tasks") else None,
+        "checkpoints": {
+            entity: {stage: {"rows": e.get("rows"), "created_at": e.get("created_at")}
+                     for stage, e in stages.items()}
+            for entity, stages in manifest["stages"].items()
+        },
+        "last_run": None,
+    }
+    metrics = _latest_metrics()
+    if metrics:
+        errors = [r for r in metrics["stages"] if r.get("status") != "ok"]
+        status["last_run"] = {
+            "run_id": metrics["run_id"],
+            "finished_at": metrics["finished_at"],
+            "total_wall_s": metrics["total_wall_s"],
+            "operations": len(metrics["stages"]),
+            "errors": len(errors),
+        }
+    return status
+
+
+def cmd_status(args) -> int:
+    status = collect_status()
+    if args.json:
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+    else:
+        last = status["last_run"]
+        if last:
+            state = "OK" if last["errors"] == 0 else f"{last['errors']} operaciones con error"
+            print(f"🕒 Última corrida: {last['run_id']} ({last['finished_at']}, "
+                  f"{last['total_wall_s']}s) -> {state}")
+        else:
+            print("🕒 Sin corridas registradas.")
+        pending = status["pending_run"]
+        if pending:
+            print(f"⏸️  Corrida {pending['run_id']} incompleta; tareas hechas: {pending['completed_tasks']}")
+        for entity, stages in status["checkpoints"].items():
+            detail = ", ".join(f"{stage}={info['rows']}" for stage, info in stages.items())
+            print(f"   📦 {entity}: {detail}")
+    last = status["last_run"]
+    return 1 if (last and last["errors"]) or status["pending_run"] else 0
+
+
+# ----------------------------------------------------------------------
+# Parser
+# ----------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="etl-financiero", description="Pipeline ETL Financiero")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("init-db", help="Crear la base de datos y las tablas")
+    p.set_defaults(func=cmd_init_db)
+
+    entity_help = f"Entidades separadas por coma ({', '.join(ENTITIES)}) o 'all'"
+    for name, func, help_text in (
+        ("extract", cmd_extract, "Extraer las fuentes crudas a checkpoints"),
+        ("transform", cmd_transform, "Limpiar y validar (reutiliza la extracción en checkpoint)"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--entity", type=_entities, default=list(ENTITIES), help=entity_help)
+        p.set_defaults(func=func)
+
+    p = sub.add_parser("load", help="Cargar entidades a PostgreSQL (reutiliza los checkpoints; "
+                                    "productos y transacciones se recargan completas)")
+    p.add_argument("--entity", type=_entities, default=list(ENTITIES), help=entity_help)
+    p.add_argument("--workers", type=int, help="Tamaño del pool de workers")
+    p.set_defaults(func=cmd_load)
+
+    p = sub.add_parser("run", help="Ejecutar el DAG completo o un subconjunto de tareas")
+    p.add_argument("--tasks", help="Subconjunto de tareas separadas por coma (ej. clientes,productos)")
+    p.add_argument("--workers", type=int, help="Tamaño del pool de workers")
+    p.add_argument("--resume", action="store_true",
+                   help="Reanudar la última corrida fallida desde su primera etapa pendiente")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("status", help="Estado de la última corrida (sin tocar la base de datos)")
+    p.add_argument("--json", action="store_true", help="Salida en JSON")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("reprocess", help="Reprocesar la cuarentena con las reglas vigentes y cargar lo recuperado")
+    p.add_argument("--entity", type=_reprocessable, default=list(REPROCESSABLE),
+                   help=f"Entidades separadas por coma ({', '.join(REPROCESSABLE)}) o 'all'")
+    p.add_argument("--desde", help="Fecha inicial (YYYY-MM-DD) de las filas a reprocesar")
+    p.add_argument("--hasta", help="Fecha final (YYYY-MM-DD, incluida)")
+    p.add_argument("--chunk-rows", type=int, default=100_000, help="Filas por lote (una transacción por lote)")
+    p.set_defaults(func=cmd_reprocess)
+
+    p = sub.add_parser("bench", help="Benchmarks (argumentos de benchmarks/run_benchmarks.py tras '--')")
+    p.add_argument("bench_args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
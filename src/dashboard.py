@@ -1,10 +1,19 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import os
 from sqlalchemy import create_engine
+import sys
 from dotenv import load_dotenv
 
+# 'streamlit run src/dashboard.py' solo agrega src/ al path: sumamos la raíz del proyecto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.reporting.queries import DashboardQueries, GRANULARIDADES
+from src.reporting.cache import DashboardCache
+from src.reporting.downsampling import downsample_serie, granularidad_para_rango
+from src.monitoring.run_registry import RunRegistry
+
 # --- CONFIGURACIÓN DE PÁGINA Y ESTILOS (CSS INYECTADO) ---
 st.set_page_config(page_title="Reporte Financiero ETL", layout="wide")
 
@@ -76,9 +85,12 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- CONEXIÓN A DATOS (POSTGRESQL) ---
-@st.cache_data
-def load_data_from_db():
-    """Extrae datos limpios directamente del Data Warehouse."""
+@st.cache_resource
+def get_cache():
+    """
+    Caché compartido por todas las sesiones, atado a la última corrida exitosa
+    del pipeline (etl_runs): solo se refresca cuando aterriza una corrida nueva.
+    """
     user = os.getenv("DB_USER")
     password = os.getenv("DB_PASSWORD")
     host = os.getenv("DB_HOST")
@@ -87,29 +99,46 @@ def load_data_from_db():
     
     db_url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}"
     engine = create_engine(db_url)
-    
-    # Query Analítica: Unimos Transacciones + Clientes + Productos
-    query = """
-    SELECT 
-        t.transaccion_id,
-        t.monto,
-        t.fecha_transaccion,
-        t.tipo_movimiento,
-        c.segmento,
-        p.nombre_producto,
-        p.tipo as tipo_producto
-    FROM transacciones t
-    JOIN clientes c ON t.cliente_id = c.cliente_id
-    JOIN productos_financieros p ON t.producto_id = p.producto_id
-    """
-    return pd.read_sql(query, engine)
+    max_entries = int(os.getenv("DASHBOARD_CACHE_ENTRIES", "32"))
+    return DashboardCache(DashboardQueries(engine), RunRegistry(engine), max_entries=max_entries)
 
 try:
-    df = load_data_from_db()
+    cache = get_cache()
+    cache.sync()
+    fecha_min, fecha_max = cache.rango_fechas()
+    todos_segmentos = cache.segmentos()
 except Exception as e:
     st.error(f"Error de conexión a Base de Datos: {e}")
     st.stop()
 
+if fecha_min is None:
+    st.warning("El Data Warehouse aún no tiene transacciones cargadas.")
+    st.stop()
+
+# --- FILTROS (se envían como parámetros a las consultas SQL) ---
+st.sidebar.header("Filtros")
+rango = st.sidebar.date_input("Rango de fechas", (fecha_min, fecha_max),
+                              min_value=fecha_min, max_value=fecha_max)
+desde, hasta = rango if len(rango) == 2 else (fecha_min, fecha_max)
+segmentos_sel = st.sidebar.multiselect("Segmentos", todos_segmentos, default=todos_segmentos)
+granularidad = st.sidebar.selectbox("Granularidad temporal", ("auto",) + GRANULARIDADES, index=0)
+if granularidad == "auto":
+    # El rango elegido hace de zoom: la granularidad más fina que quepa en MAX_PUNTOS
+    granularidad = granularidad_para_rango(desde, hasta)
+
+# Sin filtro efectivo se usan los agregados completos (cuartiles precalculados)
+filtro_desde = None if desde == fecha_min else desde
+filtro_hasta = None if hasta == fecha_max else hasta
+filtro_segmentos = () if set(segmentos_sel) == set(todos_segmentos) else tuple(segmentos_sel)
+
+df_prod = cache.totales_por_producto(filtro_desde, filtro_hasta, filtro_segmentos)
+df_cuantiles = cache.cuartiles_por_segmento(filtro_desde, filtro_hasta, filtro_segmentos)
+df_time = cache.serie_temporal(filtro_desde, filtro_hasta, filtro_segmentos, granularidad)
+# LTTB en el servidor: el navegador nunca recibe más de MAX_PUNTOS puntos por serie
+n_periodos = len(df_time)
+df_time = downsample_serie(df_time, 'fecha', 'monto')
+st.sidebar.caption(f"Corrida: {cache.run_id or 'sin registro'} · datos hasta {cache.watermark}")
+
 # --- I. PLANTEAMIENTO DEL PROBLEMA ---
 st.title("Reporte de Integridad Financiera y Comportamiento Transaccional")
 st.markdown("---")
@@ -135,17 +164,16 @@ st.markdown("""
         Se aplicaron filtros de exclusión para eliminar registros con identificadores huérfanos o montos inválidos.
     </p>
 </div>
-""".format(len(df)), unsafe_allow_html=True)
+""".format(int(df_prod['n_transacciones'].sum())), unsafe_allow_html=True)
 
 # --- III. ANÁLISIS EMPÍRICO ---
 st.markdown("<h3>III. Análisis Empírico (Diagnóstico)</h3>", unsafe_allow_html=True)
 
-tab1, tab2, tab3 = st.tabs(["Distribución por Producto", "Análisis de Segmentos", "Tendencia Temporal"])
+tab1, tab2, tab3, tab4 = st.tabs(["Distribución por Producto", "Análisis de Segmentos", "Tendencia Temporal",
+                                  "Calidad de Datos"])
 
 with tab1:
-    # Agrupación
-    df_prod = df.groupby('nombre_producto')['monto'].sum().reset_index().sort_values('monto', ascending=False)
-    
+    # Agregación por producto calculada en PostgreSQL
     fig_prod = px.bar(
         df_prod, x='nombre_producto', y='monto', 
         title="Volumen Transaccional por Producto Financiero",
@@ -164,8 +192,17 @@ with tab1:
     """, unsafe_allow_html=True)
 
 with tab2:
-    fig_seg = px.box(
-        df, x='segmento', y='monto', color='segmento',
+    # Box plot a partir de los cuantiles precalculados (sin enviar montos individuales)
+    fig_seg = go.Figure([
+        go.Box(
+            name=row.segmento, x=[row.segmento],
+            q1=[row.q1], median=[row.mediana], q3=[row.q3],
+            lowerfence=[row.monto_min], upperfence=[row.monto_max],
+            mean=[row.monto_total / row.n_transacciones],
+        )
+        for row in df_cuantiles.itertuples()
+    ])
+    fig_seg.update_layout(
         title="Distribución de Montos por Segmento de Cliente",
         template="plotly_white"
     )
@@ -180,10 +217,7 @@ with tab2:
     """, unsafe_allow_html=True)
 
 with tab3:
-    # Resample diario si hay suficientes datos, sino por transacción
-    df['fecha'] = pd.to_datetime(df['fecha_transaccion']).dt.date
-    df_time = df.groupby('fecha')['monto'].sum().reset_index()
-    
+    # Serie por período (date_trunc) calculada en PostgreSQL
     fig_time = px.line(
         df_time, x='fecha', y='monto', markers=True,
         title="Evolución Temporal del Flujo de Capital",
@@ -191,6 +225,30 @@ with tab3:
         line_shape='spline'
     )
     st.plotly_chart(fig_time, use_container_width=True)
+    st.caption(f"Granularidad: {granularidad} · {len(df_time)} de {n_periodos} puntos (LTTB)")
+
+with tab4:
+    # Contabilidad de filas de la última corrida (etl_stage_stats), sin leer logs ni hechos
+    df_calidad = cache.queries.calidad_corrida(cache.run_id) if cache.run_id else None
+    if df_calidad is None or df_calidad.empty:
+        st.info("La última corrida no registró estadísticas de calidad.")
+    else:
+        totales = df_calidad[df_calidad['regla'] == '']
+        resumen = pd.DataFrame({
+            'extraídas': totales[totales['etapa'] == 'extract'].set_index('entidad')['filas_salida'],
+            'rechazadas (DQ)': totales.dropna(subset=['filas_rechazadas']).groupby('entidad')['filas_rechazadas'].sum(),
+            'huérfanas': df_calidad[df_calidad['etapa'] == 'integridad'].set_index('entidad')['filas_rechazadas'],
+            'cargadas': totales[totales['operacion'] == 'load_data'].set_index('entidad')['filas_entrada'],
+        }).fillna(0).astype(int)
+        st.dataframe(resumen, use_container_width=True)
+
+        reglas = df_calidad[(df_calidad['operacion'] == 'regla')]
+        fig_reglas = px.bar(
+            reglas, x='regla', y='filas_rechazadas', color='entidad',
+            title=f"Filas rechazadas por regla · corrida {cache.run_id}",
+            template="plotly_white"
+        )
+        st.plotly_chart(fig_reglas, use_container_width=True)
 
 # --- IV. ANALÍTICA PRESCRIPTIVA ---
 st.markdown("<h3>IV. Analítica Prescriptiva (Estrategia)</h3>", unsafe_allow_html=True)
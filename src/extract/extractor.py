@@ -1,16 +1,28 @@
 import pandas as pd
 import os
 import json
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+
+try:
+    from src.utils.frames import resolve_backend, to_arrow
+except ImportError:  # Ejecución directa del módulo (python src/extract/extractor.py)
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from src.utils.frames import resolve_backend, to_arrow
 
 class DataExtractor:
     """
     Módulo profesional para la ingesta de datos desde diversas fuentes.
     Implementa patrón Facade para unificar la lectura.
+
+    Con backend='arrow' (o ETL_BACKEND=arrow) retorna tablas de Arrow,
+    usando los lectores nativos multihilo de pyarrow cuando existen.
     """
     
-    def __init__(self):
-        # Definimos rutas base por si se necesitan logs específicos aquí
-        pass
+    def __init__(self, backend: str = None):
+        self.backend = resolve_backend(backend)
 
     def extract_csv(self, filepath: str) -> pd.DataFrame:
         """Lee archivos CSV con manejo de errores robusto."""
@@ -19,7 +31,11 @@ class DataExtractor:
                 raise FileNotFoundError(f"El archivo no existe: {filepath}")
             
             print(f"📥 Leyendo CSV: {filepath}")
-            df = pd.read_csv(filepath)
+            if self.backend == "arrow":
+                # strings_can_be_null: celdas vacías -> nulo (igual que pandas)
+                df = pa_csv.read_csv(filepath, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+            else:
+                df = pd.read_csv(filepath)
             print(f"   ✔ Registros extraídos: {len(df)}")
             return df
         except Exception as e:
@@ -35,6 +51,8 @@ class DataExtractor:
             print(f"📥 Leyendo Excel: {filepath}")
             # engine='openpyxl' es necesario para .xlsx modernos
             df = pd.read_excel(filepath, engine='openpyxl')
+            if self.backend == "arrow":
+                df = to_arrow(df)
             print(f"   ✔ Registros extraídos: {len(df)}")
             return df
         except Exception as e:
@@ -48,13 +66,49 @@ class DataExtractor:
                 raise FileNotFoundError(f"El archivo no existe: {filepath}")
             
             print(f"📥 Leyendo JSON: {filepath}")
-            df = pd.read_json(filepath)
+            # NDJSON / JSON Lines: un objeto por línea (salida del generador por bloques)
+            lines = filepath.endswith((".ndjson", ".jsonl"))
+            if self.backend == "arrow" and lines:
+                df = pa_json.read_json(filepath)
+            else:
+                df = pd.read_json(filepath, lines=lines)
+                if self.backend == "arrow":
+                    df = to_arrow(df)
             print(f"   ✔ Registros extraídos: {len(df)}")
             return df
         except Exception as e:
             print(f"   ❌ Error leyendo JSON: {e}")
             return pd.DataFrame()
 
+    def extract_parquet(self, filepath: str) -> pd.DataFrame:
+        """Lee Parquet: un archivo o un directorio particionado (ej. mes=2024-01/)."""
+        try:
+            if not os.path.exists(filepath):
+                raise FileNotFoundError(f"El archivo no existe: {filepath}")
+            
+            print(f"📥 Leyendo Parquet: {filepath}")
+            df = pq.read_table(filepath) if self.backend == "arrow" else pd.read_parquet(filepath)
+            # Las columnas de partición del directorio no son parte del esquema de origen
+            if self.backend == "arrow":
+                df = df.drop_columns([c for c in df.column_names if c == "mes"])
+            else:
+                df = df.drop(columns=[c for c in df.columns if c == "mes"])
+            print(f"   ✔ Registros extraídos: {len(df)}")
+            return df
+        except Exception as e:
+            print(f"   ❌ Error leyendo Parquet: {e}")
+            return pd.DataFrame()
+
+    def extract(self, filepath: str) -> pd.DataFrame:
+        """Despacha al lector adecuado según la extensión (o directorio Parquet)."""
+        if os.path.isdir(filepath) or filepath.endswith(".parquet"):
+            return self.extract_parquet(filepath)
+        if filepath.endswith((".json", ".ndjson", ".jsonl")):
+            return self.extract_json(filepath)
+        if filepath.endswith((".xlsx", ".xls")):
+            return self.extract_excel(filepath)
+        return self.extract_csv(filepath)
+
 # ---------------------------------------------------------
 # BLOQUE DE PRUEBA (Main)
 # Esto permite probar este archivo individualmente sin correr todo el proyecto
@@ -0,0 +1,218 @@
+import math
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import text
+
+# Clientes sin segmento se agregan bajo esta etiqueta (la llave no admite nulos)
+SIN_SEGMENTO = "SIN_SEGMENTO"
+
+AGG_DIARIO = "agg_transacciones_diarias"
+AGG_CUANTILES = "agg_segmento_cuantiles"
+AGG_HISTOGRAMA = "agg_segmento_histograma"
+
+# Buckets logarítmicos del histograma: cada uno cubre un factor 1.01 del monto,
+# así un cuartil interpolado dentro de su bucket tiene error relativo < 1%
+HIST_GROWTH = 1.01
+
+# Bucket para montos <= 0 (no deberían pasar la validación, pero no se pierden)
+BUCKET_NO_POSITIVO = -1_000_000
+
+CUANTILES = (0.25, 0.50, 0.75)
+
+
+def histogram_bucket(montos) -> np.ndarray:
+    """Bucket de cada monto (misma fórmula que el SQL de refresh)."""
+    montos = np.asarray(montos, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        buckets = np.floor(np.log(montos) / math.log(HIST_GROWTH))
+    return np.where(montos > 0, buckets, BUCKET_NO_POSITIVO).astype(np.int64)
+
+
+def quantiles_from_histogram(counts, mins, maxs, qs=CUANTILES) -> list:
+    """
+    Cuantiles (semántica de percentile_cont) a partir de buckets ordenados
+    con su conteo y sus valores mínimo y máximo. percentile_cont interpola
+    entre los valores de posición floor(rango) y la siguiente, que pueden
+    caer en buckets distintos: cada uno se estima dentro de su propio bucket
+    (lineal entre su mínimo y su máximo) y luego se interpola entre ambos.
+    Cada estimación queda dentro de su bucket, así que el error relativo es
+    menor a HIST_GROWTH - 1; con buckets de un solo valor el resultado es exacto.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    mins = np.asarray(mins, dtype=float)
+    maxs = np.asarray(maxs, dtype=float)
+    total = int(counts.sum())
+    if total == 0:
+        return [None for _ in qs]
+    cum = np.cumsum(counts)
+
+    def value_at(position: int) -> float:
+        idx = int(np.searchsorted(cum, position, side="right"))
+        n = counts[idx]
+        offset = position - (cum[idx] - n)
+        return float(mins[idx] + (maxs[idx] - mins[idx]) * offset / (n - 1)) if n > 1 else float(mins[idx])
+
+    result = []
+    for q in qs:
+        rank = q * (total - 1)
+        lower = math.floor(rank)
+        value = value_at(lower)
+        if rank > lower:
+            value += (value_at(lower + 1) - value) * (rank - lower)
+        result.append(value)
+    return result
+
+
+class AggregateManager:
+    """
+    Tablas agregadas que alimentan el dashboard, mantenidas por el loader.
+
+    - agg_transacciones_diarias: cubo (fecha, producto, segmento) con conteo y
+      monto total. De él salen los totales diarios y los totales por producto.
+    - agg_segmento_histograma: histograma combinable por (fecha, segmento)
+      con buckets logarítmicos (conteo, total, mínimo y máximo por bucket).
+    - agg_segmento_cuantiles: resumen de cinco números (min, Q1, mediana, Q3,
+      max) por segmento para los box plots, obtenido de los histogramas.
+
+    Cada carga de transacciones refresca solo los días y productos que tocó,
+    dentro de la misma transacción que inserta los hechos. Los agregados usan
+    el segmento vigente del cliente: cuando la carga SCD2 de clientes cambia
+    un segmento, se refrescan todos los días con transacciones de ese cliente. Los cuantiles no
+    se pueden combinar entre días, pero los histogramas sí: se leen los
+    buckets de las fechas afectadas en la tabla de hechos y los cuantiles por
+    segmento se recalculan sumando histogramas, sin recorrer el histórico.
+    Conteo, total, mínimo y máximo son exactos; los cuartiles, aproximados
+    con error relativo menor a HIST_GROWTH - 1.
+    """
+
+    def __init__(self, fact_table: str = "transacciones"):
+        self.fact_table = fact_table
+
+    @staticmethod
+    def affected_keys(df) -> tuple:
+        """Días (date) y productos presentes en un lote de transacciones."""
+        if isinstance(df, pa.Table):
+            dias = pc.unique(pc.cast(pc.drop_null(df["fecha_transaccion"]), pa.date32())).to_pylist()
+            productos = pc.unique(pc.drop_null(df["producto_id"])).to_pylist()
+        else:
+            dias = pd.to_datetime(df["fecha_transaccion"]).dropna().dt.date.unique().tolist()
+            productos = df["producto_id"].dropna().unique().tolist()
+        return sorted(dias), sorted(str(p) for p in productos)
+
+    def refresh(self, conn, df) -> list:
+        """
+        Recalcula los agregados afectados por el lote 'df' usando la conexión
+        (transacción) dada. Retorna los días refrescados.
+        """
+        dias, productos = self.affected_keys(df)
+        return self._refresh_days(conn, dias, productos)
+
+    def refresh_clientes(self, conn, cliente_ids: list) -> list:
+        """
+        Recalcula, en la transacción dada, todos los días con transacciones de
+        'cliente_ids'. Los agregados usan el segmento vigente del cliente: si
+        cambió (SCD2), sus días ya cargados quedarían bajo el segmento anterior.
+        Retorna los días refrescados.
+        """
+        if not cliente_ids:
+            return []
+        dias = sorted(r[0] for r in conn.execute(text(f"""
+            SELECT DISTINCT fecha_transaccion::date FROM {self.fact_table} WHERE cliente_id = ANY(:clientes)
+        """), {"clientes": list(cliente_ids)}))
+        return self._refresh_days(conn, dias)
+
+    def _refresh_days(self, conn, dias: list, productos: list = None) -> list:
+        """Recalcula los agregados de 'dias' (solo de 'productos' en el cubo, o todos si es None)."""
+        if not dias:
+            return dias
+        params = {
+            "dias": dias,
+            "productos": productos,
+            # Rango explícito para que PostgreSQL pode particiones mensuales
+            "desde": dias[0],
+            "hasta": dias[-1] + timedelta(days=1),
+            "sin_segmento": SIN_SEGMENTO,
+        }
+        por_producto = "AND t.producto_id = ANY(:productos)" if productos is not None else ""
+
+        conn.execute(text(f"""
+            DELETE FROM {AGG_DIARIO} t
+            WHERE t.fecha = ANY(:dias) {por_producto}
+        """), params)
+        conn.execute(text(f"""
+            INSERT INTO {AGG_DIARIO} (fecha, producto_id, segmento, n_transacciones, monto_total)
+            SELECT t.fecha_transaccion::date, t.producto_id, COALESCE(c.segmento, :sin_segmento),
+                   COUNT(*), SUM(t.monto)
+            FROM {self.fact_table} t
+            JOIN clientes c ON c.cliente_id = t.cliente_id
+            WHERE t.fecha_transaccion >= :desde AND t.fecha_transaccion < :hasta
+              AND t.fecha_transaccion::date = ANY(:dias)
+              {por_producto}
+            GROUP BY 1, 2, 3
+        """), params)
+
+        # Histograma del día completo (todos los productos) de cada fecha afectada.
+        # Se recalculan los segmentos que tenían esos días y los que tienen ahora
+        # (un cliente pudo cambiar de segmento).
+        segmentos_sql = text(f"SELECT DISTINCT segmento FROM {AGG_HISTOGRAMA} WHERE fecha = ANY(:dias)")
+        segmentos = {r[0] for r in conn.execute(segmentos_sql, params)}
+        conn.execute(text(f"DELETE FROM {AGG_HISTOGRAMA} WHERE fecha = ANY(:dias)"), params)
+        conn.execute(text(f"""
+            INSERT INTO {AGG_HISTOGRAMA}
+                (fecha, segmento, bucket, n_transacciones, monto_total, monto_min, monto_max)
+            SELECT t.fecha_transaccion::date, COALESCE(c.segmento, :sin_segmento),
+                   CASE WHEN t.monto > 0
+                        THEN floor(ln(t.monto::float8) / ln(CAST(:crecimiento AS float8)))::int
+                        ELSE :bucket_no_positivo END,
+                   COUNT(*), SUM(t.monto), MIN(t.monto), MAX(t.monto)
+            FROM {self.fact_table} t
+            JOIN clientes c ON c.cliente_id = t.cliente_id
+            WHERE t.fecha_transaccion >= :desde AND t.fecha_transaccion < :hasta
+              AND t.fecha_transaccion::date = ANY(:dias)
+            GROUP BY 1, 2, 3
+        """), {**params, "crecimiento": HIST_GROWTH, "bucket_no_positivo": BUCKET_NO_POSITIVO})
+
+        segmentos = sorted(segmentos | {r[0] for r in conn.execute(segmentos_sql, params)})
+        self._refresh_cuantiles(conn, segmentos)
+        productos_txt = f"{len(productos)} producto(s)" if productos is not None else "todos los productos"
+        print(f"   📊 Agregados refrescados: {len(dias)} día(s), {productos_txt}, {len(segmentos)} segmento(s)")
+        return dias
+
+    def _refresh_cuantiles(self, conn, segmentos: list):
+        """Recalcula agg_segmento_cuantiles de 'segmentos' sumando sus histogramas diarios."""
+        buckets = pd.DataFrame(conn.execute(text(f"""
+            SELECT segmento, bucket, SUM(n_transacciones) AS n, SUM(monto_total) AS total,
+                   MIN(monto_min) AS minimo, MAX(monto_max) AS maximo
+            FROM {AGG_HISTOGRAMA}
+            WHERE segmento = ANY(:segmentos)
+            GROUP BY segmento, bucket
+            ORDER BY segmento, bucket
+        """), {"segmentos": segmentos}).fetchall(), columns=["segmento", "bucket", "n", "total", "minimo", "maximo"])
+
+        rows = []
+        for segmento, hist in buckets.groupby("segmento", sort=True):
+            q1, mediana, q3 = quantiles_from_histogram(hist["n"], hist["minimo"], hist["maximo"])
+            rows.append({
+                "segmento": segmento,
+                "n": int(hist["n"].sum()),
+                # Decimal: la suma y los extremos se mantienen exactos
+                "total": sum(hist["total"]),
+                "minimo": min(hist["minimo"]),
+                "maximo": max(hist["maximo"]),
+                "q1": q1, "mediana": mediana, "q3": q3,
+            })
+        conn.execute(text(f"DELETE FROM {AGG_CUANTILES} WHERE segmento = ANY(:segmentos)"),
+                     {"segmentos": segmentos})
+        if rows:
+            conn.execute(text(f"""
+                INSERT INTO {AGG_CUANTILES}
+                    (segmento, n_transacciones, monto_total, monto_min, q1, mediana, q3, monto_max, actualizado_en)
+                VALUES (:segmento, :n, :total, :minimo, :q1, :mediana, :q3, :maximo, NOW())
+            """), rows)
+
+    def truncate(self, conn):
+        conn.execute(text(f"TRUNCATE TABLE {AGG_DIARIO}, {AGG_HISTOGRAMA}, {AGG_CUANTILES}"))
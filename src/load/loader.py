@@ -1,10 +1,41 @@
+import io
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from sqlalchemy import create_engine, text
 import os
+from datetime import date
 from dotenv import load_dotenv
 
+try:
+    from src.load.partitions import PartitionManager
+    from src.load.aggregates import AggregateManager
+    from src.load.scd import SCD2Dimension
+    from src.transform.money import encode_money
+    from src.utils.frames import is_arrow, is_empty, to_arrow
+except ImportError:  # Ejecución directa del módulo (python src/load/loader.py)
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.load.partitions import PartitionManager
+    from src.load.aggregates import AggregateManager
+    from src.load.scd import SCD2Dimension
+    from src.transform.money import encode_money
+    from src.utils.frames import is_arrow, is_empty, to_arrow
+
+# Tablas particionadas por mes: la carga se enruta a la partición destino
+PARTITIONED_TABLES = {"transacciones"}
+
+# Filas por bloque de COPY al cargar tablas de Arrow
+COPY_BATCH_ROWS = 100_000
+
+# Dimensiones con historia (SCD tipo 2): se cargan por diferencias, no se truncan
+SCD2_DIMENSIONS = {
+    "clientes": SCD2Dimension("clientes", "cliente_id", ["nombre", "email", "fecha_registro", "segmento"]),
+}
+
 class DataLoader:
-    def __init__(self):
+    def __init__(self, db_url: str = None):
+        """'db_url' (URL de SQLAlchemy) reemplaza la conexión configurada en .env."""
         load_dotenv()
         self.user = os.getenv("DB_USER")
         self.password = os.getenv("DB_PASSWORD")
@@ -12,23 +43,45 @@ class DataLoader:
         self.port = os.getenv("DB_PORT")
         self.dbname = os.getenv("DB_NAME")
         
-        self.db_url = f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
+        # Rango de fechas de transacciones cargadas en esta corrida (para etl_runs)
+        self.loaded_range = None
+        # Filas nuevas / con cambios / sin cambios por dimensión SCD2 en esta corrida
+        self.dimension_changes = {}
+
+        self.db_url = db_url or f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
         
         try:
             self.engine = create_engine(self.db_url)
-            print(f"🔌 Motor SQL inicializado correctamente hacia: {self.dbname}")
+            self.partitions = PartitionManager(self.engine)
+            self.aggregates = AggregateManager()
+            print(f"🔌 Motor SQL inicializado correctamente hacia: {self.engine.url.database}")
         except Exception as e:
             print(f"❌ Error creando motor SQL: {e}")
 
-    def clean_tables(self):
+    def ensure_schema(self) -> bool:
+        """
+        Crea (o verifica) el esquema completo en la base de este loader: tablas
+        particionadas, agregados, historia SCD2 y linaje. DDL idempotente.
+        """
+        from src.config.init_db import create_tables
+
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return create_tables(dsn)
+
+    def clean_tables(self) -> bool:
         print("🧹 Limpiando base de datos (TRUNCATE)...")
         try:
-            with self.engine.connect() as conn:
-                conn.execute(text("TRUNCATE TABLE transacciones, clientes, productos_financieros CASCADE;"))
-                conn.commit()
+            with self.engine.begin() as conn:
+                # Las dimensiones SCD2 (clientes) conservan su estado e historia entre corridas
+                conn.execute(text("TRUNCATE TABLE transacciones, productos_financieros CASCADE;"))
+                # Las transacciones recuperadas de la cuarentena ya no están en la tabla de hechos
+                conn.execute(text("DELETE FROM cuarentena_recuperados WHERE entidad = 'transacciones'"))
+                self.aggregates.truncate(conn)
             print("   ✔ Tablas vaciadas correctamente.")
+            return True
         except Exception as e:
             print(f"   ❌ Error limpiando tablas: {e}")
+            return False
 
     def get_valid_ids_from_db(self, table_name: str, id_column: str) -> list:
         """
@@ -44,27 +97,138 @@ class DataLoader:
             print(f"❌ Error obteniendo IDs de {table_name}: {e}")
             return []
 
-    def load_data(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append'):
+    def load_data(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append') -> bool:
+        """
+        Carga un DataFrame o una tabla Arrow. Retorna False si la carga falló
+        (para reintentos del orquestador). Las tablas Arrow van directo por
+        COPY, sin pasar por pandas. Los montos en centavos se envían como
+        decimales exactos (sin pasar por float).
+        """
         try:
-            if df.empty:
+            if is_empty(df):
                 print(f"⚠️  No hay datos para cargar en {table_name}.")
-                return
+                return True
 
             print(f"🚀 Cargando {len(df)} registros en tabla '{table_name}'...")
-            
-            df.to_sql(
-                table_name, 
-                con=self.engine, 
-                if_exists=if_exists, 
-                index=False,
-                method='multi',
-                chunksize=1000
-            )
+            df = encode_money(to_arrow(df) if is_arrow(df) else df)
+
+            if table_name in PARTITIONED_TABLES:
+                self._load_partitioned(df)
+            elif table_name in SCD2_DIMENSIONS:
+                self._load_dimension(df, table_name)
+            elif is_arrow(df):
+                self._copy_in_transaction({table_name: to_arrow(df)})
+            else:
+                self._to_sql(df, table_name, if_exists)
             print(f"   ✅ Carga completada en '{table_name}'.")
+            return True
             
         except Exception as e:
             print(f"   ❌ Error CRÍTICO en carga SQL ({table_name}):")
             print(f"      Detalle: {e}")
+            return False
+
+    def _to_sql(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append', con=None):
+        df.to_sql(
+            table_name, 
+            con=con if con is not None else self.engine, 
+            if_exists=if_exists, 
+            index=False,
+            method='multi',
+            chunksize=1000
+        )
+
+    def _load_partitioned(self, df: pd.DataFrame):
+        """
+        Crea las particiones mensuales que falten y escribe cada grupo de filas
+        directamente en su partición (evita el enrutamiento fila a fila del padre),
+        tras confirmar en la misma transacción que cada partición sigue adjunta.
+        Todas las particiones se escriben en una sola transacción: una carga
+        fallida no deja meses a medias (y puede reintentarse o reanudarse).
+        Los agregados del dashboard se refrescan en esa misma transacción.
+        """
+        if is_arrow(df):
+            df = to_arrow(df)
+        self.partitions.ensure_partitions(df[self.partitions.key_column])
+        parts = self.partitions.split_by_partition(df)
+        with self.engine.begin() as conn:
+            self.partitions.verify_attached(conn, parts)
+            if is_arrow(df):
+                for partition, part in parts.items():
+                    print(f"   ↳ {part.num_rows} registros -> {partition}")
+                self._copy_tables(conn, parts)
+            else:
+                for partition, df_part in parts.items():
+                    print(f"   ↳ {len(df_part)} registros -> {partition}")
+                    self._to_sql(df_part, partition, con=conn)
+            dias = self.aggregates.refresh(conn, df)
+        self._track_loaded(dias)
+
+    def _load_dimension(self, df, table_name: str):
+        """
+        Carga por diferencias (hash) de una dimensión SCD2, en una sola transacción.
+        Si cambió el segmento de clientes ya cargados, sus días se reagregan ahí mismo.
+        """
+        dimension = SCD2_DIMENSIONS[table_name]
+        with self.engine.begin() as conn:
+            stats = dimension.sync(conn, to_arrow(df), self._copy_tables)
+            if table_name == "clientes" and stats["cambio"]:
+                # Los días reagregados entran al rango de la corrida (el dashboard los vuelve a leer)
+                self._track_loaded(self.aggregates.refresh_clientes(conn, dimension.changed_keys(conn, "segmento")))
+        self.dimension_changes[table_name] = stats
+        print(f"   ↳ {stats['nuevo']} nuevos | {stats['cambio']} con cambios | {stats['sin_cambio']} sin cambios")
+
+    def _track_loaded(self, dias: list):
+        if not dias:
+            return
+        if self.loaded_range is None:
+            self.loaded_range = (dias[0], dias[-1])
+        else:
+            self.loaded_range = (min(self.loaded_range[0], dias[0]), max(self.loaded_range[1], dias[-1]))
+
+    def _copy_in_transaction(self, tables: dict):
+        """Escribe {tabla_destino: pa.Table} con COPY, todo en una sola transacción."""
+        with self.engine.begin() as conn:
+            self._copy_tables(conn, tables)
+
+    def _copy_tables(self, conn, tables: dict):
+        """COPY de {tabla_destino: pa.Table} sobre la conexión DBAPI de una transacción abierta."""
+        cursor = conn.connection.cursor()
+        try:
+            for table_name, table in tables.items():
+                self._copy_arrow(cursor, table, table_name)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _copy_arrow(cursor, table: pa.Table, table_name: str):
+        """Serializa la tabla Arrow a CSV por bloques y la envía con COPY FROM STDIN."""
+        # PostgreSQL guarda microsegundos: se normalizan los timestamps antes de serializar
+        for i, field in enumerate(table.schema):
+            if pa.types.is_timestamp(field.type):
+                table = table.set_column(i, field.name, table[field.name].cast(pa.timestamp("us"), safe=False))
+
+        sql = f"COPY {table_name} ({', '.join(table.column_names)}) FROM STDIN WITH (FORMAT csv)"
+        options = pa_csv.WriteOptions(include_header=False)
+        for batch in table.to_batches(max_chunksize=COPY_BATCH_ROWS):
+            buffer = io.BytesIO()
+            pa_csv.write_csv(batch, buffer, options)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+    def detach_old_partitions(self, retention_months: int) -> list:
+        """
+        Desacopla las particiones de 'transacciones' más antiguas que la ventana
+        de retención. Los datos quedan en tablas independientes, no se borran.
+        """
+        today = date.today()
+        cutoff = (pd.Timestamp(today.year, today.month, 1) - pd.DateOffset(months=retention_months)).date()
+        print(f"🗄️  Desacoplando particiones anteriores a {cutoff.isoformat()}...")
+        try:
+            return self.partitions.detach_partitions_before(cutoff)
+        except Exception as e:
+            print(f"   ❌ Error desacoplando particiones: {e}")
+            return []
 
 # ---------------------------------------------------------
 # BLOQUE DE EJECUCIÓN
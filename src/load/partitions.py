@@ -0,0 +1,148 @@
+import threading
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import text
+
+
+class PartitionManager:
+    """
+    Gestiona las particiones mensuales de la tabla de hechos 'transacciones'.
+    La tabla padre está particionada por RANGE sobre 'fecha_transaccion';
+    cada mes vive en su propia tabla hija (ej. transacciones_y2024m01).
+    """
+
+    def __init__(self, engine, parent_table: str = "transacciones", key_column: str = "fecha_transaccion"):
+        self.engine = engine
+        self.parent_table = parent_table
+        self.key_column = key_column
+        # Cache de particiones conocidas (evita consultar el catálogo en cada carga)
+        self._known = None
+        self._lock = threading.Lock()
+
+    def partition_name(self, month_start: date) -> str:
+        """Nombre canónico de la partición de un mes."""
+        return f"{self.parent_table}_y{month_start.year:04d}m{month_start.month:02d}"
+
+    def _month_from_name(self, name: str) -> date:
+        suffix = name[len(self.parent_table) + 2:]  # 'YYYYmMM'
+        year, month = suffix.split("m")
+        return date(int(year), int(month), 1)
+
+    def existing_partitions(self) -> set:
+        """Consulta el catálogo de PostgreSQL por las particiones adjuntas."""
+        with self.engine.connect() as conn:
+            self._known = self._attached(conn)
+        return set(self._known)
+
+    def _attached(self, conn) -> set:
+        query = text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :parent
+        """)
+        return {r[0] for r in conn.execute(query, {"parent": self.parent_table})}
+
+    def _archived(self, conn, names: list) -> list:
+        """Tablas con nombre de partición que existen pero no están adjuntas (desacopladas)."""
+        query = text("""
+            SELECT relname FROM pg_class
+            WHERE relname = ANY(:names) AND relkind = 'r' AND NOT relispartition
+              AND pg_table_is_visible(oid)
+        """)
+        return sorted(r[0] for r in conn.execute(query, {"names": list(names)}))
+
+    def verify_attached(self, conn, names) -> None:
+        """
+        Confirma, dentro de la transacción de carga, que cada partición destino
+        sigue adjunta al padre: escribir en una tabla desacoplada por su nombre
+        dejaría las filas fuera de 'transacciones' sin ningún error.
+        """
+        detached = sorted(set(names) - self._attached(conn))
+        if detached:
+            self._known = None
+            raise RuntimeError(f"Particiones no adjuntas a {self.parent_table}: {', '.join(detached)}")
+
+    def ensure_partitions(self, fechas) -> list:
+        """
+        Crea las particiones que falten para los meses presentes en 'fechas'.
+        Retorna la lista de particiones creadas en esta llamada. Un mes ya
+        archivado (partición desacoplada) no se recrea ni se reabre: la carga
+        se rechaza con un error.
+        """
+        months = self._months(fechas)
+        created = []
+        with self._lock:
+            known = self._known if self._known is not None else self.existing_partitions()
+            missing = [m for m in months if self.partition_name(m) not in known]
+            if not missing:
+                return created
+
+            with self.engine.begin() as conn:
+                archived = self._archived(conn, [self.partition_name(m) for m in missing])
+                if archived:
+                    raise ValueError(
+                        f"Meses archivados (particiones desacopladas de {self.parent_table}): "
+                        f"{', '.join(archived)}. Readjuntarlos antes de volver a cargarlos."
+                    )
+                for month_start in missing:
+                    name = self.partition_name(month_start)
+                    next_month = (pd.Timestamp(month_start) + pd.offsets.MonthBegin(1)).date()
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.parent_table} "
+                        f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{next_month.isoformat()}')"
+                    ))
+                    created.append(name)
+            self._known.update(created)
+
+        for name in created:
+            print(f"   🧱 Partición creada: {name}")
+        return created
+
+    def split_by_partition(self, df) -> dict:
+        """Agrupa un DataFrame (o tabla Arrow) por la partición mensual destino de cada fila."""
+        if isinstance(df, pa.Table):
+            months = pc.strftime(df[self.key_column], "%Y-%m-01")
+            return {
+                self.partition_name(date.fromisoformat(month)): df.filter(pc.equal(months, month))
+                for month in sorted(pc.unique(months).to_pylist())
+            }
+        keys = pd.to_datetime(df[self.key_column]).dt.to_period("M")
+        return {
+            self.partition_name(period.start_time.date()): part
+            for period, part in df.groupby(keys, sort=True)
+        }
+
+    def detach_partitions_before(self, cutoff: date) -> list:
+        """
+        Desacopla (DETACH) las particiones cuyos meses terminan antes de 'cutoff'.
+        Las tablas desacopladas se conservan intactas para archivo o auditoría;
+        no se borra ningún dato.
+        """
+        cutoff_month = date(cutoff.year, cutoff.month, 1)
+        with self._lock:
+            old = sorted(
+                name for name in self.existing_partitions()
+                if self._month_from_name(name) < cutoff_month
+            )
+            if old:
+                with self.engine.begin() as conn:
+                    for name in old:
+                        conn.execute(text(f"ALTER TABLE {self.parent_table} DETACH PARTITION {name}"))
+                self._known.difference_update(old)
+
+        for name in old:
+            print(f"   📦 Partición desacoplada (archivo): {name}")
+        return old
+
+    @staticmethod
+    def _months(fechas) -> list:
+        if isinstance(fechas, (pa.Array, pa.ChunkedArray)):
+            months = pc.unique(pc.strftime(pc.drop_null(fechas), "%Y-%m-01")).to_pylist()
+            return sorted(date.fromisoformat(m) for m in months)
+        periods = pd.to_datetime(fechas, errors="coerce").dropna().dt.to_period("M").unique()
+        return sorted(p.start_time.date() for p in periods)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import text
+
+# Separador de columnas y marcador de nulo al serializar una fila para el hash
+_SEPARATOR = "\x1f"
+_NULL_TOKEN = "\x00"
+
+
+class SCD2Dimension:
+    """
+    Dimensión con historia (SCD tipo 2) y detección de cambios por hash.
+
+    La tabla de la dimensión (ej. 'clientes') guarda el estado vigente y es
+    la que referencian los hechos; la tabla de historia guarda una versión
+    por cambio, con su rango de validez [valido_desde, valido_hasta) y el
+    hash de sus atributos.
+
+    En cada carga se calcula el hash de cada fila entrante (vectorizado), se
+    envía solo (llave, hash) a una tabla temporal por COPY y se compara con
+    la versión vigente por el índice parcial de la historia. Únicamente las
+    filas nuevas o con cambios se escriben: se cierra su versión vigente, se
+    abre una nueva y se actualiza el estado vigente. Las llaves ausentes del
+    archivo no se cierran (el origen puede ser un extracto parcial).
+    """
+
+    def __init__(self, table: str, key: str, attributes: list, history_table: str = None):
+        self.table = table
+        self.key = key
+        self.attributes = list(attributes)
+        self.history_table = history_table or f"{table}_historia"
+
+    def row_hash(self, table: pa.Table) -> pa.Array:
+        """
+        Hash de 64 bits de los atributos de cada fila. Las columnas se
+        serializan a texto con Arrow, de modo que ambos motores (y cualquier
+        corrida) producen el mismo hash para la misma fila.
+        """
+        parts = [pc.fill_null(pc.cast(table[column], pa.string()), _NULL_TOKEN) for column in self.attributes]
+        joined = pc.binary_join_element_wise(*parts, _SEPARATOR)
+        hashes = pd.util.hash_array(joined.to_numpy(zero_copy_only=False))
+        return pa.array(hashes.view(np.int64))
+
+    def sync(self, conn, table: pa.Table, copy) -> dict:
+        """
+        Aplica el lote 'table' sobre la conexión (transacción) dada. 'copy' es
+        la función de COPY del loader ({tabla_destino: pa.Table}). Retorna el
+        conteo de filas nuevas, con cambios y sin cambios.
+        """
+        hashes = self.row_hash(table)
+        staged = f"_stage_{self.table}_hash"
+        conn.execute(text(f"CREATE TEMP TABLE {staged} ({self.key} VARCHAR(50), hash_fila BIGINT) ON COMMIT DROP"))
+        copy(conn, {staged: pa.table({self.key: pc.cast(table[self.key], pa.string()), "hash_fila": hashes})})
+        conn.execute(text(f"ANALYZE {staged}"))
+
+        # Lookup por el índice parcial (llave, versión vigente) de la historia
+        rows = conn.execute(text(f"""
+            SELECT s.{self.key}, h.{self.key} IS NULL AS nuevo
+            FROM {staged} s
+            LEFT JOIN {self.history_table} h ON h.{self.key} = s.{self.key} AND h.es_actual
+            WHERE h.{self.key} IS NULL OR h.hash_fila <> s.hash_fila
+        """)).all()
+        n_nuevos = sum(1 for _, nuevo in rows if nuevo)
+        stats = {"nuevo": n_nuevos, "cambio": len(rows) - n_nuevos, "sin_cambio": table.num_rows - len(rows)}
+        if not rows:
+            return stats
+
+        mask = pc.is_in(pc.cast(table[self.key], pa.string()), value_set=pa.array([r[0] for r in rows], pa.string()))
+        changed = table.select([self.key] + self.attributes).append_column("hash_fila", hashes).filter(mask)
+        changes = self._changes_table()
+        conn.execute(text(f"CREATE TEMP TABLE {changes} (LIKE {self.table}) ON COMMIT DROP"))
+        conn.execute(text(f"ALTER TABLE {changes} ADD COLUMN hash_fila BIGINT"))
+        copy(conn, {changes: changed})
+
+        columns = ", ".join([self.key] + self.attributes)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in self.attributes)
+        # Una sola marca de tiempo (la de la transacción) cierra y abre versiones
+        conn.execute(text(f"""
+            UPDATE {self.history_table} h SET valido_hasta = now(), es_actual = FALSE
+            FROM {changes} c
+            WHERE h.{self.key} = c.{self.key} AND h.es_actual
+        """))
+        conn.execute(text(f"""
+            INSERT INTO {self.history_table} ({columns}, hash_fila, valido_desde, es_actual)
+            SELECT {columns}, hash_fila, now(), TRUE FROM {changes}
+        """))
+        conn.execute(text(f"""
+            INSERT INTO {self.table} ({columns})
+            SELECT {columns} FROM {changes}
+            ON CONFLICT ({self.key}) DO UPDATE SET {updates}
+        """))
+        return stats
+
+
+    def changed_keys(self, conn, attribute: str) -> list:
+        """
+        Llaves cuya versión cerrada en esta transacción tenía otro valor de
+        'attribute' (ej. clientes que cambiaron de segmento). Debe llamarse en
+        la misma transacción que sync(), después de una carga con cambios.
+        """
+        return [r[0] for r in conn.execute(text(f"""
+            SELECT c.{self.key}
+            FROM {self._changes_table()} c
+            JOIN {self.history_table} h ON h.{self.key} = c.{self.key} AND h.valido_hasta = now()
+            WHERE h.{attribute} IS DISTINCT FROM c.{attribute}
+        """))]
+
+    def _changes_table(self) -> str:
+        return f"_stage_{self.table}_cambios"
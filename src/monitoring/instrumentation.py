@@ -0,0 +1,209 @@
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # No disponible en Windows
+except ImportError:
+    resource = None
+
+
+def _peak_rss_mb():
+    """Pico de memoria residente del proceso (high-water mark) en MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS reporta bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+def _row_count(obj):
+    """Filas de un DataFrame / tabla Arrow / lista; None si no aplica."""
+    if obj is None or isinstance(obj, (str, bytes, bool, dict)):
+        return None
+    if hasattr(obj, "num_rows"):
+        return obj.num_rows
+    if hasattr(obj, "shape"):
+        return obj.shape[0]
+    if isinstance(obj, (list, tuple, set)):
+        return len(obj)
+    return None
+
+
+def _infer_entity(method_name: str, args) -> str:
+    """
+    Deduce la entidad procesada: del nombre del método (clean_clientes ->
+    clientes, process_transacciones -> transacciones), de la ruta leída
+    (clientes_raw.csv -> clientes_raw) o del nombre de tabla destino.
+    """
+    for prefix in ("clean_", "validate_", "process_"):
+        if method_name.startswith(prefix):
+            return method_name[len(prefix):]
+    for arg in args:
+        if isinstance(arg, str):
+            if os.sep in arg or "." in os.path.basename(arg):
+                return os.path.splitext(os.path.basename(arg))[0]
+            return arg
+    return None
+
+
+class PipelineInstrumentation:
+    """
+    Capa de instrumentación del pipeline.
+    Mide cada llamada a Extractor / Transformer / Validator / Loader:
+    tiempo de pared, tiempo de CPU, filas de entrada y salida, filas/seg,
+    bytes leídos y picos de memoria (RSS y, opcionalmente, tracemalloc).
+    Al final de la corrida exporta todo como JSON estructurado.
+
+    Notas:
+    - El tiempo de CPU es el del hilo que ejecuta la etapa (thread_time),
+      por lo que es correcto aun con tareas del DAG corriendo en paralelo.
+    - El pico RSS es el high-water mark del proceso al terminar la etapa.
+    - El pico de tracemalloc es global: con etapas concurrentes es una cota
+      superior, no una atribución exacta.
+    """
+
+    def __init__(self, run_id: str, output_dir: str, profile_stages=(), trace_memory: bool = False):
+        self.run_id = run_id
+        self.output_dir = output_dir
+        self.profile_stages = set(profile_stages)
+        self.trace_memory = trace_memory
+        self.records = []
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        # cProfile no soporta dos perfiles activos a la vez: uno por vez
+        self._profile_lock = threading.Lock()
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_env(cls, run_id: str, output_dir: str):
+        """Configura desde ETL_PROFILE_STAGES (ej. 'transform,load') y ETL_TRACE_MEMORY=1."""
+        stages = [s.strip() for s in os.getenv("ETL_PROFILE_STAGES", "").split(",") if s.strip()]
+        trace = os.getenv("ETL_TRACE_MEMORY", "0") == "1"
+        return cls(run_id, output_dir, profile_stages=stages, trace_memory=trace)
+
+    def wrap(self, component, stage: str):
+        """Envuelve un componente para medir cada llamada a sus métodos públicos."""
+        return _InstrumentedProxy(component, stage, self)
+
+    @contextmanager
+    def measure(self, stage: str, operation: str, entity: str = None, rows_in: int = None, bytes_read: int = None):
+        """
+        Mide un bloque arbitrario. El registro producido se entrega al bloque
+        para que pueda completar 'rows_out' u otros campos.
+        """
+        record = {
+            "run_id": self.run_id,
+            "stage": stage,
+            "operation": operation,
+            "entity": entity,
+            "thread": threading.current_thread().name,
+            "started_at": datetime.now().isoformat(timespec="milliseconds"),
+            "rows_in": rows_in,
+            "rows_out": None,
+            "bytes_read": bytes_read,
+            "status": "ok",
+        }
+        profiler = self._start_profiler(stage)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            record["wall_s"] = round(wall, 6)
+            record["cpu_s"] = round(time.thread_time() - cpu_start, 6)
+            rows = record["rows_out"] if record["rows_out"] is not None else record["rows_in"]
+            record["rows_per_s"] = round(rows / wall, 2) if rows and wall > 0 else None
+            record["peak_rss_mb"] = _peak_rss_mb()
+            if self.trace_memory:
+                record["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            if profiler is not None:
+                record["profile"] = self._stop_profiler(profiler, record)
+            with self._lock:
+                self.records.append(record)
+
+    def _start_profiler(self, stage: str):
+        if stage not in self.profile_stages:
+            return None
+        if not self._profile_lock.acquire(blocking=False):
+            # Otra etapa ya está perfilándose en paralelo
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profiler(self, profiler, record: dict) -> str:
+        profiler.disable()
+        self._profile_lock.release()
+        profile_dir = os.path.join(self.output_dir, "profiles")
+        os.makedirs(profile_dir, exist_ok=True)
+        name = "_".join(str(p) for p in (self.run_id, record["stage"], record["operation"], record["entity"]) if p)
+        path = os.path.join(profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        return path
+
+    def to_dict(self) -> dict:
+        finished_at = datetime.now()
+        with self._lock:
+            stages = list(self.records)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "finished_at": finished_at.isoformat(timespec="milliseconds"),
+            "total_wall_s": round((finished_at - self.started_at).total_seconds(), 3),
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": stages,
+        }
+
+    def export_json(self) -> str:
+        """Escribe las métricas de la corrida en <output_dir>/run_<run_id>.json."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"run_{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False, default=str)
+        return path
+
+
+class _InstrumentedProxy:
+    """Proxy transparente: delega todo al componente y mide sus métodos públicos."""
+
+    def __init__(self, target, stage: str, instrumentation: PipelineInstrumentation):
+        self._target = target
+        self._stage = stage
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def measured(*args, **kwargs):
+            rows_in = next((n for n in map(_row_count, args) if n is not None), None)
+            path = next((a for a in args if isinstance(a, str) and os.path.isfile(a)), None)
+            bytes_read = os.path.getsize(path) if path else None
+            with self._instrumentation.measure(
+                self._stage, name, _infer_entity(name, args), rows_in=rows_in, bytes_read=bytes_read
+            ) as record:
+                result = attr(*args, **kwargs)
+                record["rows_out"] = _row_count(result)
+                return result
+
+        return measured
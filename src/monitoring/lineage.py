@@ -0,0 +1,93 @@
+import threading
+
+# Entidades del pipeline; los nombres de archivo o tabla se normalizan a ellas
+ENTITIES = ("clientes", "productos", "transacciones")
+
+# Valor de 'regla' para las filas de totales de una etapa
+STAGE_TOTAL = ""
+
+
+def normalize_entity(name: str) -> str:
+    """clientes_raw / productos_financieros / transacciones -> entidad del pipeline (o None)."""
+    if not name:
+        return None
+    head = name.split("_")[0]
+    return head if head in ENTITIES else None
+
+
+class RunLineage:
+    """
+    Contabilidad de filas de una corrida, lista para 'etl_stage_stats'.
+
+    Combina los registros de la instrumentación (filas de entrada/salida y
+    duración por etapa y entidad), los conteos por regla de los validadores
+    y los eventos que solo conoce el orquestador (ej. huérfanos por
+    integridad referencial). Una fila por (entidad, etapa, operación, regla).
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._extra = []
+        self._lock = threading.Lock()
+
+    def add(self, entidad: str, etapa: str, operacion: str, regla: str = STAGE_TOTAL,
+            filas_entrada: int = None, filas_salida: int = None, filas_rechazadas: int = None):
+        with self._lock:
+            self._extra.append({
+                "entidad": entidad, "etapa": etapa, "operacion": operacion, "regla": regla,
+                "filas_entrada": filas_entrada, "filas_salida": filas_salida,
+                "filas_rechazadas": filas_rechazadas, "duracion_s": None, "estado": "ok",
+            })
+
+    @staticmethod
+    def _from_records(records: list) -> dict:
+        """Agrupa los registros de instrumentación; los reintentos suman duración."""
+        rows = {}
+        for record in records:
+            entidad = normalize_entity(record.get("entity"))
+            if entidad is None:
+                continue
+            key = (entidad, record["stage"], record["operation"], STAGE_TOTAL)
+            row = rows.setdefault(key, {
+                "entidad": entidad, "etapa": record["stage"], "operacion": record["operation"],
+                "regla": STAGE_TOTAL, "duracion_s": 0.0,
+            })
+            row["duracion_s"] = round(row["duracion_s"] + (record.get("wall_s") or 0.0), 4)
+            # El último intento define filas y estado
+            row["filas_entrada"] = record.get("rows_in")
+            row["filas_salida"] = record.get("rows_out")
+            row["estado"] = record.get("status", "ok")
+            # Las filas que no salen de una validación (o de un shard limpia+valida) son rechazos de calidad
+            filtra = record["stage"] == "validate" or record["operation"].startswith("process_")
+            if filtra and row["filas_entrada"] is not None and row["filas_salida"] is not None:
+                row["filas_rechazadas"] = row["filas_entrada"] - row["filas_salida"]
+            else:
+                row["filas_rechazadas"] = None
+        return rows
+
+    def rows(self, records: list, rule_counts: list = ()) -> list:
+        """
+        Filas para etl_stage_stats. 'rule_counts' es una lista de dicts
+        {entidad: {regla: n}} (validador, shards...).
+        """
+        rows = self._from_records(records)
+        for counts in rule_counts:
+            for entidad, per_rule in counts.items():
+                for regla, n in per_rule.items():
+                    key = (entidad, "validate", "regla", regla)
+                    row = rows.setdefault(key, {
+                        "entidad": entidad, "etapa": "validate", "operacion": "regla", "regla": regla,
+                        "filas_entrada": None, "filas_salida": None, "filas_rechazadas": 0,
+                        "duracion_s": None, "estado": "ok",
+                    })
+                    row["filas_rechazadas"] += int(n)
+        with self._lock:
+            for extra in self._extra:
+                rows[(extra["entidad"], extra["etapa"], extra["operacion"], extra["regla"])] = dict(extra)
+        return [dict(row, run_id=self.run_id) for row in rows.values()]
+
+    @staticmethod
+    def loaded_rows(rows: list) -> int:
+        """Total de filas cargadas a la DB en la corrida (operaciones load_data exitosas)."""
+        return sum(r["filas_entrada"] or 0 for r in rows
+                   if r["operacion"] == "load_data" and r["estado"] == "ok")
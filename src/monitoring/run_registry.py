@@ -0,0 +1,92 @@
+import json
+
+from sqlalchemy import column, insert, table, text
+
+# Estados con los que se registra una corrida en etl_runs
+RUN_SUCCESS = "SUCCESS"
+RUN_FAILED = "FAILED"
+
+STAGE_STATS = table(
+    "etl_stage_stats",
+    column("run_id"), column("entidad"), column("etapa"), column("operacion"), column("regla"),
+    column("filas_entrada"), column("filas_salida"), column("filas_rechazadas"),
+    column("duracion_s"), column("estado"),
+)
+
+
+class RunRegistry:
+    """
+    Registro de corridas del pipeline en 'etl_runs' y 'etl_stage_stats'.
+
+    Cada corrida deja su estado, duración, los hashes de sus archivos de
+    origen, el rango de fechas de transacciones que cargó y si fue una
+    recarga completa (TRUNCATE previo). Los consumidores (ej. el caché del
+    dashboard) lo usan para saber qué datos cambiaron. La contabilidad de
+    filas por entidad, etapa y regla va a etl_stage_stats en un solo INSERT
+    multi-fila, en la misma transacción.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def record(self, run_id: str, started_at, finished_at, status: str,
+               fecha_min=None, fecha_max=None, full_reload: bool = False,
+               input_hashes: dict = None, loaded_rows: int = None, stage_stats: list = ()):
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO etl_runs (run_id, iniciado_en, finalizado_en, duracion_s, estado, fecha_min, fecha_max,
+                                      recarga_completa, hashes_entrada, filas_cargadas)
+                VALUES (:run_id, :iniciado_en, :finalizado_en, :duracion_s, :estado, :fecha_min, :fecha_max,
+                        :recarga_completa, CAST(:hashes_entrada AS JSONB), :filas_cargadas)
+                ON CONFLICT (run_id) DO UPDATE SET
+                    finalizado_en = EXCLUDED.finalizado_en,
+                    duracion_s = EXCLUDED.duracion_s,
+                    estado = EXCLUDED.estado,
+                    fecha_min = EXCLUDED.fecha_min,
+                    fecha_max = EXCLUDED.fecha_max,
+                    recarga_completa = EXCLUDED.recarga_completa,
+                    hashes_entrada = EXCLUDED.hashes_entrada,
+                    filas_cargadas = EXCLUDED.filas_cargadas
+            """), {
+                "run_id": run_id,
+                "iniciado_en": started_at,
+                "finalizado_en": finished_at,
+                "duracion_s": round((finished_at - started_at).total_seconds(), 3),
+                "estado": status,
+                "fecha_min": fecha_min,
+                "fecha_max": fecha_max,
+                "recarga_completa": full_reload,
+                "hashes_entrada": json.dumps(input_hashes or {}),
+                "filas_cargadas": loaded_rows,
+            })
+            conn.execute(text("DELETE FROM etl_stage_stats WHERE run_id = :run_id"), {"run_id": run_id})
+            if stage_stats:
+                # executemany sobre insert(): SQLAlchemy lo envía como un INSERT ... VALUES multi-fila
+                conn.execute(insert(STAGE_STATS), list(stage_stats))
+
+    def latest_successful(self) -> dict:
+        """Última corrida exitosa (o None si aún no hay ninguna)."""
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT run_id, finalizado_en, fecha_min, fecha_max, recarga_completa
+                FROM etl_runs WHERE estado = :estado
+                ORDER BY finalizado_en DESC LIMIT 1
+            """), {"estado": RUN_SUCCESS}).mappings().first()
+        return dict(row) if row else None
+
+    def successful_since(self, run_id: str) -> list:
+        """
+        Corridas exitosas terminadas después de 'run_id', en orden. Retorna
+        None si 'run_id' ya no está registrada (no se puede calcular el delta).
+        """
+        with self.engine.connect() as conn:
+            since = conn.execute(text("SELECT finalizado_en FROM etl_runs WHERE run_id = :run_id"),
+                                 {"run_id": run_id}).scalar()
+            if since is None:
+                return None
+            rows = conn.execute(text("""
+                SELECT run_id, finalizado_en, fecha_min, fecha_max, recarga_completa
+                FROM etl_runs WHERE estado = :estado AND finalizado_en > :since
+                ORDER BY finalizado_en
+            """), {"estado": RUN_SUCCESS, "since": since}).mappings().all()
+        return [dict(r) for r in rows]
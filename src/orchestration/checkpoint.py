@@ -0,0 +1,269 @@
+import ast
+import hashlib
+import inspect
+import json
+import os
+import threading
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.exchange import IPC_SUFFIX, open_ipc, write_ipc
+from src.utils.frames import is_arrow, is_empty, resolve_backend
+
+
+def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 de un archivo, leído por bloques (no carga el archivo completo)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def path_hash(path: str) -> str:
+    """Hash de un archivo o de un directorio (ej. Parquet particionado) completo."""
+    if not os.path.isdir(path):
+        return file_hash(path)
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            digest.update(os.path.relpath(full, path).encode())
+            digest.update(file_hash(full).encode())
+    return digest.hexdigest()
+
+
+# Raíz del proyecto: los módulos 'src.*' se resuelven a archivos bajo ella
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Variables de entorno que cambian el resultado de una etapa (motor, patrones, shards)
+STAGE_SETTINGS = ("ETL_BACKEND", "ETL_PATTERNS", "ETL_SHARDS")
+
+
+def _module_file(module: str) -> str:
+    """Archivo de un módulo 'src.*' (o None si el nombre no es un módulo del proyecto)."""
+    base = os.path.join(BASE_DIR, *module.split("."))
+    for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def source_files(path: str) -> list:
+    """
+    Un archivo fuente y todos los módulos 'src.*' que importa (directa o
+    transitivamente, incluidos los imports dentro de funciones), ordenados.
+    """
+    seen, pending = set(), [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        with open(current, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=current)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                # 'from src.transform import money' importa el submódulo 'money'
+                modules = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for module in modules:
+                if module == "src" or not module.startswith("src."):
+                    continue
+                found = _module_file(module)
+                if found and found not in seen:
+                    pending.append(found)
+    return sorted(seen)
+
+
+def settings_fingerprint() -> str:
+    """Valores vigentes de STAGE_SETTINGS, serializados de forma estable."""
+    return json.dumps({name: os.getenv(name) for name in STAGE_SETTINGS}, sort_keys=True)
+
+
+def code_fingerprint(cls) -> str:
+    """
+    Huella del código que implementa una etapa: el módulo de la clase y los
+    módulos 'src.*' de los que depende. Si cambian las reglas (o un backend
+    o patrón que usan), cambia la huella.
+    Acepta una tupla de clases para etapas que combinan varios componentes.
+    """
+    if isinstance(cls, (tuple, list)):
+        return hashlib.sha256("".join(code_fingerprint(c) for c in cls).encode()).hexdigest()
+    digest = hashlib.sha256()
+    for path in source_files(inspect.getsourcefile(cls)):
+        digest.update(os.path.relpath(path, BASE_DIR).encode())
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Checkpoints por etapa para reanudar el pipeline.
+
+    Cada etapa (extract -> transform -> validate) de cada entidad persiste su
+    salida como archivo Arrow IPC y registra en un manifiesto la llave con la que se
+    produjo. La llave encadena el hash del archivo de origen con la huella
+    del código de cada etapa y la configuración que la afecta (STAGE_SETTINGS),
+    de modo que un cambio en los datos crudos, en las reglas o en el motor
+    invalida esa etapa y todas las siguientes.
+
+    El manifiesto también guarda las tareas del DAG ya completadas por la
+    corrida en curso, para que un '--resume' retome desde la primera que falló.
+
+    El mismo archivo es el canal entre etapas: con tablas Arrow, la etapa
+    siguiente recibe la vista memory-mapped del checkpoint en lugar de la
+    copia en memoria, así el traspaso no duplica datos.
+    """
+
+    def __init__(self, base_dir: str, resume: bool = False):
+        self.base_dir = base_dir
+        self.resume = resume
+        self.manifest_path = os.path.join(base_dir, "manifest.json")
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+        self.manifest = self._read_manifest()
+        # Hash del archivo de origen de cada entidad procesada (linaje de la corrida)
+        self.input_hashes = {}
+
+    # ------------------------------------------------------------------
+    # Manifiesto
+    # ------------------------------------------------------------------
+    def _read_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {"stages": {}, "run": {"run_id": None, "completed_tasks": []}}
+
+    def _write_manifest(self):
+        # Escritura atómica: un fallo a mitad no deja un manifiesto corrupto
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    # ------------------------------------------------------------------
+    # Estado de la corrida (tareas del DAG)
+    # ------------------------------------------------------------------
+    def begin_run(self, run_id: str, keep_completed: bool = None) -> list:
+        """
+        Registra el inicio de una corrida. Con resume=True conserva las tareas
+        completadas por la corrida interrumpida y las retorna; si no, las olvida.
+        'keep_completed' permite decidirlo aparte de la reutilización de etapas.
+        """
+        if keep_completed is None:
+            keep_completed = self.resume
+        with self._lock:
+            run = self.manifest["run"]
+            completed = list(run["completed_tasks"]) if keep_completed else []
+            if completed:
+                print(f"♻️  Reanudando corrida {run['run_id']}: tareas ya completadas {completed}")
+            self.manifest["run"] = {"run_id": run_id, "completed_tasks": completed}
+            self._write_manifest()
+        return completed
+
+    def mark_task_done(self, task_name: str):
+        with self._lock:
+            completed = self.manifest["run"]["completed_tasks"]
+            if task_name not in completed:
+                completed.append(task_name)
+            self._write_manifest()
+
+    def finish_run(self):
+        """La corrida terminó completa: la próxima empezará desde la preparación de la DB."""
+        with self._lock:
+            self.manifest["run"]["completed_tasks"] = []
+            self._write_manifest()
+
+    # ------------------------------------------------------------------
+    # Checkpoints de etapas
+    # ------------------------------------------------------------------
+    def _path(self, entity: str, stage: str) -> str:
+        return os.path.join(self.base_dir, entity, f"{stage}{IPC_SUFFIX}")
+
+    def _is_valid(self, entity: str, stage: str, key: str) -> bool:
+        entry = self.manifest["stages"].get(entity, {}).get(stage)
+        return bool(entry) and entry["input_hash"] == key and os.path.exists(entry["path"])
+
+    def _save(self, entity: str, stage: str, key: str, df) -> str:
+        """
+        Persiste la salida de una etapa. Si no se puede representar en Arrow
+        (ej. una columna cruda con tipos mezclados antes de validar), la etapa
+        se omite del checkpoint con una advertencia y la corrida continúa.
+        """
+        try:
+            path = write_ipc(df, self._path(entity, stage))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            print(f"   ⚠️  Sin checkpoint para {entity}/{stage}: {e}")
+            return None
+        with self._lock:
+            self.manifest["stages"].setdefault(entity, {})[stage] = {
+                "input_hash": key,
+                "path": path,
+                "format": "arrow" if is_arrow(df) else "pandas",
+                "rows": len(df),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._write_manifest()
+        return path
+
+    @staticmethod
+    def _load(entry: dict):
+        """
+        Lee un checkpoint por memory-map (los de versiones previas están en Parquet).
+        Se entrega en el tipo del motor activo, sin importar con cuál se escribió.
+        """
+        path = entry["path"]
+        table = pq.read_table(path) if path.endswith(".parquet") else open_ipc(path)
+        return table if resolve_backend() == "arrow" else table.to_pandas()
+
+    def run_stages(self, entity: str, source_path: str, steps: list):
+        """
+        Ejecuta la cadena de etapas de una entidad.
+
+        'steps' es una lista de (nombre_etapa, funcion, clase_que_implementa):
+        la primera función no recibe datos (extracción); cada siguiente recibe
+        el DataFrame (o tabla Arrow) de la anterior. Con resume=True se carga el último
+        checkpoint válido y solo se recalculan las etapas posteriores.
+        """
+        if not os.path.exists(source_path):
+            # Sin archivo no hay llave: el extractor reporta el error y retorna vacío
+            return steps[0][1]()
+
+        keys = []
+        key = path_hash(source_path)
+        with self._lock:
+            self.input_hashes[entity] = key
+        key = hashlib.sha256(f"{key}|{settings_fingerprint()}".encode()).hexdigest()
+        for stage, _, cls in steps:
+            key = hashlib.sha256(f"{key}|{stage}|{code_fingerprint(cls)}".encode()).hexdigest()
+            keys.append(key)
+
+        start, df = 0, None
+        if self.resume:
+            for i in reversed(range(len(steps))):
+                stage = steps[i][0]
+                if self._is_valid(entity, stage, keys[i]):
+                    print(f"   ♻️  Checkpoint válido: {entity}/{stage} (se omiten {i + 1} etapa(s))")
+                    df = self._load(self.manifest["stages"][entity][stage])
+                    start = i + 1
+                    break
+
+        for i in range(start, len(steps)):
+            stage, func, _ = steps[i]
+            df = func() if i == 0 else func(df)
+            if is_empty(df):
+                # Un resultado vacío suele ser un error de lectura: no se cachea
+                return df
+            path = self._save(entity, stage, keys[i], df)
+            if path is not None and is_arrow(df):
+                # Traspaso sin copia: la siguiente etapa lee el checkpoint mapeado
+                # y la tabla producida en memoria se libera
+                df = open_ipc(path)
+        return df
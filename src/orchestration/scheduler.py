@@ -0,0 +1,141 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Estados posibles de una tarea al final de la ejecución
+SUCCESS = "SUCCESS"
+FAILED = "FAILED"
+UPSTREAM_FAILED = "UPSTREAM_FAILED"
+NOT_SELECTED = "NOT_SELECTED"
+
+
+class Task:
+    """Unidad de trabajo del DAG: una función sin argumentos con dependencias declaradas."""
+
+    def __init__(self, name: str, func, depends_on=(), retries: int = 0, retry_delay: float = 1.0):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    def __repr__(self):
+        return f"Task({self.name!r}, depends_on={self.depends_on})"
+
+
+class DAGScheduler:
+    """
+    Orquestador mínimo de tareas con dependencias (DAG).
+    Ejecuta en paralelo, sobre un pool de workers, toda tarea cuyas
+    dependencias ya terminaron con éxito. Si una tarea falla (tras agotar
+    sus reintentos), sus descendientes se marcan como UPSTREAM_FAILED.
+    """
+
+    def __init__(self, max_workers: int = 4, logger: logging.Logger = None):
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger(__name__)
+        self.tasks = {}
+        self.results = {}
+
+    def add_task(self, name: str, func, depends_on=(), retries: int = 0, retry_delay: float = 1.0) -> Task:
+        if name in self.tasks:
+            raise ValueError(f"Tarea duplicada en el DAG: {name}")
+        task = Task(name, func, depends_on, retries, retry_delay)
+        self.tasks[name] = task
+        return task
+
+    def topological_order(self) -> list:
+        """Orden topológico (Kahn). Valida dependencias desconocidas y ciclos."""
+        for task in self.tasks.values():
+            for dep in task.depends_on:
+                if dep not in self.tasks:
+                    raise ValueError(f"La tarea '{task.name}' depende de '{dep}', que no existe.")
+
+        pending = {name: len(task.depends_on) for name, task in self.tasks.items()}
+        ready = [name for name, n in pending.items() if n == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in self._children(name):
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(self.tasks):
+            cyclic = sorted(set(self.tasks) - set(order))
+            raise ValueError(f"El DAG contiene un ciclo entre: {cyclic}")
+        return order
+
+    def _children(self, name: str) -> list:
+        return [t.name for t in self.tasks.values() if name in t.depends_on]
+
+    def _run_task(self, task: Task):
+        """Ejecuta una tarea con su política de reintentos."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                start = time.perf_counter()
+                result = task.func()
+                elapsed = time.perf_counter() - start
+                self.logger.info(f"[DAG] Tarea '{task.name}' OK ({elapsed:.2f}s, intento {attempt})")
+                return result
+            except Exception as e:
+                if attempt > task.retries:
+                    raise
+                self.logger.warning(
+                    f"[DAG] Tarea '{task.name}' falló (intento {attempt}/{task.retries + 1}): {e}. Reintentando..."
+                )
+                time.sleep(task.retry_delay * attempt)
+
+    def run(self, only=None) -> dict:
+        """
+        Ejecuta el DAG y retorna {tarea: estado}.
+
+        'only' permite correr un subconjunto de tareas; las dependencias que
+        quedan fuera de la selección se asumen ya satisfechas (por ejemplo,
+        dimensiones cargadas en una corrida anterior).
+        """
+        order = self.topological_order()
+        selected = set(self.tasks) if only is None else set(only)
+        unknown = selected - set(self.tasks)
+        if unknown:
+            raise ValueError(f"Tareas desconocidas: {sorted(unknown)}")
+
+        status = {name: NOT_SELECTED for name in order if name not in selected}
+        remaining = [name for name in order if name in selected]
+        self.results = {}
+
+        def is_ready(name):
+            return all(status.get(dep) in (SUCCESS, NOT_SELECTED) for dep in self.tasks[name].depends_on)
+
+        def is_blocked(name):
+            return any(status.get(dep) in (FAILED, UPSTREAM_FAILED) for dep in self.tasks[name].depends_on)
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="etl-dag") as pool:
+            while remaining or running:
+                for name in list(remaining):
+                    if is_blocked(name):
+                        status[name] = UPSTREAM_FAILED
+                        remaining.remove(name)
+                        self.logger.warning(f"[DAG] Tarea '{name}' omitida: una dependencia falló.")
+                    elif is_ready(name):
+                        running[pool.submit(self._run_task, self.tasks[name])] = name
+                        remaining.remove(name)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                        status[name] = SUCCESS
+                    except Exception as e:
+                        status[name] = FAILED
+                        self.logger.error(f"[DAG] Tarea '{name}' FALLÓ: {e}", exc_info=True)
+
+        return {name: status[name] for name in order}
@@ -0,0 +1,158 @@
+import glob
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.transform import arrow_backend as transform_arrow
+from src.transform import money
+from src.quality.validator import QUARANTINE_ARCHIVE, quarantine_archive_dir
+from src.utils.exchange import IPC_SUFFIX, open_ipc, write_ipc
+from src.utils.frames import resolve_backend, to_arrow, like_input
+
+
+def _process_shard(shard_idx: int, in_path: str, out_path: str, error_dir: str, backend: str) -> tuple:
+    """
+    Worker: limpia y valida un shard completo en su propio proceso.
+    Cada shard escribe su cuarentena en 'error_dir' para no pisar a los demás.
+    """
+    from src.transform.transformer import DataTransformer
+    from src.quality.validator import DataValidator
+
+    table = open_ipc(in_path)
+    data = table if backend == "arrow" else table.to_pandas()
+    clean = DataTransformer(backend).clean_transacciones(data)
+    validator = DataValidator(backend, error_dir=error_dir)
+    valid = validator.validate_transacciones(clean)
+    result = to_arrow(valid)
+    write_ipc(result, out_path)
+    return shard_idx, table.num_rows, result.num_rows, validator.rule_counts
+
+
+class ShardedProcessor:
+    """
+    Procesamiento de transacciones repartido en varios núcleos.
+
+    Las filas se reparten por hash del cliente_id normalizado, de modo que
+    todas las transacciones de un cliente caen en el mismo shard. Cada shard
+    se entrega a un proceso worker como archivo Arrow IPC (memory-mapped, sin
+    serializar con pickle), se limpia y valida de forma independiente, y el
+    resultado vuelve por el mismo mecanismo para concatenarse sin copias.
+    """
+
+    def __init__(self, n_shards: int = None, workers: int = None, backend: str = None,
+                 work_dir: str = None, error_dir: str = None):
+        self.n_shards = n_shards or os.cpu_count() or 1
+        self.workers = min(workers or self.n_shards, self.n_shards)
+        self.backend = resolve_backend(backend)
+        # /dev/shm (tmpfs) evita tocar disco cuando está disponible
+        self.work_dir = work_dir or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.error_dir = error_dir or os.path.join(base_dir, "data", "error")
+        # Conteos por regla de todos los shards (mismo formato que DataValidator.rule_counts)
+        self.rule_counts = {}
+
+    @classmethod
+    def from_env(cls):
+        """Configuración por entorno: ETL_SHARDS (>1 activa el modo) y ETL_SHARD_WORKERS."""
+        n_shards = int(os.getenv("ETL_SHARDS", "0"))
+        if n_shards <= 1:
+            return None
+        workers = os.getenv("ETL_SHARD_WORKERS")
+        return cls(n_shards=n_shards, workers=int(workers) if workers else None)
+
+    def shard_ids(self, table: pa.Table) -> pa.Array:
+        """
+        Shard destino de cada fila. El hash se calcula sobre los valores únicos
+        del cliente_id ya normalizado (strip/upper), así ' c0001' y 'C0001'
+        caen juntos, y es estable entre procesos y corridas.
+        """
+        keys = pc.dictionary_encode(transform_arrow.clean_id(table["cliente_id"])).combine_chunks()
+        uniques = np.asarray(keys.dictionary.to_pylist(), dtype=object)
+        shard_of_key = pd.util.hash_array(uniques) % np.uint64(self.n_shards)
+        return pc.take(pa.array(shard_of_key.astype(np.int32)), keys.indices)
+
+    def split(self, table: pa.Table) -> list:
+        """Reparte la tabla en n_shards tablas (una sola pasada de ordenamiento)."""
+        ids = self.shard_ids(table)
+        order = pc.sort_indices(ids)
+        ordered = table.take(order)
+        counts = np.bincount(ids.to_numpy(zero_copy_only=False), minlength=self.n_shards)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return [ordered.slice(offsets[i], counts[i]) for i in range(self.n_shards)]
+
+    def process_transacciones(self, df):
+        """Limpia + valida transacciones en paralelo. Retorna el mismo tipo que la entrada."""
+        table = to_arrow(df)
+        run_dir = tempfile.mkdtemp(prefix="etl_shards_", dir=self.work_dir)
+        try:
+            jobs = []
+            for idx, shard in enumerate(self.split(table)):
+                if shard.num_rows == 0:
+                    continue
+                in_path = os.path.join(run_dir, f"shard-{idx:03d}.in.arrow")
+                write_ipc(shard, in_path)
+                error_dir = os.path.join(run_dir, f"error-{idx:03d}")
+                os.makedirs(error_dir)
+                jobs.append((idx, in_path, os.path.join(run_dir, f"shard-{idx:03d}.out.arrow"), error_dir))
+            del table
+
+            print(f"   🧩 {len(jobs)} shards por cliente_id -> {self.workers} procesos")
+            # 'spawn' evita heredar locks del pool de hilos del DAG al hacer fork
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                futures = [pool.submit(_process_shard, idx, in_path, out_path, error_dir, self.backend)
+                           for idx, in_path, out_path, error_dir in jobs]
+                stats = [f.result() for f in futures]
+
+            rows_in = sum(s[1] for s in stats)
+            rows_out = sum(s[2] for s in stats)
+            print(f"   ✔ Shards: {rows_in} filas -> {rows_out} aprobadas")
+            for *_, counts in stats:
+                for entity, per_rule in counts.items():
+                    merged = self.rule_counts.setdefault(entity, {})
+                    for rule, n in per_rule.items():
+                        merged[rule] = merged.get(rule, 0) + n
+            self._merge_quarantine(run_dir)
+
+            parts = [open_ipc(out_path) for _, _, out_path, _ in jobs]
+            result = pa.concat_tables(parts) if parts else to_arrow(df).slice(0, 0)
+            output = like_input(result, df)
+            if isinstance(df, pd.DataFrame) and money.CENTS_COLUMN in result.column_names:
+                # Centavos como Int64, igual que sin shards (to_pandas los pasaría a float64)
+                output[money.CENTS_COLUMN] = money.cents_series(result[money.CENTS_COLUMN], output.index)
+            return output
+        finally:
+            # En Linux el mapeo sigue vivo tras borrar el archivo; en Windows se ignora el error
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    def _merge_quarantine(self, run_dir: str):
+        """Une las cuarentenas de cada shard en un único archivo por entidad."""
+        by_name = {}
+        for path in sorted(glob.glob(os.path.join(run_dir, "error-*", "*.csv"))):
+            by_name.setdefault(os.path.basename(path), []).append(path)
+
+        os.makedirs(self.error_dir, exist_ok=True)
+        for name, paths in by_name.items():
+            target = os.path.join(self.error_dir, name)
+            with open(target, "wb") as out:
+                for i, path in enumerate(paths):
+                    with open(path, "rb") as f:
+                        header = f.readline()
+                        if i == 0:
+                            out.write(header)
+                        shutil.copyfileobj(f, out)
+            print(f"   ⚠️  Cuarentena consolidada de {len(paths)} shards -> {target}")
+
+        # El histórico IPC ya tiene un archivo por shard: basta moverlos
+        for path in glob.glob(os.path.join(run_dir, "error-*", QUARANTINE_ARCHIVE, "*", "*" + IPC_SUFFIX)):
+            entity = os.path.basename(os.path.dirname(path))
+            target_dir = quarantine_archive_dir(self.error_dir, entity)
+            os.makedirs(target_dir, exist_ok=True)
+            shutil.move(path, os.path.join(target_dir, os.path.basename(path)))
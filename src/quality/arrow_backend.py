@@ -0,0 +1,117 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.quality.patterns import PatternValidator
+from src.transform.money import CENTS_COLUMN
+
+# Columnas de ID cuyo formato se valida en cada entidad (si tienen patrón configurado)
+ID_COLUMNS = {
+    "clientes": ("cliente_id",),
+    "transacciones": ("transaccion_id", "cliente_id", "producto_id"),
+}
+
+REASON_CLIENTES = "Invalid ID, Email, Name, Format or Duplicate"
+REASON_TRANSACCIONES = "Monto invalido (<= 0, no numerico o fuera de rango), Fecha nula o ID con formato invalido"
+
+
+def _is_blank(arr):
+    """Nulo o cadena vacía (equivale a isnull() | == '')."""
+    if pa.types.is_null(arr.type):
+        return pc.is_null(arr)
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return pc.is_null(arr)
+    return pc.or_(pc.is_null(arr), pc.fill_null(pc.equal(arr, ""), False))
+
+
+def _duplicated_keep_first(table: pa.Table, column: str):
+    """Equivalente de df.duplicated(subset=[column], keep='first') con group_by de Arrow."""
+    idx = pa.array(range(table.num_rows), pa.int64())
+    first = (
+        pa.table({column: table[column], "__idx": idx})
+        .group_by(column)
+        .aggregate([("__idx", "min")])
+    )
+    return pc.invert(pc.is_in(idx, value_set=first["__idx_min"]))
+
+
+def _split(table: pa.Table, rules: dict, reason: str):
+    """
+    Separa (aprobados, rechazados, conteos) a partir de {regla: máscara de fallo}
+    y anota el motivo en los rechazados. 'conteos' trae las filas que incumple
+    cada regla (una fila puede incumplir varias).
+    """
+    masks = {rule: pc.fill_null(mask, False) for rule, mask in rules.items()}
+    counts = {rule: pc.sum(mask).as_py() or 0 for rule, mask in masks.items()}
+    mask_fail = None
+    for mask in masks.values():
+        mask_fail = mask if mask_fail is None else pc.or_(mask_fail, mask)
+    rejected = table.filter(mask_fail)
+    rejected = rejected.append_column("error_reason", pa.array([reason] * rejected.num_rows, pa.string()))
+    return table.filter(pc.invert(mask_fail)), rejected, counts
+
+
+def _format_rules(table: pa.Table, entity: str, patterns: PatternValidator, skip=None) -> dict:
+    """{formato_<columna>: máscara} para las columnas de ID con patrón; 'skip' excluye filas ya reportadas."""
+    rules = {}
+    for column in ID_COLUMNS[entity]:
+        if column in table.column_names and patterns.has(column):
+            mask = patterns.invalid(column, table[column])
+            rules[f"formato_{column}"] = mask if skip is None else pc.and_(mask, pc.invert(skip))
+    return rules
+
+
+def _email_rule(email, patterns: PatternValidator):
+    if patterns.has("email"):
+        return patterns.invalid("email", email, null_fails=True)
+    has_at = pc.match_substring(email if pa.types.is_string(email.type) else pc.cast(email, pa.string()), "@")
+    return pc.invert(pc.fill_null(has_at, False))
+
+
+def validate_clientes(table: pa.Table, patterns: PatternValidator = None):
+    """Mismas reglas que DataValidator.validate_clientes. Retorna (aprobados, rechazados, conteos)."""
+    patterns = patterns or PatternValidator.from_env()
+    id_blank = _is_blank(table["cliente_id"])
+    return _split(table, {
+        "id_nulo": id_blank,
+        "email_invalido": _email_rule(table["email"], patterns),
+        "duplicado": _duplicated_keep_first(table, "cliente_id"),
+        "nombre_nulo": _is_blank(table["nombre"]),
+        # Un ID vacío ya cuenta como id_nulo
+        **_format_rules(table, "clientes", patterns, skip=id_blank),
+    }, REASON_CLIENTES)
+
+
+def validate_transacciones(table: pa.Table, patterns: PatternValidator = None):
+    """Mismas reglas que DataValidator.validate_transacciones. Retorna (aprobados, rechazados, conteos)."""
+    patterns = patterns or PatternValidator.from_env()
+    return _split(table, {
+        "monto_no_positivo": pc.less_equal(table[CENTS_COLUMN], 0),
+        # La limpieza deja nulo lo no numérico o fuera de DECIMAL(15, 2)
+        "monto_nulo": pc.is_null(table[CENTS_COLUMN]),
+        "fecha_nula": pc.is_null(table["fecha_transaccion"]),
+        **_format_rules(table, "transacciones", patterns),
+    }, REASON_TRANSACCIONES)
+
+
+def _referential_mask(table: pa.Table, valid_ids: dict):
+    mask = None
+    for column, ids in valid_ids.items():
+        ok = pc.fill_null(pc.is_in(pc.cast(table[column], pa.string()), value_set=pa.array(ids, pa.string())), False)
+        mask = ok if mask is None else pc.and_(mask, ok)
+    return mask
+
+
+def filter_referential(table: pa.Table, valid_ids: dict) -> pa.Table:
+    """Conserva las filas cuyas llaves foráneas existen en {columna: ids válidos}."""
+    mask = _referential_mask(table, valid_ids)
+    return table if mask is None else table.filter(mask)
+
+
+def split_referential(table: pa.Table, valid_ids: dict, reason: str):
+    """Como filter_referential, pero retorna también los huérfanos (con su motivo)."""
+    mask = _referential_mask(table, valid_ids)
+    if mask is None:
+        return table, table.slice(0, 0)
+    orphans = table.filter(pc.invert(mask))
+    orphans = orphans.append_column("error_reason", pa.array([reason] * orphans.num_rows, pa.string()))
+    return table.filter(mask), orphans
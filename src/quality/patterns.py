@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Patrones por columna (RE2). ETL_PATTERNS='{"columna": "regex"}' los reemplaza o
+# agrega; un valor null desactiva la regla de esa columna.
+_EMAIL_LABEL = r"[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?"
+DEFAULT_PATTERNS = {
+    # Parte local estilo RFC 5322 (sin comillas) + dominio con al menos un punto
+    "email": rf"^[a-z0-9!#$%&'*+/=?^_`{{|}}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{{|}}~-]+)*@(?:{_EMAIL_LABEL}\.)+[a-z]{{2,}}$",
+    "cliente_id": r"^C\d{4,}$",
+    "producto_id": r"^P\d{2,}$",
+    "transaccion_id": r"^TX\d{6,}$",
+}
+
+# Valores distintos que se recuerdan por columna entre lotes (acota el costo
+# de buscar en el caché, que se paga en cada lote)
+PATTERN_CACHE_SIZE = 250_000
+
+
+class PatternValidator:
+    """
+    Validación de formato por columna con kernels regex de Arrow (RE2).
+
+    Cada patrón se valida una sola vez al crear la instancia. Por lote solo
+    se evalúan los valores distintos (pc.unique) y el resultado se expande a
+    todas las filas con index_in + take. Además, cada columna guarda un caché
+    (valores, resultados) entre lotes: un valor ya visto (el mismo cliente o
+    producto en miles de transacciones) no vuelve a pasar por la regex. El
+    caché tiene tope 'cache_size': al llenarse descarta los valores más
+    antiguos, y un lote con más valores distintos que el tope no lo usa.
+    """
+
+    def __init__(self, patterns: dict = None, cache_size: int = PATTERN_CACHE_SIZE):
+        merged = dict(DEFAULT_PATTERNS)
+        merged.update(patterns or {})
+        self.patterns = {column: pattern for column, pattern in merged.items() if pattern}
+        self.cache_size = cache_size
+        self._options = {}
+        for column, pattern in self.patterns.items():
+            options = pc.MatchSubstringOptions(pattern, ignore_case=column == "email")
+            # Un patrón inválido falla aquí, no a mitad de una corrida
+            pc.match_substring_regex(pa.array([""]), options=options)
+            self._options[column] = options
+        self._cache = {}
+        self._locks = {column: threading.Lock() for column in self.patterns}
+
+    @classmethod
+    def from_env(cls):
+        raw = os.getenv("ETL_PATTERNS")
+        return cls(json.loads(raw) if raw else None)
+
+    def has(self, column: str) -> bool:
+        return column in self.patterns
+
+    @staticmethod
+    def _as_arrow(values):
+        if isinstance(values, pd.Series):
+            try:
+                values = pa.array(values, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                values = pa.array(values.astype(str))
+        return values if pa.types.is_string(values.type) else pc.cast(values, pa.string())
+
+    def _match_uniques(self, column: str, uniques: pa.Array) -> pa.Array:
+        """Resultado de la regex para cada valor distinto, usando y ampliando el caché."""
+        options = self._options[column]
+        if len(uniques) > self.cache_size:
+            # El lote no cabe en el caché: se evalúa directo, sin buscar ni guardar
+            return pc.match_substring_regex(uniques, options=options)
+
+        # Lectura, ampliación y escritura en una sola sección crítica por columna
+        with self._locks[column]:
+            cached = self._cache.get(column)
+            if cached is None:
+                return self._store(column, uniques, pc.match_substring_regex(uniques, options=options))
+            values, results = cached
+            positions = pc.index_in(uniques, value_set=values)
+            known = pc.take(results, positions)
+            missing_mask = pc.is_null(positions)
+            missing = uniques.filter(missing_mask)
+            if len(missing) == 0:
+                return known
+            fresh = pc.match_substring_regex(missing, options=options)
+            self._store(column, pa.concat_arrays([values, missing]), pa.concat_arrays([results, fresh]))
+            return pc.replace_with_mask(known, missing_mask, fresh)
+
+    def _store(self, column: str, values: pa.Array, results: pa.Array) -> pa.Array:
+        """Guarda el caché de 'column' descartando los valores más antiguos por encima del tope."""
+        overflow = len(values) - self.cache_size
+        if overflow > 0:
+            values, results = values.slice(overflow), results.slice(overflow)
+        self._cache[column] = (values, results)
+        return results
+
+    def matches(self, column: str, values) -> pa.Array:
+        """True/False por fila según el patrón de 'column' (nulo donde el valor es nulo)."""
+        values = self._as_arrow(values)
+        uniques = pc.unique(values)
+        return pc.take(self._match_uniques(column, uniques), pc.index_in(values, value_set=uniques))
+
+    def invalid(self, column: str, values, null_fails: bool = False) -> pa.Array:
+        """Máscara de fallo: valores que no cumplen el patrón (los nulos según 'null_fails')."""
+        return pc.fill_null(pc.invert(self.matches(column, values)), null_fails)
+
+    def invalid_series(self, column: str, series: pd.Series, null_fails: bool = False) -> pd.Series:
+        """Igual que invalid(), como Series booleana alineada al índice (motor pandas)."""
+        mask = self.invalid(column, series, null_fails).to_numpy(zero_copy_only=False)
+        return pd.Series(mask, index=series.index)
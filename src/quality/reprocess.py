@@ -0,0 +1,254 @@
+import glob
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import text
+
+from src.load.loader import SCD2_DIMENSIONS
+from src.quality import arrow_backend as rules
+from src.quality.patterns import PatternValidator
+from src.quality.validator import quarantine_archive_dir, quarantine_written_at
+from src.transform import arrow_backend as transform
+from src.transform.money import encode_money
+from src.utils.exchange import IPC_SUFFIX, iter_ipc_batches
+
+# Filas por lote del reproceso (cada lote se carga en su propia transacción)
+REPROCESS_CHUNK_ROWS = 100_000
+
+# Entidades con cuarentena, en orden: un cliente recuperado puede rescatar transacciones huérfanas
+REPROCESSABLE = ("clientes", "transacciones")
+KEY_COLUMNS = {"clientes": "cliente_id", "transacciones": "transaccion_id"}
+DATE_COLUMNS = {"clientes": "fecha_registro", "transacciones": "fecha_transaccion"}
+TRANSFORMS = {"clientes": transform.clean_clientes, "transacciones": transform.clean_transacciones}
+VALIDATIONS = {"clientes": rules.validate_clientes, "transacciones": rules.validate_transacciones}
+
+
+class QuarantineReprocessor:
+    """
+    Reproceso de la cuarentena sin correr el pipeline completo.
+
+    Recorre el histórico de cuarentena (Arrow IPC, por lotes y memory-mapped)
+    de un rango de fechas, vuelve a aplicar la limpieza y las reglas de
+    calidad vigentes a las filas tal como llegaron (el validador guarda los
+    valores crudos, no los ya convertidos) y carga lo que ahora las cumple. La integridad se
+    verifica en la DB: cada lote aprobado se copia a una tabla temporal y
+    solo se insertan las filas cuyas llaves existen (transacciones) o que aún
+    no están en la dimensión (clientes). Las filas recuperadas quedan en
+    'cuarentena_recuperados' y no se vuelven a procesar (las marcas de
+    transacciones se borran junto con la tabla de hechos en cada recarga).
+
+    Solo se leen los archivos escritos desde la última recarga completa
+    registrada en etl_runs: los anteriores son de extractos ya reemplazados
+    (se conservan para auditoría, pero reprocesarlos podría reinsertar
+    transacciones que el origen ya no trae).
+
+    La corrida se registra en etl_runs para que el dashboard refresque los
+    días con transacciones recuperadas.
+    """
+
+    def __init__(self, loader, error_dir: str = None, chunk_rows: int = REPROCESS_CHUNK_ROWS):
+        self.loader = loader
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.error_dir = error_dir or os.path.join(base_dir, "data", "error")
+        self.chunk_rows = chunk_rows
+        # Un solo validador de patrones para todos los lotes (su caché se reutiliza)
+        self.patterns = PatternValidator.from_env()
+        self.run_id = f"reproceso_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+    # ------------------------------------------------------------------
+    # Lectura de la cuarentena
+    # ------------------------------------------------------------------
+    def files(self, entity: str, since: datetime = None) -> list:
+        """Archivos de cuarentena de 'entity'; con 'since', solo los escritos desde entonces."""
+        paths = sorted(glob.glob(os.path.join(quarantine_archive_dir(self.error_dir, entity), "*" + IPC_SUFFIX)))
+        if since is None:
+            return paths
+        # El nombre guarda la hora al segundo
+        since = since.replace(microsecond=0)
+        return [path for path in paths if (quarantine_written_at(path) or since) >= since]
+
+    def last_full_reload(self):
+        """Inicio de la última corrida que vació la tabla de hechos (None si no hay ninguna)."""
+        with self.loader.engine.connect() as conn:
+            return conn.execute(text("SELECT MAX(iniciado_en) FROM etl_runs WHERE recarga_completa")).scalar()
+
+    def chunks(self, entity: str, desde=None, hasta=None, since: datetime = None):
+        """Lotes de la cuarentena de 'entity' con fecha en [desde, hasta] (ambos incluidos)."""
+        column = DATE_COLUMNS[entity]
+        for path in self.files(entity, since):
+            for batch in iter_ipc_batches(path):
+                table = pa.Table.from_batches([batch])
+                if desde is not None or hasta is not None:
+                    # La cuarentena guarda la fila cruda: la fecha se parsea igual que en la limpieza
+                    fechas = transform.to_timestamp(table[column])
+                    mask = pa.scalar(True)
+                    if desde is not None:
+                        mask = pc.and_(mask, pc.greater_equal(fechas, pa.scalar(pd.Timestamp(desde), pa.timestamp("ns"))))
+                    if hasta is not None:
+                        limite = pd.Timestamp(hasta) + pd.Timedelta(days=1)
+                        mask = pc.and_(mask, pc.less(fechas, pa.scalar(limite, pa.timestamp("ns"))))
+                    table = table.filter(pc.fill_null(mask, False))
+                for offset in range(0, table.num_rows, self.chunk_rows):
+                    yield table.slice(offset, self.chunk_rows)
+
+    def _recovered_keys(self, entity: str) -> pa.Array:
+        with self.loader.engine.connect() as conn:
+            keys = conn.execute(text("SELECT llave FROM cuarentena_recuperados WHERE entidad = :entidad"),
+                                {"entidad": entity}).scalars().all()
+        return pa.array(keys, pa.string())
+
+    # ------------------------------------------------------------------
+    # Carga con integridad del lado de la DB
+    # ------------------------------------------------------------------
+    def _mark(self, conn, entity: str, keys: list) -> list:
+        if not keys:
+            return []
+        return conn.execute(text("""
+            INSERT INTO cuarentena_recuperados (entidad, llave, run_id)
+            SELECT :entidad, llave, :run_id FROM unnest(CAST(:llaves AS TEXT[])) AS llave
+            ON CONFLICT DO NOTHING
+            RETURNING llave
+        """), {"entidad": entity, "run_id": self.run_id, "llaves": keys}).scalars().all()
+
+    def _load_transacciones(self, conn, approved: pa.Table) -> tuple:
+        """Inserta las transacciones cuyas llaves foráneas existen. Retorna (recuperadas, marcadas, días)."""
+        table = encode_money(approved)
+        self.loader.partitions.ensure_partitions(table["fecha_transaccion"])
+        conn.execute(text("CREATE TEMP TABLE _reproceso_transacciones (LIKE transacciones) ON COMMIT DROP"))
+        self.loader._copy_tables(conn, {"_reproceso_transacciones": table})
+
+        columns = ", ".join(table.column_names)
+        inserted = conn.execute(text(f"""
+            INSERT INTO transacciones ({columns})
+            SELECT {", ".join("s." + c for c in table.column_names)}
+            FROM _reproceso_transacciones s
+            JOIN clientes c ON c.cliente_id = s.cliente_id
+            JOIN productos_financieros p ON p.producto_id = s.producto_id
+            ON CONFLICT DO NOTHING
+            RETURNING transaccion_id, producto_id, fecha_transaccion
+        """)).all()
+        dias = []
+        if inserted:
+            dias = self.loader.aggregates.refresh(conn, pa.table({
+                "producto_id": [r[1] for r in inserted],
+                "fecha_transaccion": pa.array([r[2] for r in inserted], pa.timestamp("us")),
+            }))
+
+        # Recuperada = presente en la tabla de hechos (insertada ahora o cargada por otra corrida)
+        present = conn.execute(text("""
+            SELECT DISTINCT s.transaccion_id FROM _reproceso_transacciones s
+            WHERE EXISTS (SELECT 1 FROM transacciones t
+                          WHERE t.transaccion_id = s.transaccion_id AND t.fecha_transaccion = s.fecha_transaccion)
+        """)).scalars().all()
+        return len(inserted), self._mark(conn, "transacciones", present), dias
+
+    def _load_clientes(self, conn, approved: pa.Table) -> tuple:
+        """Da de alta los clientes que aún no existen en la dimensión. Retorna (recuperados, marcados, días)."""
+        conn.execute(text("CREATE TEMP TABLE _reproceso_clientes (LIKE clientes) ON COMMIT DROP"))
+        self.loader._copy_tables(conn, {"_reproceso_clientes": approved})
+        nuevos = conn.execute(text("""
+            SELECT s.cliente_id FROM _reproceso_clientes s
+            WHERE NOT EXISTS (SELECT 1 FROM clientes c WHERE c.cliente_id = s.cliente_id)
+        """)).scalars().all()
+        if nuevos:
+            mask = pc.is_in(pc.cast(approved["cliente_id"], pa.string()), value_set=pa.array(nuevos, pa.string()))
+            SCD2_DIMENSIONS["clientes"].sync(conn, approved.filter(mask), self.loader._copy_tables)
+        return len(nuevos), self._mark(conn, "clientes", nuevos), []
+
+    # ------------------------------------------------------------------
+    # Reproceso
+    # ------------------------------------------------------------------
+    def reprocess(self, entity: str, desde=None, hasta=None, since: datetime = None) -> dict:
+        """
+        Reprocesa la cuarentena de una entidad ('since': solo archivos escritos
+        desde esa hora). Retorna los conteos del reproceso.
+        """
+        key = KEY_COLUMNS[entity]
+        load = self._load_clientes if entity == "clientes" else self._load_transacciones
+        stats = {"leidas": 0, "ya_recuperadas": 0, "rechazadas": 0, "no_cargadas": 0, "recuperadas": 0,
+                 "reglas": {}, "dias": []}
+        recovered = self._recovered_keys(entity)
+
+        for chunk in self.chunks(entity, desde, hasta, since):
+            stats["leidas"] += chunk.num_rows
+            # Filas ya recuperadas por un reproceso anterior (o por este mismo)
+            done = pc.fill_null(pc.is_in(transform.clean_id(chunk[key]), value_set=recovered), False)
+            pending = chunk.filter(pc.invert(done))
+            stats["ya_recuperadas"] += chunk.num_rows - pending.num_rows
+            if pending.num_rows == 0:
+                continue
+
+            if "error_reason" in pending.column_names:
+                pending = pending.drop(["error_reason"])
+            approved, _, counts = VALIDATIONS[entity](TRANSFORMS[entity](pending), self.patterns)
+            for rule, n in counts.items():
+                stats["reglas"][rule] = stats["reglas"].get(rule, 0) + n
+            stats["rechazadas"] += pending.num_rows - approved.num_rows
+            if approved.num_rows == 0:
+                continue
+
+            with self.loader.engine.begin() as conn:
+                n_recuperadas, marked, dias = load(conn, approved)
+            stats["recuperadas"] += n_recuperadas
+            stats["no_cargadas"] += approved.num_rows - n_recuperadas
+            stats["dias"].extend(dias)
+            recovered = pa.concat_arrays([recovered, pa.array(marked, pa.string())])
+
+        print(f"   ♻️  {entity}: {stats['leidas']} en cuarentena | {stats['recuperadas']} recuperadas | "
+              f"{stats['rechazadas']} siguen sin pasar las reglas | {stats['no_cargadas']} sin integridad | "
+              f"{stats['ya_recuperadas']} ya recuperadas antes")
+        return stats
+
+    def run(self, entities=REPROCESSABLE, desde=None, hasta=None) -> dict:
+        """Reprocesa las entidades pedidas (clientes antes que transacciones) y registra la corrida."""
+        unsupported = [entity for entity in entities if entity not in REPROCESSABLE]
+        if unsupported:
+            raise ValueError(f"Sin cuarentena que reprocesar: {', '.join(unsupported)}. Opciones: {REPROCESSABLE}")
+        print(f"♻️  Reproceso de cuarentena {self.run_id} (rango: {desde or '-'} a {hasta or '-'})")
+        started_at = datetime.now()
+        report, succeeded = {}, False
+        try:
+            since = self.last_full_reload()
+            if since is not None:
+                print(f"   Cuarentena desde la última recarga completa: {since:%Y-%m-%d %H:%M:%S}")
+            for entity in REPROCESSABLE:
+                if entity in entities:
+                    report[entity] = self.reprocess(entity, desde, hasta, since)
+            succeeded = True
+            return report
+        finally:
+            self._record(started_at, succeeded, report)
+
+    def _record(self, started_at, succeeded: bool, report: dict):
+        """Deja el reproceso en etl_runs / etl_stage_stats (el dashboard refresca esos días)."""
+        from src.monitoring.run_registry import RunRegistry, RUN_SUCCESS, RUN_FAILED
+
+        finished_at = datetime.now()
+        dias = sorted(d for stats in report.values() for d in stats["dias"])
+        stage_stats = []
+        for entity, stats in report.items():
+            stage_stats.append({
+                "run_id": self.run_id, "entidad": entity, "etapa": "reproceso", "operacion": "reprocess",
+                "regla": "", "filas_entrada": stats["leidas"], "filas_salida": stats["recuperadas"],
+                "filas_rechazadas": stats["rechazadas"], "duracion_s": None,
+                "estado": "ok" if succeeded else "error",
+            })
+            for rule, n in stats["reglas"].items():
+                stage_stats.append({
+                    "run_id": self.run_id, "entidad": entity, "etapa": "reproceso", "operacion": "regla",
+                    "regla": rule, "filas_entrada": None, "filas_salida": None, "filas_rechazadas": int(n),
+                    "duracion_s": None, "estado": "ok",
+                })
+        try:
+            RunRegistry(self.loader.engine).record(
+                self.run_id, started_at, finished_at, RUN_SUCCESS if succeeded else RUN_FAILED,
+                fecha_min=dias[0] if dias else None, fecha_max=dias[-1] if dias else None,
+                loaded_rows=sum(stats["recuperadas"] for stats in report.values()),
+                stage_stats=stage_stats,
+            )
+        except Exception as e:
+            print(f"   ❌ No se pudo registrar el reproceso {self.run_id} en etl_runs: {e}")
@@ -1,44 +1,151 @@
 import pandas as pd
 import numpy as np
 import os
+import threading
+import uuid
+from datetime import datetime
+import pyarrow.csv as pa_csv
+
+from src.quality import arrow_backend
+from src.quality.patterns import PatternValidator
+from src.transform.money import CENTS_COLUMN
+from src.transform.raw import restore_raw, strip_raw
+from src.utils.exchange import IPC_SUFFIX, write_ipc
+from src.utils.frames import resolve_backend, is_arrow, is_empty, to_arrow, like_input
+
+# Archivo histórico de la cuarentena (Arrow IPC): error_dir/cuarentena/<entidad>/*.arrow
+QUARANTINE_ARCHIVE = "cuarentena"
+
+# Cada archivo del histórico empieza con la hora en que se escribió
+QUARANTINE_STAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Motivo registrado para las transacciones descartadas por integridad referencial
+REASON_ORPHAN = "Cliente o producto inexistente en la DB"
+
+
+def quarantine_archive_dir(error_dir: str, entity: str) -> str:
+    return os.path.join(error_dir, QUARANTINE_ARCHIVE, entity)
+
+
+def quarantine_written_at(path: str):
+    """Hora de escritura de un archivo del histórico (de su nombre); None si no la tiene."""
+    try:
+        return datetime.strptime(os.path.basename(path)[:15], QUARANTINE_STAMP_FORMAT)
+    except ValueError:
+        return None
 
 class DataValidator:
     """
     Firewall de calidad de datos.
     Separa los datos en 'VALID' (pasan a DB) e 'INVALID' (se van a cuarentena).
     Implementa reglas de negocio financieras.
+
+    backend='arrow' (o ETL_BACKEND=arrow) evalúa las mismas reglas con
+    kernels vectorizados de pyarrow.compute sobre tablas de Arrow. El formato
+    de emails e IDs se valida en ambos motores con PatternValidator
+    (patrones configurables con ETL_PATTERNS).
     """
     
-    def __init__(self):
+    def __init__(self, backend: str = None, error_dir: str = None):
+        self.backend = resolve_backend(backend)
         # Rutas para guardar reportes de rechazo
         # Usamos una ruta absoluta segura basada en la ubicación de este archivo
         self.base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.error_dir = os.path.join(self.base_dir, "data", "error")
+        # error_dir permite a los workers en paralelo escribir su propia cuarentena
+        self.error_dir = error_dir or os.path.join(self.base_dir, "data", "error")
+        os.makedirs(self.error_dir, exist_ok=True)
+        # Filas que incumple cada regla, acumuladas por entidad: {entidad: {regla: n}}
+        self.rule_counts = {}
+        self._lock = threading.Lock()
+        # Patrones de formato por columna, con caché de valores entre lotes
+        self.patterns = PatternValidator.from_env()
 
-    def _save_quarantine(self, df_error: pd.DataFrame, filename: str):
-        """Guarda los datos rechazados en formato CSV para auditoría."""
-        if not df_error.empty:
+    def _record_rules(self, entity: str, counts: dict):
+        with self._lock:
+            per_entity = self.rule_counts.setdefault(entity, {})
+            for rule, n in counts.items():
+                per_entity[rule] = per_entity.get(rule, 0) + int(n)
+
+    def _save_quarantine(self, df_error, filename: str):
+        """
+        Guarda los datos rechazados en CSV para auditoría (el de la última
+        corrida) y los agrega al histórico de cuarentena en Arrow IPC, un
+        archivo por corrida y entidad, que el reproceso recorre por lotes.
+        Si la limpieza dejó los valores crudos, se guarda la fila original.
+        """
+        if not is_empty(df_error):
+            df_error = restore_raw(df_error)
             path = os.path.join(self.error_dir, filename)
-            df_error.to_csv(path, index=False)
+            if is_arrow(df_error):
+                pa_csv.write_csv(df_error, path)
+            else:
+                df_error.to_csv(path, index=False)
+            stem = os.path.splitext(filename)[0]
+            stamp = f"{datetime.now().strftime(QUARANTINE_STAMP_FORMAT)}_{uuid.uuid4().hex[:6]}"
+            write_ipc(df_error, os.path.join(quarantine_archive_dir(self.error_dir, stem.split("_")[0]),
+                                             f"{stamp}_{stem}{IPC_SUFFIX}"))
             print(f"   ⚠️  ALERTA: {len(df_error)} registros enviados a Cuarentena -> {path}")
 
+    def _run_arrow(self, rules, data, entity: str, quarantine_file: str):
+        approved, rejected, counts = rules(to_arrow(data), self.patterns)
+        self._record_rules(entity, counts)
+        self._save_quarantine(rejected, quarantine_file)
+        print(f"   ✔ Aprobados: {approved.num_rows} | ❌ Rechazados: {rejected.num_rows}")
+        return like_input(strip_raw(approved), data)
+
+    def _format_masks(self, df: pd.DataFrame, entity: str, skip: pd.Series = None) -> dict:
+        """{formato_<columna>: máscara} para las columnas de ID con patrón (ver arrow_backend.ID_COLUMNS)."""
+        masks = {}
+        for column in arrow_backend.ID_COLUMNS[entity]:
+            if column in df.columns and self.patterns.has(column):
+                mask = self.patterns.invalid_series(column, df[column])
+                masks[f"formato_{column}"] = mask if skip is None else mask & ~skip
+        return masks
+
+    def filter_referential(self, df, valid_ids: dict, quarantine_file: str = None):
+        """
+        Integridad referencial: conserva solo las filas cuyas llaves foráneas
+        existen en {columna: lista de IDs confirmados en la DB}. Con
+        'quarantine_file' los huérfanos van a cuarentena (para reprocesarlos
+        cuando llegue el registro que falta).
+        """
+        if self.backend == "arrow" or is_arrow(df):
+            kept, orphans = arrow_backend.split_referential(to_arrow(df), valid_ids, REASON_ORPHAN)
+            if quarantine_file:
+                self._save_quarantine(orphans, quarantine_file)
+            return like_input(kept, df)
+        mask = pd.Series(True, index=df.index)
+        for column, ids in valid_ids.items():
+            mask &= df[column].astype(str).isin(ids)
+        if quarantine_file:
+            orphans = df[~mask].copy()
+            orphans['error_reason'] = REASON_ORPHAN
+            self._save_quarantine(orphans, quarantine_file)
+        return df[mask]
+
     def validate_clientes(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Reglas:
         1. ID no puede ser nulo.
-        2. Email debe contener '@'.
+        2. Email con formato válido (patrón 'email'; sin patrón, debe contener '@').
         3. No duplicados en ID.
         4. Nombre no puede ser nulo (NUEVA REGLA).
+        5. ID con el formato de su patrón ('cliente_id').
         """
         print("   🛡️  Validando Clientes...")
+        if self.backend == "arrow":
+            return self._run_arrow(arrow_backend.validate_clientes, df, "clientes", "clientes_rejected.csv")
         
         df_valid = df.copy()
         
         # REGLA 1: Integridad de ID
         mask_id_null = df_valid['cliente_id'].isnull() | (df_valid['cliente_id'] == '')
         
-        # REGLA 2: Formato Email
-        mask_bad_email = ~df_valid['email'].astype(str).str.contains('@', na=False)
+        # REGLA 2: Formato Email (patrón configurable; sin patrón basta con '@')
+        if self.patterns.has('email'):
+            mask_bad_email = self.patterns.invalid_series('email', df_valid['email'], null_fails=True)
+        else:
+            mask_bad_email = ~df_valid['email'].astype(str).str.contains('@', na=False)
         
         # REGLA 3: Duplicados
         mask_duplicated = df_valid.duplicated(subset=['cliente_id'], keep='first')
@@ -46,14 +153,27 @@ class DataValidator:
         # REGLA 4: Nombre Obligatorio (LA QUE FALTABA)
         mask_name_null = df_valid['nombre'].isnull() | (df_valid['nombre'] == '')
         
+        # REGLA 5: Formato de ID (un ID vacío ya cuenta en la regla 1)
+        format_masks = self._format_masks(df_valid, "clientes", skip=mask_id_null)
+
+        self._record_rules("clientes", {
+            "id_nulo": mask_id_null.sum(),
+            "email_invalido": mask_bad_email.sum(),
+            "duplicado": mask_duplicated.sum(),
+            "nombre_nulo": mask_name_null.sum(),
+            **{rule: mask.sum() for rule, mask in format_masks.items()},
+        })
+
         # Combinar fallos
         mask_fail = mask_id_null | mask_bad_email | mask_duplicated | mask_name_null
+        for mask in format_masks.values():
+            mask_fail |= mask
         
         # Separar
         df_rejected = df_valid[mask_fail].copy()
-        df_rejected['error_reason'] = 'Invalid ID, Email, Name or Duplicate'
+        df_rejected['error_reason'] = arrow_backend.REASON_CLIENTES
         
-        df_approved = df_valid[~mask_fail]
+        df_approved = strip_raw(df_valid[~mask_fail])
         
         # Reportar
         self._save_quarantine(df_rejected, "clientes_rejected.csv")
@@ -64,19 +184,42 @@ class DataValidator:
     def validate_transacciones(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Reglas:
-        1. Monto no puede ser 0 o negativo.
+        1. Monto no puede ser 0 o negativo, ni nulo (no numérico o fuera de rango).
+        2. Fecha obligatoria (es la llave de partición en la DB).
+        3. IDs de transacción, cliente y producto con el formato de su patrón.
         """
         print("   🛡️  Validando Transacciones...")
+        if self.backend == "arrow":
+            return self._run_arrow(arrow_backend.validate_transacciones, df, "transacciones", "transacciones_rejected.csv")
         df_valid = df.copy()
         
-        # REGLA 1: Monto Positivo
-        mask_invalid_amount = df_valid['monto'] <= 0
+        # REGLA 1: Monto Positivo (comparación entera sobre centavos; nulo no cuenta)
+        mask_invalid_amount = (df_valid[CENTS_COLUMN] <= 0).fillna(False).astype(bool)
+        # La limpieza deja nulo lo no numérico o fuera de DECIMAL(15, 2)
+        mask_null_amount = df_valid[CENTS_COLUMN].isna()
+
+        # REGLA 2: Fecha válida (sin fecha no hay partición destino)
+        mask_no_date = df_valid['fecha_transaccion'].isnull()
+
+        # REGLA 3: Formato de IDs (transacción, cliente y producto)
+        format_masks = self._format_masks(df_valid, "transacciones")
+
+        self._record_rules("transacciones", {
+            "monto_no_positivo": mask_invalid_amount.sum(),
+            "monto_nulo": mask_null_amount.sum(),
+            "fecha_nula": mask_no_date.sum(),
+            **{rule: mask.sum() for rule, mask in format_masks.items()},
+        })
+
+        mask_fail = mask_invalid_amount | mask_null_amount | mask_no_date
+        for mask in format_masks.values():
+            mask_fail |= mask
         
         # Separar
-        df_rejected = df_valid[mask_invalid_amount].copy()
-        df_rejected['error_reason'] = 'Monto invalido (<= 0)'
+        df_rejected = df_valid[mask_fail].copy()
+        df_rejected['error_reason'] = arrow_backend.REASON_TRANSACCIONES
         
-        df_approved = df_valid[~mask_invalid_amount]
+        df_approved = strip_raw(df_valid[~mask_fail])
         
         # Reportar
         self._save_quarantine(df_rejected, "transacciones_rejected.csv")
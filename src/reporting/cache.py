@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Frecuencias de pandas equivalentes a date_trunc (la semana empieza en lunes)
+PERIODOS = {"day": None, "week": "W", "month": "M", "quarter": "Q", "year": "Y"}
+
+
+class DashboardCache:
+    """
+    Caché del dashboard atado a las corridas del pipeline.
+
+    Guarda una sola copia del cubo diario (fecha, producto, segmento), que
+    ocupa kilobytes, y deriva de ella los totales por producto y las series.
+    Cada sync() compara la última corrida exitosa de etl_runs con la cacheada.
+    Si llegaron corridas incrementales, trae solo los días a partir de la menor
+    fecha afectada y los reemplaza en el cubo. Una recarga completa (o un
+    historial desconocido) vuelve a leer todo.
+
+    Los cuartiles no se pueden combinar por día, así que se cachean por
+    combinación de filtros en un LRU acotado por 'max_entries'. Se invalidan
+    con cada corrida nueva.
+
+    La instancia se comparte entre sesiones (st.cache_resource): varios
+    usuarios concurrentes no multiplican la memoria.
+    """
+
+    def __init__(self, queries, registry, max_entries: int = 32):
+        self.queries = queries
+        self.registry = registry
+        self.max_entries = max_entries
+        self.run_id = None
+        self.watermark = None
+        self._cube = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sync(self) -> bool:
+        """Alinea el caché con la última corrida exitosa. Retorna True si hubo cambios."""
+        latest = self.registry.latest_successful()
+        latest_id = latest["run_id"] if latest else None
+        with self._lock:
+            if self._cube is not None and latest_id == self.run_id:
+                return False
+
+            runs = None
+            if self._cube is not None and self.run_id is not None:
+                runs = self.registry.successful_since(self.run_id)
+
+            if not runs or any(r["recarga_completa"] for r in runs):
+                self._cube = self.queries.cubo_diario()
+            else:
+                fechas = [r["fecha_min"] for r in runs if r["fecha_min"] is not None]
+                if fechas:
+                    desde = min(fechas)
+                    delta = self.queries.cubo_diario(desde=desde)
+                    kept = self._cube[self._cube["fecha"] < desde]
+                    self._cube = pd.concat([kept, delta], ignore_index=True)
+
+            self._entries.clear()
+            self.run_id = latest_id
+            self.watermark = self._cube["fecha"].max() if not self._cube.empty else None
+            return True
+
+    # ------------------------------------------------------------------
+    # Consultas servidas desde el caché
+    # ------------------------------------------------------------------
+    def _filtrar(self, desde=None, hasta=None, segmentos=None) -> pd.DataFrame:
+        cube = self._cube
+        mask = pd.Series(True, index=cube.index)
+        if desde is not None:
+            mask &= cube["fecha"] >= desde
+        if hasta is not None:
+            mask &= cube["fecha"] <= hasta
+        if segmentos:
+            mask &= cube["segmento"].isin(segmentos)
+        return cube[mask]
+
+    def rango_fechas(self) -> tuple:
+        with self._lock:
+            if self._cube.empty:
+                return None, None
+            return self._cube["fecha"].min(), self._cube["fecha"].max()
+
+    def segmentos(self) -> list:
+        with self._lock:
+            return sorted(self._cube["segmento"].unique().tolist())
+
+    def totales_por_producto(self, desde=None, hasta=None, segmentos=None) -> pd.DataFrame:
+        with self._lock:
+            df = self._filtrar(desde, hasta, segmentos)
+        return (
+            df.groupby("nombre_producto", as_index=False)[["monto", "n_transacciones"]].sum()
+            .sort_values("monto", ascending=False)
+        )
+
+    def serie_temporal(self, desde=None, hasta=None, segmentos=None, granularidad: str = "day") -> pd.DataFrame:
+        if granularidad not in PERIODOS:
+            raise ValueError(f"Granularidad no soportada: {granularidad}. Opciones: {tuple(PERIODOS)}")
+        with self._lock:
+            df = self._filtrar(desde, hasta, segmentos)
+        periodo = PERIODOS[granularidad]
+        fechas = pd.to_datetime(df["fecha"])
+        if periodo is not None:
+            fechas = fechas.dt.to_period(periodo).dt.start_time
+        return (
+            df.assign(fecha=fechas.dt.date)
+            .groupby("fecha", as_index=False)[["monto", "n_transacciones"]].sum()
+        )
+
+    def cuartiles_por_segmento(self, desde=None, hasta=None, segmentos=None) -> pd.DataFrame:
+        key = ("cuartiles", desde, hasta, tuple(segmentos or ()))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        result = self.queries.cuartiles_por_segmento(desde, hasta, segmentos)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# Puntos máximos que se envían al navegador por serie
+MAX_PUNTOS = 1000
+
+# Días aproximados por período, de la granularidad más fina a la más gruesa
+DIAS_POR_PERIODO = (("day", 1), ("week", 7), ("month", 30.44), ("quarter", 91.31), ("year", 365.25))
+
+
+def granularidad_para_rango(desde, hasta, max_puntos: int = MAX_PUNTOS) -> str:
+    """
+    Granularidad más fina cuyo número de períodos en [desde, hasta] no supera
+    'max_puntos'. El rango elegido en el filtro hace de nivel de zoom.
+    """
+    dias = (pd.Timestamp(hasta) - pd.Timestamp(desde)).days + 1
+    for granularidad, dias_periodo in DIAS_POR_PERIODO:
+        if dias / dias_periodo <= max_puntos:
+            return granularidad
+    return DIAS_POR_PERIODO[-1][0]
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: elige 'n_out' puntos que conservan la
+    forma visual de la serie (picos y valles) en lugar de promediarlos.
+    Conserva siempre el primer y el último punto. 'x' debe ser numérico y
+    creciente. Retorna los índices elegidos, en orden.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bordes de los n_out - 2 cubetas interiores (el primer y el último punto van aparte)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Promedio de la cubeta siguiente (la última usa el punto final)
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Área del triángulo (punto elegido anterior, candidato, promedio siguiente)
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_serie(df: pd.DataFrame, x: str, y: str, max_puntos: int = MAX_PUNTOS) -> pd.DataFrame:
+    """Aplica LTTB a una serie temporal ordenada si supera 'max_puntos'."""
+    if len(df) <= max_puntos:
+        return df
+    x_num = pd.to_datetime(df[x]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return df.iloc[lttb_indices(x_num, df[y].to_numpy(dtype=np.float64), max_puntos)]
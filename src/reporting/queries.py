@@ -0,0 +1,177 @@
+from datetime import timedelta
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.load.aggregates import SIN_SEGMENTO
+
+# Granularidades admitidas por date_trunc para las series temporales
+GRANULARIDADES = ("day", "week", "month", "quarter", "year")
+
+# Mismo criterio que los agregados para clientes sin segmento
+SEGMENTO_FACT = f"COALESCE(c.segmento, '{SIN_SEGMENTO}')"
+
+
+class DashboardQueries:
+    """
+    Capa de consultas del dashboard: cada gráfico pide a PostgreSQL solo el
+    resultado ya agregado (SUM, date_trunc, percentile_cont), con los filtros
+    de rango de fechas y segmento como parámetros.
+
+    Con use_aggregates=True las sumas salen de agg_transacciones_diarias y los
+    cuartiles sin filtro de fechas de agg_segmento_cuantiles; si no, todo se
+    calcula sobre la tabla de hechos. En ambos casos el volumen transferido no
+    depende del tamaño del histórico.
+    """
+
+    def __init__(self, engine, use_aggregates: bool = True):
+        self.engine = engine
+        self.use_aggregates = use_aggregates
+
+    def _read(self, query: str, params: dict) -> pd.DataFrame:
+        with self.engine.connect() as conn:
+            return pd.read_sql(text(query), conn, params=params)
+
+    @staticmethod
+    def _filters(fecha_col: str, segmento_col: str, desde=None, hasta=None, segmentos=None,
+                 fecha_es_timestamp: bool = False) -> tuple:
+        """Cláusula WHERE y parámetros. 'hasta' es inclusivo (día completo)."""
+        clauses, params = [], {}
+        if desde is not None:
+            clauses.append(f"{fecha_col} >= :desde")
+            params["desde"] = desde
+        if hasta is not None:
+            # Rango semiabierto: sobre timestamps conserva la poda de particiones
+            clauses.append(f"{fecha_col} < :hasta" if fecha_es_timestamp else f"{fecha_col} <= :hasta")
+            params["hasta"] = hasta + timedelta(days=1) if fecha_es_timestamp else hasta
+        if segmentos:
+            clauses.append(f"{segmento_col} = ANY(:segmentos)")
+            params["segmentos"] = list(segmentos)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    # ------------------------------------------------------------------
+    # Consultas por gráfico
+    # ------------------------------------------------------------------
+    def rango_fechas(self) -> tuple:
+        """Primera y última fecha con datos (límites del selector de fechas)."""
+        if self.use_aggregates:
+            query = "SELECT MIN(fecha) AS desde, MAX(fecha) AS hasta FROM agg_transacciones_diarias"
+        else:
+            query = ("SELECT MIN(fecha_transaccion)::date AS desde, MAX(fecha_transaccion)::date AS hasta "
+                     "FROM transacciones")
+        row = self._read(query, {}).iloc[0]
+        return row["desde"], row["hasta"]
+
+    def segmentos(self) -> list:
+        if self.use_aggregates:
+            query = "SELECT segmento FROM agg_segmento_cuantiles ORDER BY segmento"
+        else:
+            query = f"SELECT DISTINCT {SEGMENTO_FACT} AS segmento FROM clientes c ORDER BY 1"
+        return self._read(query, {})["segmento"].tolist()
+
+    def cubo_diario(self, desde=None) -> pd.DataFrame:
+        """Filas de agg_transacciones_diarias (con nombre de producto) desde una fecha."""
+        where, params = self._filters("a.fecha", None, desde=desde)
+        query = f"""
+            SELECT a.fecha, a.segmento, p.nombre_producto,
+                   a.n_transacciones, a.monto_total::float8 AS monto
+            FROM agg_transacciones_diarias a
+            JOIN productos_financieros p ON p.producto_id = a.producto_id
+            {where}
+        """
+        return self._read(query, params)
+
+    def totales_por_producto(self, desde=None, hasta=None, segmentos=None) -> pd.DataFrame:
+        """Monto total y número de transacciones por producto."""
+        if self.use_aggregates:
+            where, params = self._filters("a.fecha", "a.segmento", desde, hasta, segmentos)
+            query = f"""
+                SELECT p.nombre_producto, SUM(a.monto_total) AS monto, SUM(a.n_transacciones)::bigint AS n_transacciones
+                FROM agg_transacciones_diarias a
+                JOIN productos_financieros p ON p.producto_id = a.producto_id
+                {where}
+                GROUP BY p.nombre_producto
+                ORDER BY monto DESC
+            """
+        else:
+            where, params = self._filters("t.fecha_transaccion", SEGMENTO_FACT, desde, hasta, segmentos,
+                                          fecha_es_timestamp=True)
+            query = f"""
+                SELECT p.nombre_producto, SUM(t.monto) AS monto, COUNT(*) AS n_transacciones
+                FROM transacciones t
+                JOIN clientes c ON c.cliente_id = t.cliente_id
+                JOIN productos_financieros p ON p.producto_id = t.producto_id
+                {where}
+                GROUP BY p.nombre_producto
+                ORDER BY monto DESC
+            """
+        return self._read(query, params)
+
+    def serie_temporal(self, desde=None, hasta=None, segmentos=None, granularidad: str = "day") -> pd.DataFrame:
+        """Monto total por período (date_trunc) en el rango pedido."""
+        if granularidad not in GRANULARIDADES:
+            raise ValueError(f"Granularidad no soportada: {granularidad}. Opciones: {GRANULARIDADES}")
+        if self.use_aggregates:
+            where, params = self._filters("a.fecha", "a.segmento", desde, hasta, segmentos)
+            query = f"""
+                SELECT date_trunc(:granularidad, a.fecha)::date AS fecha,
+                       SUM(a.monto_total) AS monto, SUM(a.n_transacciones)::bigint AS n_transacciones
+                FROM agg_transacciones_diarias a
+                {where}
+                GROUP BY 1
+                ORDER BY 1
+            """
+        else:
+            where, params = self._filters("t.fecha_transaccion", SEGMENTO_FACT, desde, hasta, segmentos,
+                                          fecha_es_timestamp=True)
+            query = f"""
+                SELECT date_trunc(:granularidad, t.fecha_transaccion)::date AS fecha,
+                       SUM(t.monto) AS monto, COUNT(*) AS n_transacciones
+                FROM transacciones t
+                JOIN clientes c ON c.cliente_id = t.cliente_id
+                {where}
+                GROUP BY 1
+                ORDER BY 1
+            """
+        params["granularidad"] = granularidad
+        return self._read(query, params)
+
+    def cuartiles_por_segmento(self, desde=None, hasta=None, segmentos=None) -> pd.DataFrame:
+        """Resumen de cinco números por segmento para los box plots."""
+        if self.use_aggregates and desde is None and hasta is None:
+            where, params = self._filters(None, "segmento", segmentos=segmentos)
+            query = f"""
+                SELECT segmento, n_transacciones, monto_total, monto_min, q1, mediana, q3, monto_max
+                FROM agg_segmento_cuantiles
+                {where}
+                ORDER BY segmento
+            """
+        else:
+            # Los cuartiles de un rango arbitrario no se pueden combinar desde agregados diarios
+            where, params = self._filters("t.fecha_transaccion", SEGMENTO_FACT, desde, hasta, segmentos,
+                                          fecha_es_timestamp=True)
+            query = f"""
+                SELECT {SEGMENTO_FACT} AS segmento, COUNT(*) AS n_transacciones, SUM(t.monto) AS monto_total,
+                       MIN(t.monto) AS monto_min,
+                       percentile_cont(0.25) WITHIN GROUP (ORDER BY t.monto) AS q1,
+                       percentile_cont(0.50) WITHIN GROUP (ORDER BY t.monto) AS mediana,
+                       percentile_cont(0.75) WITHIN GROUP (ORDER BY t.monto) AS q3,
+                       MAX(t.monto) AS monto_max
+                FROM transacciones t
+                JOIN clientes c ON c.cliente_id = t.cliente_id
+                {where}
+                GROUP BY 1
+                ORDER BY 1
+            """
+        return self._read(query, params)
+
+    def calidad_corrida(self, run_id: str) -> pd.DataFrame:
+        """Contabilidad de filas de una corrida (lectura por llave de etl_stage_stats)."""
+        query = """
+            SELECT entidad, etapa, operacion, regla, filas_entrada, filas_salida, filas_rechazadas
+            FROM etl_stage_stats
+            WHERE run_id = :run_id
+            ORDER BY entidad, etapa, regla
+        """
+        return self._read(query, {"run_id": run_id})
@@ -10,6 +10,7 @@ sys.path.append(parent_dir)
 # ---------------------------------------
 
 import time
+import uuid
 import logging
 from datetime import datetime
 
@@ -33,11 +34,236 @@ stream_handler = logging.StreamHandler(sys.stdout)
 stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 logger.addHandler(stream_handler)
 
-def run_pipeline():
+# Nombres de las tareas del DAG (también sirven para '--tasks')
+TASK_PREPARE = "preparar_db"
+TASK_CLIENTES = "clientes"
+TASK_PRODUCTOS = "productos"
+TASK_TRANSACCIONES = "transacciones"
+TASK_RETENCION = "retencion_particiones"
+ENTITIES = (TASK_CLIENTES, TASK_PRODUCTOS, TASK_TRANSACCIONES)
+
+# Formatos de origen admitidos para transacciones ("" = directorio Parquet particionado)
+SOURCE_EXTENSIONS = ("", ".parquet", ".ndjson", ".jsonl", ".json", ".csv")
+
+# Ruta explícita del origen de transacciones (relativa a data/raw o absoluta)
+TX_SOURCE_ENV = "ETL_TX_SOURCE"
+
+def _source_mtime(path: str) -> float:
+    """Última modificación de un archivo o del archivo más reciente de un directorio."""
+    if not os.path.isdir(path):
+        return os.path.getmtime(path)
+    mtimes = [os.path.getmtime(os.path.join(root, name))
+              for root, _, files in os.walk(path) for name in files]
+    return max(mtimes, default=os.path.getmtime(path))
+
+def _find_source(raw_dir: str, stem: str, default: str, override: str = None) -> str:
+    """
+    Ubica el archivo de origen de una entidad admitiendo los formatos del
+    generador por bloques (ej. transacciones_raw.ndjson o el directorio
+    Parquet transacciones_raw/). 'override' fija la ruta explícitamente.
+    Si hay varios candidatos se usa el más reciente (el histórico .json no
+    tapa una salida nueva del generador); si no hay ninguno, el histórico.
+    """
+    if override:
+        return os.path.join(raw_dir, override)
+    candidates = []
+    for ext in SOURCE_EXTENSIONS:
+        candidate = os.path.join(raw_dir, stem + ext)
+        if os.path.isdir(candidate) if ext == "" else os.path.isfile(candidate):
+            candidates.append(candidate)
+    if not candidates:
+        return os.path.join(raw_dir, default)
+    newest = max(candidates, key=_source_mtime)
+    if len(candidates) > 1:
+        others = ", ".join(os.path.basename(c) for c in candidates if c != newest)
+        logger.warning(f"Varios orígenes para '{stem}': se usa el más reciente {os.path.basename(newest)} "
+                       f"(se ignoran: {others}; fijar con {TX_SOURCE_ENV})")
+    return newest
+
+def _require(ok: bool, what: str):
+    """Convierte un fallo reportado por el loader en excepción (habilita reintentos)."""
+    if not ok:
+        raise RuntimeError(f"Falló: {what}")
+
+def entity_stages(entity: str, extractor, transformer, validator, raw_dir: str, sharder=None):
+    """
+    Archivo de origen y cadena de etapas (extract -> transform -> validate)
+    de una entidad, en el formato que espera CheckpointStore.run_stages.
+    """
+    from src.extract.extractor import DataExtractor
+    from src.transform.transformer import DataTransformer
+    from src.quality.validator import DataValidator
+    from src.orchestration.sharding import ShardedProcessor
+
+    if entity == TASK_CLIENTES:
+        path = os.path.join(raw_dir, "clientes_raw.csv")
+        return path, [
+            ("extract", lambda: extractor.extract_csv(path), DataExtractor),
+            ("transform", transformer.clean_clientes, DataTransformer),
+            ("validate", validator.validate_clientes, DataValidator),
+        ]
+    if entity == TASK_PRODUCTOS:
+        path = os.path.join(raw_dir, "productos_master.xlsx")
+        return path, [
+            ("extract", lambda: extractor.extract_excel(path), DataExtractor),
+            ("transform",
+             lambda df: transformer.select_columns(transformer.clean_productos(df),
+                                                   ['producto_id', 'nombre_producto', 'tipo']),
+             DataTransformer),
+        ]
+    if entity == TASK_TRANSACCIONES:
+        path = _find_source(raw_dir, "transacciones_raw", "transacciones_raw.json", os.getenv(TX_SOURCE_ENV))
+        if sharder is None:
+            stages = [
+                ("transform", transformer.clean_transacciones, DataTransformer),
+                ("validate", validator.validate_transacciones, DataValidator),
+            ]
+        else:
+            # Transform + validate corren juntos dentro de cada shard
+            stages = [
+                ("validate", sharder.process_transacciones,
+                 (ShardedProcessor, DataTransformer, DataValidator)),
+            ]
+        return path, [("extract", lambda: extractor.extract(path), DataExtractor)] + stages
+    raise ValueError(f"Entidad desconocida: {entity}. Opciones: {ENTITIES}")
+
+def build_dag(extractor, transformer, validator, loader, raw_dir: str, checkpoints, max_workers: int = 4,
+              sharder=None, lineage=None):
+    """
+    Construye el DAG del pipeline:
+
+        preparar_db ─┬─> clientes ──┬─> transacciones ─> retencion_particiones
+                     └─> productos ─┘
+
+    Clientes y productos son independientes y corren en paralelo;
+    transacciones solo espera a que ambas dimensiones estén cargadas.
+    Las etapas extract/transform/validate pasan por 'checkpoints' y cada
+    tarea terminada queda registrada para poder reanudar la corrida.
+
+    Con 'sharder' (ver ETL_SHARDS) las transacciones se limpian y validan
+    en paralelo, repartidas por cliente_id entre varios procesos. Con
+    'lineage' se contabilizan las transacciones huérfanas descartadas.
+    """
+    from src.orchestration.scheduler import DAGScheduler
+    from src.utils.frames import is_empty
+
+    retries = int(os.getenv("ETL_TASK_RETRIES", "1"))
+    dag = DAGScheduler(max_workers=max_workers, logger=logger)
+
+    def stages_of(entity):
+        return entity_stages(entity, extractor, transformer, validator, raw_dir, sharder)
+
+    def add_task(name, func, depends_on=(), retries=0):
+        def run_and_checkpoint():
+            result = func()
+            checkpoints.mark_task_done(name)
+            return result
+        dag.add_task(name, run_and_checkpoint, depends_on=depends_on, retries=retries)
+
+    def preparar_db():
+        logger.info("--- FASE 0: PREPARACION DE BASE DE DATOS ---")
+        _require(loader.ensure_schema(), "creación del esquema")
+        _require(loader.clean_tables(), "limpieza de tablas")
+
+    def procesar_clientes():
+        logger.info("--- FASE 1: PROCESANDO CLIENTES ---")
+        df_cli = checkpoints.run_stages(TASK_CLIENTES, *stages_of(TASK_CLIENTES))
+        if not is_empty(df_cli):
+            _require(loader.load_data(df_cli, "clientes"), "carga de clientes")
+            # Carga por diferencias (SCD2): cuántas filas fueron nuevas, cambiaron o se omitieron
+            changes = loader.dimension_changes.get("clientes")
+            if lineage is not None and changes:
+                for regla, n in changes.items():
+                    lineage.add(TASK_CLIENTES, "load", "scd2", regla, filas_salida=n)
+
+    def procesar_productos():
+        logger.info("--- FASE 2: PROCESANDO PRODUCTOS ---")
+        df_prod = checkpoints.run_stages(TASK_PRODUCTOS, *stages_of(TASK_PRODUCTOS))
+        if not is_empty(df_prod):
+            _require(loader.load_data(df_prod, "productos_financieros"), "carga de productos")
+
+    def procesar_transacciones():
+        logger.info("--- FASE 3: VERIFICACION DE INTEGRIDAD ---")
+        valid_clients = loader.get_valid_ids_from_db("clientes", "cliente_id")
+        valid_products = loader.get_valid_ids_from_db("productos_financieros", "producto_id")
+        logger.info(f"Snapshot DB -> Clientes: {len(valid_clients)} | Productos: {len(valid_products)}")
+
+        logger.info("--- FASE 4: PROCESANDO TRANSACCIONES ---")
+        df_tx = checkpoints.run_stages(TASK_TRANSACCIONES, *stages_of(TASK_TRANSACCIONES))
+
+        if not is_empty(df_tx):
+            # Filtro cruzado contra DB
+            df_final = validator.filter_referential(
+                df_tx, {"cliente_id": valid_clients, "producto_id": valid_products},
+                quarantine_file="transacciones_huerfanas.csv",
+            )
+            n_dropped = len(df_tx) - len(df_final)
+            if lineage is not None:
+                lineage.add(TASK_TRANSACCIONES, "integridad", "filter_referential", "huerfano",
+                            filas_entrada=len(df_tx), filas_salida=len(df_final), filas_rechazadas=n_dropped)
+
+            if n_dropped > 0:
+                logger.warning(f"ALERTA: Se descartaron {n_dropped} transacciones por integridad referencial.")
+
+            _require(loader.load_data(df_final, "transacciones"), "carga de transacciones")
+
+    add_task(TASK_PREPARE, preparar_db)
+    add_task(TASK_CLIENTES, procesar_clientes, depends_on=[TASK_PREPARE], retries=retries)
+    add_task(TASK_PRODUCTOS, procesar_productos, depends_on=[TASK_PREPARE], retries=retries)
+    add_task(TASK_TRANSACCIONES, procesar_transacciones,
+             depends_on=[TASK_CLIENTES, TASK_PRODUCTOS], retries=retries)
+
+    # Retención opcional: las particiones viejas se desacoplan (no se borran)
+    retention = os.getenv("TX_RETENTION_MONTHS")
+    if retention:
+        add_task(TASK_RETENCION, lambda: loader.detach_old_partitions(int(retention)),
+                 depends_on=[TASK_TRANSACCIONES])
+    return dag
+
+def _record_run(run_id: str, started_at, succeeded: bool, full_reload: bool, loader, checkpoints,
+                instrumentation, lineage, validators):
+    """
+    Deja el linaje de la corrida en la DB (etl_runs + etl_stage_stats, una
+    sola transacción). Un fallo aquí se reporta pero no tumba el pipeline.
+    """
+    from src.monitoring.run_registry import RunRegistry, RUN_SUCCESS, RUN_FAILED
+    from src.monitoring.lineage import RunLineage
+
+    try:
+        rule_counts = [v.rule_counts for v in validators if v is not None]
+        stage_stats = lineage.rows(instrumentation.records, rule_counts) if lineage is not None else []
+        fecha_min, fecha_max = loader.loaded_range or (None, None)
+        RunRegistry(loader.engine).record(
+            run_id, started_at, datetime.now(), RUN_SUCCESS if succeeded else RUN_FAILED,
+            fecha_min=fecha_min, fecha_max=fecha_max, full_reload=full_reload,
+            input_hashes=checkpoints.input_hashes if checkpoints is not None else None,
+            loaded_rows=RunLineage.loaded_rows(stage_stats),
+            stage_stats=stage_stats,
+        )
+        logger.info(f"Linaje de la corrida {run_id} registrado ({len(stage_stats)} filas en etl_stage_stats)")
+    except Exception as e:
+        logger.error(f"No se pudo registrar la corrida {run_id} en etl_runs: {e}")
+
+def run_pipeline(only=None, max_workers: int = None, resume: bool = False, reuse_checkpoints: bool = False):
+    """
+    Ejecuta el pipeline completo (o solo las tareas en 'only') como un DAG.
+    Con resume=True retoma la última corrida interrumpida: omite las tareas
+    ya completadas y reutiliza los checkpoints de etapa que sigan vigentes.
+    Con reuse_checkpoints=True solo se reutilizan los checkpoints de etapa
+    (ej. tras 'extract' / 'transform' desde la CLI), sin omitir tareas.
+    """
     # Usamos texto simple en logs de consola por si acaso Windows se queja,
     # pero mantenemos la estructura profesional.
     logger.info(">>> INICIANDO PIPELINE ETL FINANCIERO MASTER")
     start_time = time.time()
+    started_at = datetime.now()
+    run_id = f"{started_at.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    instrumentation = None
+    loader = None
+    checkpoints = None
+    lineage = None
+    sharder = None
+    succeeded, full_reload = False, False
     
     try:
         # -----------------------------------------------------
@@ -47,78 +273,79 @@ def run_pipeline():
         from src.transform.transformer import DataTransformer
         from src.quality.validator import DataValidator
         from src.load.loader import DataLoader
+        from src.orchestration.scheduler import SUCCESS, NOT_SELECTED
+        from src.monitoring.instrumentation import PipelineInstrumentation
+        from src.orchestration.checkpoint import CheckpointStore
+        from src.orchestration.sharding import ShardedProcessor
+        from src.monitoring.lineage import RunLineage
         
         # Rutas (Usando parent_dir que calculamos arriba)
         RAW_DIR = os.path.join(parent_dir, "data", "raw")
+        CHECKPOINT_DIR = os.path.join(parent_dir, "data", "checkpoints")
+        METRICS_DIR = os.path.join(log_dir, "metrics")
 
-        # Instancias
-        extractor = DataExtractor()
-        transformer = DataTransformer()
-        validator = DataValidator()
-        loader = DataLoader()
+        # Instancias (envueltas por la capa de instrumentación)
+        instrumentation = PipelineInstrumentation.from_env(run_id, METRICS_DIR)
+        lineage = RunLineage(run_id)
+        extractor = instrumentation.wrap(DataExtractor(), "extract")
+        transformer = instrumentation.wrap(DataTransformer(), "transform")
+        validator = instrumentation.wrap(DataValidator(), "validate")
+        loader = instrumentation.wrap(DataLoader(), "load")
+        sharder = ShardedProcessor.from_env()
+        if sharder is not None:
+            sharder = instrumentation.wrap(sharder, "transform")
 
         # -----------------------------------------------------
-        # 2. PREPARACIÓN
+        # 2. EJECUCIÓN DEL DAG
         # -----------------------------------------------------
-        logger.info("--- FASE 0: PREPARACION DE BASE DE DATOS ---")
-        loader.clean_tables()
+        checkpoints = CheckpointStore(CHECKPOINT_DIR, resume=resume or reuse_checkpoints)
+        completed = checkpoints.begin_run(run_id, keep_completed=resume)
 
-        # -----------------------------------------------------
-        # 3. PROCESAMIENTO DE CLIENTES
-        # -----------------------------------------------------
-        logger.info("--- FASE 1: PROCESANDO CLIENTES ---")
-        df_cli = extractor.extract_csv(os.path.join(RAW_DIR, "clientes_raw.csv"))
-        if not df_cli.empty:
-            df_cli = transformer.clean_clientes(df_cli)
-            df_cli = validator.validate_clientes(df_cli)
-            loader.load_data(df_cli, "clientes")
-        
-        # -----------------------------------------------------
-        # 4. PROCESAMIENTO DE PRODUCTOS
-        # -----------------------------------------------------
-        logger.info("--- FASE 2: PROCESANDO PRODUCTOS ---")
-        df_prod = extractor.extract_excel(os.path.join(RAW_DIR, "productos_master.xlsx"))
-        if not df_prod.empty:
-            df_prod = transformer.clean_productos(df_prod)
-            df_prod = df_prod[['producto_id', 'nombre_producto', 'tipo']]
-            loader.load_data(df_prod, "productos_financieros")
-
-        # -----------------------------------------------------
-        # 5. VERIFICACIÓN DE INTEGRIDAD
-        # -----------------------------------------------------
-        logger.info("--- FASE 3: VERIFICACION DE INTEGRIDAD ---")
-        valid_clients = loader.get_valid_ids_from_db("clientes", "cliente_id")
-        valid_products = loader.get_valid_ids_from_db("productos_financieros", "producto_id")
-        logger.info(f"Snapshot DB -> Clientes: {len(valid_clients)} | Productos: {len(valid_products)}")
+        workers = max_workers or int(os.getenv("ETL_MAX_WORKERS", "4"))
+        dag = build_dag(extractor, transformer, validator, loader, RAW_DIR, checkpoints,
+                        max_workers=workers, sharder=sharder, lineage=lineage)
+        selection = [name for name in (only or dag.tasks) if name not in completed]
+        status = dag.run(only=selection)
 
-        # -----------------------------------------------------
-        # 6. PROCESAMIENTO DE TRANSACCIONES
-        # -----------------------------------------------------
-        logger.info("--- FASE 4: PROCESANDO TRANSACCIONES ---")
-        df_tx = extractor.extract_json(os.path.join(RAW_DIR, "transacciones_raw.json"))
-        
-        if not df_tx.empty:
-            df_tx = transformer.clean_transacciones(df_tx)
-            df_tx = validator.validate_transacciones(df_tx)
-            
-            # Filtro cruzado contra DB
-            mask_cli = df_tx['cliente_id'].astype(str).isin(valid_clients)
-            mask_prod = df_tx['producto_id'].astype(str).isin(valid_products)
-            
-            df_final = df_tx[mask_cli & mask_prod]
-            n_dropped = len(df_tx) - len(df_final)
-            
-            if n_dropped > 0:
-                logger.warning(f"ALERTA: Se descartaron {n_dropped} transacciones por integridad referencial.")
-            
-            loader.load_data(df_final, "transacciones")
+        for name, state in status.items():
+            logger.info(f"[DAG] {name}: {state}")
 
         elapsed = time.time() - start_time
         logger.info(f"FIN DEL PROCESO. TIEMPO TOTAL: {elapsed:.2f} SEGUNDOS")
 
+        # Con TRUNCATE (en esta corrida o en la que se reanuda) los consumidores recargan todo;
+        # se registra aunque la corrida falle después, porque las tablas ya se vaciaron
+        full_reload = status.get(TASK_PREPARE) == SUCCESS or TASK_PREPARE in completed
+        if any(state not in (SUCCESS, NOT_SELECTED) for state in status.values()):
+            raise RuntimeError("Una o más tareas del DAG no terminaron correctamente (usar --resume).")
+        if only is None:
+            checkpoints.finish_run()
+        succeeded = True
+
     except Exception as e:
         logger.error(f"ERROR CRITICO EN EL PIPELINE: {e}", exc_info=True)
         sys.exit(1)
 
+    finally:
+        if loader is not None:
+            _record_run(run_id, started_at, succeeded, full_reload, loader, checkpoints,
+                        instrumentation, lineage, [validator, sharder])
+        if instrumentation is not None:
+            metrics_path = instrumentation.export_json()
+            logger.info(f"Métricas de la corrida {run_id} -> {metrics_path}")
+
 if __name__ == "__main__":
-    run_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pipeline ETL Financiero (DAG)")
+    parser.add_argument("--tasks", help="Subconjunto de tareas separadas por coma (ej. clientes,productos)")
+    parser.add_argument("--workers", type=int, help="Tamaño del pool de workers")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanudar la última corrida fallida desde su primera etapa pendiente")
+    args = parser.parse_args()
+
+    run_pipeline(
+        only=args.tasks.split(",") if args.tasks else None,
+        max_workers=args.workers,
+        resume=args.resume,
+    )
@@ -0,0 +1,108 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.transform import money
+
+# Fecha/hora ISO-8601 (con o sin hora y fracción de segundo)
+ISO_DATETIME_PATTERN = r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$"
+
+# Formatos de respaldo si el cast ISO directo falla (ej. '2024-02-30')
+DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+# Número decimal válido (equivale a pd.to_numeric(errors='coerce') sobre texto)
+NUMERIC_PATTERN = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+
+
+def _as_string(arr):
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        return arr
+    return pc.cast(arr, pa.string())
+
+
+def clean_id(arr):
+    """Equivalente Arrow de astype(str).str.strip().str.upper() (nulos -> 'NAN')."""
+    return pc.utf8_upper(pc.utf8_trim_whitespace(pc.fill_null(_as_string(arr), "nan")))
+
+
+def lower_strip(arr):
+    return pc.utf8_trim_whitespace(pc.utf8_lower(_as_string(arr)))
+
+
+def upper_strip(arr):
+    return pc.utf8_trim_whitespace(pc.utf8_upper(_as_string(arr)))
+
+
+def title_strip(arr):
+    return pc.utf8_trim_whitespace(pc.utf8_title(_as_string(arr)))
+
+
+def to_timestamp(arr):
+    """Equivalente de pd.to_datetime(errors='coerce'): lo no parseable queda nulo."""
+    if pa.types.is_timestamp(arr.type) or pa.types.is_date(arr.type):
+        return pc.cast(arr, pa.timestamp("ns"))
+    text = pc.utf8_trim_whitespace(_as_string(arr))
+    iso = pc.fill_null(pc.match_substring_regex(text, ISO_DATETIME_PATTERN), False)
+    text = pc.if_else(iso, text, pa.scalar(None, pa.string()))
+    try:
+        return pc.cast(text, pa.timestamp("ns"))
+    except pa.ArrowInvalid:
+        # Alguna fecha con forma ISO pero inválida: parseo tolerante (sin fracción de segundo)
+        text = pc.replace_substring_regex(text, r"\.\d+$", "")
+        parsed = pc.coalesce(*[pc.strptime(text, format=fmt, unit="ns", error_is_null=True) for fmt in DATE_FORMATS])
+        # strptime normaliza fechas imposibles (30-feb -> 1-mar); pandas las anula
+        same_day = pc.equal(pc.strftime(parsed, "%Y-%m-%d"), pc.utf8_slice_codeunits(text, 0, 10))
+        return pc.if_else(pc.fill_null(same_day, False), parsed, pa.scalar(None, pa.timestamp("ns")))
+
+
+def to_float(arr):
+    """Equivalente de pd.to_numeric(errors='coerce') a float64."""
+    if pa.types.is_integer(arr.type) or pa.types.is_floating(arr.type) or pa.types.is_decimal(arr.type):
+        return pc.cast(arr, pa.float64())
+    text = _as_string(arr)
+    valid = pc.fill_null(pc.match_substring_regex(text, NUMERIC_PATTERN), False)
+    cleaned = pc.if_else(valid, pc.utf8_trim_whitespace(text), pa.scalar(None, pa.string()))
+    return pc.cast(cleaned, pa.float64())
+
+
+def to_cents(arr):
+    """Monto crudo -> centavos int64 (mismo parseo que to_float, luego punto fijo)."""
+    return money.arrow_cents_from_float(to_float(arr))
+
+
+def _apply(table: pa.Table, rules: dict) -> pa.Table:
+    """Aplica {columna: función} a las columnas presentes, conservando el orden."""
+    for column, func in rules.items():
+        if column in table.column_names:
+            idx = table.column_names.index(column)
+            table = table.set_column(idx, column, func(table[column]))
+    return table
+
+
+def clean_clientes(table: pa.Table) -> pa.Table:
+    return _apply(table, {
+        "cliente_id": clean_id,
+        "email": lower_strip,
+        "segmento": upper_strip,
+        "fecha_registro": to_timestamp,
+    })
+
+
+def clean_productos(table: pa.Table) -> pa.Table:
+    return _apply(table, {
+        "producto_id": clean_id,
+        "nombre_producto": title_strip,
+        "tipo": upper_strip,
+    })
+
+
+def clean_transacciones(table: pa.Table) -> pa.Table:
+    table = _apply(table, {
+        "transaccion_id": clean_id,
+        "cliente_id": clean_id,
+        "producto_id": clean_id,
+        "fecha_transaccion": to_timestamp,
+        money.MONEY_COLUMN: to_cents,
+        "tipo_movimiento": upper_strip,
+    })
+    return table.rename_columns([money.CENTS_COLUMN if name == money.MONEY_COLUMN else name
+                                 for name in table.column_names])
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Columna de la DB (DECIMAL(15, 2)) y columna del pipeline en centavos (int64)
+MONEY_COLUMN = "monto"
+CENTS_COLUMN = "monto_centavos"
+
+# Unidades menores por unidad (2 decimales) y tipo exacto con el que se carga
+CENTS_PER_UNIT = 100
+DB_MONEY_TYPE = pa.decimal128(15, 2)
+
+# Tipo intermedio: un int64 cabe completo en 19 dígitos con escala 0
+_UNSCALED_TYPE = pa.decimal128(19, 0)
+
+# Mayor monto en centavos que cabe en DECIMAL(15, 2): 9_999_999_999_999.99
+MAX_CENTS = 10 ** DB_MONEY_TYPE.precision - 1
+
+# Decimales con los que se limpia el ruido binario de monto * 100 antes de
+# redondear (1.005 * 100 = 100.49999999999999 en float64)
+_SCALE_DIGITS = 6
+
+
+def cents_from_float(values: pd.Series) -> pd.Series:
+    """
+    float (unidades) -> centavos int64 (nullable). DECIMAL(15, 2) tiene a lo
+    sumo 15 dígitos significativos, que float64 representa con error menor a
+    medio centavo: redondear al centavo recupera el valor exacto.
+
+    El redondeo es half away from zero, como el cast de PostgreSQL a NUMERIC
+    (1.005 -> 1.01, -1.005 -> -1.01). Lo no numérico, infinito o fuera del
+    rango de DECIMAL(15, 2) queda nulo, y el validador lo rechaza.
+    """
+    values = values.where(np.isfinite(values)).astype("float64")
+    scaled = (values.abs() * CENTS_PER_UNIT).round(_SCALE_DIGITS)
+    cents = np.floor(scaled + 0.5) * np.sign(values)
+    return cents.where(cents.abs() <= MAX_CENTS).astype("Int64")
+
+
+def arrow_cents_from_float(arr) -> pa.Array:
+    """Equivalente Arrow de cents_from_float (mismo redondeo y mismo rango)."""
+    finite = pc.fill_null(pc.is_finite(arr), False)
+    arr = pc.if_else(finite, arr, pa.scalar(None, pa.float64()))
+    scaled = pc.round(pc.multiply(pc.abs(arr), float(CENTS_PER_UNIT)), _SCALE_DIGITS)
+    cents = pc.multiply(pc.floor(pc.add(scaled, 0.5)), pc.sign(arr))
+    in_range = pc.less_equal(pc.abs(cents), float(MAX_CENTS))
+    return pc.cast(pc.if_else(in_range, cents, pa.scalar(None, pa.float64())), pa.int64())
+
+
+def cents_series(cents, index=None) -> pd.Series:
+    """Columna Arrow de centavos -> Series Int64 exacta (sin pasar por float64)."""
+    table = pa.table({CENTS_COLUMN: cents})
+    series = table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)[CENTS_COLUMN]
+    if index is not None:
+        series.index = index
+    return series
+
+
+def cents_to_decimal(cents) -> pa.Array:
+    """
+    Centavos int64 -> decimal128(15, 2) exacto. El valor sin escala de un
+    decimal con escala 2 es justamente el número de centavos, así que basta
+    reinterpretar los buffers (sin aritmética ni float). Un monto que no cabe
+    en DECIMAL(15, 2) falla aquí, igual que fallaría en la DB.
+    """
+    if isinstance(cents, pd.Series):
+        cents = pa.array(cents, pa.int64())
+    scaled = pa.decimal128(_UNSCALED_TYPE.precision, DB_MONEY_TYPE.scale)
+    unscaled = pc.cast(cents, _UNSCALED_TYPE)
+    if isinstance(unscaled, pa.ChunkedArray):
+        view = pa.chunked_array([chunk.view(scaled) for chunk in unscaled.chunks], scaled)
+    else:
+        view = unscaled.view(scaled)
+    return pc.cast(view, DB_MONEY_TYPE)
+
+
+def encode_money(data):
+    """
+    Reemplaza la columna en centavos por la columna de la DB como decimal
+    exacto, en la misma posición. Tablas Arrow: decimal128 (el COPY lo
+    serializa como texto '12.34'); DataFrames: objetos Decimal.
+    """
+    if CENTS_COLUMN not in (data.column_names if isinstance(data, pa.Table) else data.columns):
+        return data
+    if isinstance(data, pa.Table):
+        idx = data.column_names.index(CENTS_COLUMN)
+        return data.set_column(idx, MONEY_COLUMN, cents_to_decimal(data[CENTS_COLUMN]))
+    data = data.copy()
+    data[CENTS_COLUMN] = cents_to_decimal(data[CENTS_COLUMN]).to_pandas().to_numpy()
+    return data.rename(columns={CENTS_COLUMN: MONEY_COLUMN})
+
+
+def total_cents(cents) -> int:
+    """Suma exacta en centavos (entera, vectorizada) de una columna Arrow o pandas."""
+    if isinstance(cents, pd.Series):
+        return int(cents.sum())
+    return pc.sum(cents).as_py() or 0
@@ -0,0 +1,77 @@
+import pandas as pd
+import pyarrow as pa
+
+from src.transform.money import CENTS_COLUMN, MONEY_COLUMN
+from src.utils.frames import is_arrow, like_input, to_arrow
+
+# Prefijo de las columnas con el valor crudo (previo a la limpieza) de cada columna
+RAW_PREFIX = "_crudo_"
+
+# Columna limpia que reemplaza a una cruda cuando la limpieza la renombra
+_CLEANED_NAME = {MONEY_COLUMN: CENTS_COLUMN}
+
+
+def _columns(data) -> list:
+    return list(data.schema.names if is_arrow(data) else data.columns)
+
+
+def attach_raw(cleaned, raw):
+    """
+    Agrega a 'cleaned' el valor crudo de cada columna de 'raw' (mismas filas,
+    mismo orden: la limpieza no descarta filas) como '_crudo_<columna>'. Así
+    la cuarentena puede guardar la fila tal como llegó, no la ya convertida.
+    Un DataFrame se modifica en su lugar (es la copia propia de la limpieza).
+    """
+    if is_arrow(cleaned):
+        table, raw = to_arrow(cleaned), to_arrow(raw)
+        for column in raw.column_names:
+            table = table.append_column(RAW_PREFIX + column, raw[column])
+        return like_input(table, cleaned)
+    for column in raw.columns:
+        cleaned[RAW_PREFIX + column] = raw[column].to_numpy()
+    return cleaned
+
+
+def strip_raw(data):
+    """Quita las columnas crudas (filas aprobadas, que siguen hacia la carga)."""
+    raw_columns = [c for c in _columns(data) if c.startswith(RAW_PREFIX)]
+    if not raw_columns:
+        return data
+    if is_arrow(data):
+        return like_input(to_arrow(data).drop(raw_columns), data)
+    return data.drop(columns=raw_columns)
+
+
+def restore_raw(data):
+    """
+    Reemplaza cada columna limpia por su valor crudo, con el nombre original
+    ('monto_centavos' vuelve a ser 'monto'). Las columnas sin crudo (ej.
+    'error_reason') se conservan. Sin columnas crudas retorna 'data' tal cual.
+    """
+    columns = _columns(data)
+    raw_columns = [c for c in columns if c.startswith(RAW_PREFIX)]
+    if not raw_columns:
+        return data
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])
+    originals = {c[len(RAW_PREFIX):]: c for c in raw_columns}
+    cleaned_of = {_CLEANED_NAME.get(name, name): name for name in originals}
+
+    order, values = [], []
+    for column in columns:
+        if column in raw_columns:
+            continue
+        name = cleaned_of.pop(column, None)
+        source = originals.pop(name) if name is not None else column
+        order.append(name or column)
+        values.append(data[source])
+    # Columnas crudas sin columna limpia correspondiente (la limpieza las quitó)
+    for name, source in originals.items():
+        order.append(name)
+        values.append(data[source])
+
+    if is_arrow(data):
+        return like_input(pa.table(values, names=order), data)
+    result = pd.concat(values, axis=1)
+    result.columns = order
+    return result
@@ -1,20 +1,58 @@
 import pandas as pd
 import numpy as np
 
+from src.transform import arrow_backend, money
+from src.transform.raw import attach_raw
+from src.utils.frames import resolve_backend, to_arrow, like_input, select_columns
+
 class DataTransformer:
     """
     Módulo encargado de la limpieza, normalización y estandarización de datos.
     Convierte datos 'RAW' (crudos) en datos 'SILVER' (limpios estructuralmente).
+
+    backend='arrow' (o ETL_BACKEND=arrow) ejecuta las mismas reglas con
+    kernels de pyarrow.compute sobre tablas / record batches de Arrow.
+
+    Clientes y transacciones (las entidades con cuarentena) llevan además el
+    valor crudo de cada columna ('_crudo_<columna>', ver transform/raw.py):
+    el validador lo quita de los aprobados y guarda en cuarentena la fila
+    original, que el reproceso vuelve a limpiar con las reglas vigentes.
     """
+
+    def __init__(self, backend: str = None):
+        self.backend = resolve_backend(backend)
+
+    def _run_arrow(self, rules, data):
+        """
+        Aplica las reglas Arrow y retorna el resultado en el tipo de la entrada.
+        Con un DataFrame se conservan el índice y los centavos como Int64,
+        igual que en el motor pandas.
+        """
+        table = rules(to_arrow(data))
+        result = like_input(table, data)
+        if isinstance(data, pd.DataFrame):
+            result.index = data.index
+            if money.CENTS_COLUMN in table.column_names:
+                result[money.CENTS_COLUMN] = money.cents_series(table[money.CENTS_COLUMN], data.index)
+        return result
+
+    def select_columns(self, data, columns: list):
+        """Proyección de columnas (DataFrame o tabla Arrow)."""
+        return select_columns(data, columns)
     
     def _clean_id_column(self, series: pd.Series) -> pd.Series:
-        """Helper para limpiar columnas de ID (quita espacios y mayúsculas)."""
-        return series.astype(str).str.strip().str.upper()
+        """
+        Helper para limpiar columnas de ID (quita espacios y mayúsculas).
+        Los nulos (None o NaN) quedan como 'NAN', igual que en el motor Arrow.
+        """
+        return series.where(series.notna(), "nan").astype(str).str.strip().str.upper()
 
     def clean_clientes(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normaliza datos de clientes."""
         print("   🔄 Transformando Clientes...")
-        df = df.copy()
+        if self.backend == "arrow":
+            return attach_raw(self._run_arrow(arrow_backend.clean_clientes, df), df)
+        raw, df = df, df.copy()
         
         # 0. Limpieza CRÍTICA de IDs (para evitar errores de SQL)
         if 'cliente_id' in df.columns:
@@ -30,13 +68,15 @@ class DataTransformer:
             
         # 3. Convertir fechas
         if 'fecha_registro' in df.columns:
-            df['fecha_registro'] = pd.to_datetime(df['fecha_registro'], errors='coerce')
+            df['fecha_registro'] = pd.to_datetime(df['fecha_registro'], errors='coerce', format='ISO8601')
             
-        return df
+        return attach_raw(df, raw)
 
     def clean_productos(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normaliza catálogo de productos."""
         print("   🔄 Transformando Productos...")
+        if self.backend == "arrow":
+            return self._run_arrow(arrow_backend.clean_productos, df)
         df = df.copy()
         
         # 0. Limpieza CRÍTICA de IDs
@@ -56,7 +96,9 @@ class DataTransformer:
     def clean_transacciones(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normaliza transacciones financieras."""
         print("   🔄 Transformando Transacciones...")
-        df = df.copy()
+        if self.backend == "arrow":
+            return attach_raw(self._run_arrow(arrow_backend.clean_transacciones, df), df)
+        raw, df = df, df.copy()
         
         # 0. Limpieza CRÍTICA de IDs (Foreign Keys)
         if 'transaccion_id' in df.columns:
@@ -68,14 +110,15 @@ class DataTransformer:
         
         # 1. Convertir fechas
         if 'fecha_transaccion' in df.columns:
-            df['fecha_transaccion'] = pd.to_datetime(df['fecha_transaccion'], errors='coerce')
+            df['fecha_transaccion'] = pd.to_datetime(df['fecha_transaccion'], errors='coerce', format='ISO8601')
             
-        # 2. Asegurar monto float
-        if 'monto' in df.columns:
-            df['monto'] = pd.to_numeric(df['monto'], errors='coerce')
+        # 2. Monto a centavos enteros (punto fijo): validación y carga sin float
+        if money.MONEY_COLUMN in df.columns:
+            df[money.MONEY_COLUMN] = money.cents_from_float(pd.to_numeric(df[money.MONEY_COLUMN], errors='coerce'))
+            df = df.rename(columns={money.MONEY_COLUMN: money.CENTS_COLUMN})
             
         # 3. Tipo de movimiento
         if 'tipo_movimiento' in df.columns:
             df['tipo_movimiento'] = df['tipo_movimiento'].str.upper().str.strip()
             
-        return df
+        return attach_raw(df, raw)
@@ -0,0 +1,44 @@
+import os
+
+import pyarrow as pa
+
+from src.utils.frames import to_arrow
+
+# Extensión de los archivos de intercambio entre etapas
+IPC_SUFFIX = ".arrow"
+
+# Filas por record batch al escribir (acota la memoria de un lector por lotes)
+IPC_BATCH_ROWS = 1_000_000
+
+
+def write_ipc(data, path: str, batch_rows: int = IPC_BATCH_ROWS) -> str:
+    """
+    Escribe un DataFrame o tabla Arrow como archivo Arrow IPC sin compresión.
+    Es el formato de intercambio entre etapas y procesos: el lector lo abre con
+    memory-map y usa los buffers del archivo tal cual, sin deserializar.
+    La escritura es atómica (archivo temporal + rename).
+    """
+    table = to_arrow(data)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=batch_rows)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_ipc(path: str) -> pa.Table:
+    """
+    Abre un archivo IPC por memory-map. La tabla resultante apunta a las páginas
+    del archivo: abrirla no copia datos ni aumenta el RSS hasta que se leen.
+    """
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def iter_ipc_batches(path: str):
+    """Recorre un archivo IPC record batch por record batch (memoria acotada)."""
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
+
@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+# Motores de ejecución soportados por Transformer / Validator / Extractor
+BACKENDS = ("pandas", "arrow")
+
+
+def resolve_backend(backend: str = None) -> str:
+    """Motor explícito o el configurado en ETL_BACKEND (por defecto 'pandas')."""
+    backend = (backend or os.getenv("ETL_BACKEND", "pandas")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend no soportado: {backend}. Opciones: {BACKENDS}")
+    return backend
+
+
+def is_arrow(data) -> bool:
+    return isinstance(data, (pa.Table, pa.RecordBatch))
+
+
+def is_empty(data) -> bool:
+    """Vacío para DataFrame, tabla Arrow o record batch."""
+    if is_arrow(data):
+        return data.num_rows == 0
+    return data.empty
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Columnas que Arrow no puede tipar (ej. 'monto' crudo con texto y números)
+    pasan a texto, conservando los nulos; las demás quedan intactas.
+    """
+    fixed = None
+    for column in df.columns:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if fixed is None:
+                fixed = df.copy()
+            values = df[column]
+            fixed[column] = values.astype(str).where(values.notna(), None)
+    return df if fixed is None else fixed
+
+
+def to_arrow(data) -> pa.Table:
+    """
+    Normaliza DataFrame / RecordBatch / Table a pa.Table. Las columnas de
+    tipos mezclados (datos crudos aún sin validar) se convierten a texto.
+    """
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    try:
+        return pa.Table.from_pandas(data, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.Table.from_pandas(_arrow_safe(data), preserve_index=False)
+
+
+def like_input(table: pa.Table, original):
+    """Retorna el resultado en el mismo tipo que la entrada (DataFrame, Table o RecordBatch)."""
+    if isinstance(original, pd.DataFrame):
+        return table.to_pandas()
+    if isinstance(original, pa.RecordBatch):
+        return table.combine_chunks().to_batches()[0] if table.num_rows else \
+            pa.RecordBatch.from_pylist([], schema=table.schema)
+    return table
+
+
+def select_columns(data, columns: list):
+    """Proyección de columnas agnóstica al motor."""
+    if is_arrow(data):
+        return data.select(columns)
+    return data[columns]
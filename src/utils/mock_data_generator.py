@@ -1,45 +1,87 @@
 import pandas as pd
 import numpy as np
 import os
+import shutil
+import tempfile
 from datetime import datetime, timedelta
+from multiprocessing import Pool
 import random
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
 # Configuración de rutas
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 
-def generate_mock_data():
+# Formatos de salida del generador por bloques (transacciones)
+OUTPUT_FORMATS = ("csv", "ndjson", "parquet", "partitioned")
+
+# Tasas de suciedad por defecto del generador por bloques
+DEFAULT_DIRTY_RATES = {
+    "duplicate_id": 0.001,     # clientes con ID de otro cliente
+    "bad_email": 0.001,        # emails sin '@'
+    "null_name": 0.001,        # nombres nulos
+    "negative_amount": 0.001,  # transacciones con monto negativo
+}
+
+TX_EPOCH = np.datetime64("2024-01-01T00:00:00", "s")
+PRODUCTOS_TX = ["P01", "P02", "P03"]
+
+def _dirty_rows(rng, n: int, ratio: float, legacy_row: int) -> np.ndarray:
+    """
+    Filas a ensuciar: con ratio=None se ensucia una única fila fija
+    (comportamiento histórico); con ratio se elige esa proporción al azar.
+    """
+    if ratio is None:
+        return np.array([legacy_row]) if n > legacy_row else np.array([], dtype=int)
+    k = int(round(n * ratio))
+    return rng.choice(n, size=k, replace=False) if k else np.array([], dtype=int)
+
+def generate_mock_data(output_dir: str = RAW_DIR, n_clientes: int = 100, n_tx: int = 500,
+                       dirty_ratio: float = None, tx_span_days: int = None, seed: int = None):
     """
     Genera datos sintéticos para simular un entorno financiero real.
     Incluye datos sucios intencionalmente para probar el módulo de Data Quality.
+
+    Parámetros de escala (los valores por defecto reproducen el set histórico):
+    - n_clientes / n_tx: volumen de clientes y transacciones.
+    - dirty_ratio: proporción de filas sucias por tipo de error (None = una fila por error).
+    - tx_span_days: reparte las transacciones en N días (None = una por hora).
+    - seed: semilla para reproducibilidad.
     """
-    print(f"⚙️ Generando datos en: {RAW_DIR}")
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"⚙️ Generando datos en: {output_dir}")
     
     # ---------------------------------------------------------
     # 1. CLIENTES (CSV)
     # ---------------------------------------------------------
-    n_clientes = 100
     ids = [f"C{str(i).zfill(4)}" for i in range(1, n_clientes + 1)]
     
     data_clientes = {
         "cliente_id": ids,
         "nombre": [f"Cliente_{i}" for i in range(1, n_clientes + 1)],
         "email": [f"cliente{i}@email.com" for i in range(1, n_clientes + 1)],
-        "fecha_registro": pd.date_range(start="2023-01-01", periods=n_clientes, freq="D"),
-        "segmento": np.random.choice(["PREMIUM", "REGULAR", "JUNIOR"], n_clientes)
+        "fecha_registro": pd.Timestamp("2023-01-01") + pd.to_timedelta(np.arange(n_clientes) % 3650, unit="D"),
+        "segmento": rng.choice(["PREMIUM", "REGULAR", "JUNIOR"], n_clientes)
     }
     
     df_clientes = pd.DataFrame(data_clientes)
     
     # INYECTAR SUCIEDAD (Data Quality Tests)
-    # Duplicamos un ID
-    df_clientes.loc[5, "cliente_id"] = "C0001" 
-    # Un email inválido
-    df_clientes.loc[10, "email"] = "email_sin_arroba.com"
-    # Un nulo
-    df_clientes.loc[15, "nombre"] = None
+    # IDs duplicados (copian el ID de otro cliente)
+    dup_rows = _dirty_rows(rng, n_clientes, dirty_ratio, 5)
+    df_clientes.loc[dup_rows, "cliente_id"] = "C0001" if dirty_ratio is None else \
+        df_clientes["cliente_id"].to_numpy()[rng.integers(0, n_clientes, len(dup_rows))]
+    # Emails inválidos
+    df_clientes.loc[_dirty_rows(rng, n_clientes, dirty_ratio, 10), "email"] = "email_sin_arroba.com"
+    # Nombres nulos
+    df_clientes.loc[_dirty_rows(rng, n_clientes, dirty_ratio, 15), "nombre"] = None
     
-    csv_path = os.path.join(RAW_DIR, "clientes_raw.csv")
+    csv_path = os.path.join(output_dir, "clientes_raw.csv")
     df_clientes.to_csv(csv_path, index=False)
     print(f"✅ Generado: {csv_path} (con errores intencionales)")
 
@@ -55,34 +97,251 @@ def generate_mock_data():
     }
     df_productos = pd.DataFrame(data_productos)
     
-    excel_path = os.path.join(RAW_DIR, "productos_master.xlsx")
+    excel_path = os.path.join(output_dir, "productos_master.xlsx")
     df_productos.to_excel(excel_path, index=False)
     print(f"✅ Generado: {excel_path}")
 
     # ---------------------------------------------------------
     # 3. TRANSACCIONES (JSON)
     # ---------------------------------------------------------
-    n_tx = 500
+    if tx_span_days is None:
+        fechas = pd.date_range(start="2024-01-01", periods=n_tx, freq="h")
+    else:
+        # Reparto uniforme (y ordenado) dentro de la ventana de días
+        offsets = np.arange(n_tx, dtype=np.int64) * (tx_span_days * 86400) // max(n_tx, 1)
+        fechas = pd.Timestamp("2024-01-01") + pd.to_timedelta(offsets, unit="s")
     
     data_tx = {
         "transaccion_id": [f"TX{str(i).zfill(6)}" for i in range(1, n_tx + 1)],
-        "cliente_id": np.random.choice(ids, n_tx),
-        "producto_id": np.random.choice(["P01", "P02", "P03"], n_tx),
-        "monto": np.round(np.random.uniform(10.0, 5000.0, n_tx), 2),
-        "fecha_transaccion": pd.date_range(start="2024-01-01", periods=n_tx, freq="H").astype(str),
-        "tipo_movimiento": np.random.choice(["ENTRADA", "SALIDA"], n_tx)
+        "cliente_id": rng.choice(ids, n_tx),
+        "producto_id": rng.choice(["P01", "P02", "P03"], n_tx),
+        "monto": np.round(rng.uniform(10.0, 5000.0, n_tx), 2),
+        "fecha_transaccion": fechas.astype(str),
+        "tipo_movimiento": rng.choice(["ENTRADA", "SALIDA"], n_tx)
     }
     
     df_tx = pd.DataFrame(data_tx)
     
     # INYECTAR ERROR LÓGICO
-    # Monto negativo (no permitido por reglas de negocio si no es un ajuste)
-    df_tx.loc[0, "monto"] = -500.00
+    # Montos negativos (no permitidos por reglas de negocio si no es un ajuste)
+    neg_rows = _dirty_rows(rng, n_tx, dirty_ratio, 0)
+    df_tx.loc[neg_rows, "monto"] = -df_tx.loc[neg_rows, "monto"] if dirty_ratio is not None else -500.00
     
-    json_path = os.path.join(RAW_DIR, "transacciones_raw.json")
+    json_path = os.path.join(output_dir, "transacciones_raw.json")
     # Orient='records' crea una lista de objetos JSON, típico de APIs
     df_tx.to_json(json_path, orient="records", indent=4)
     print(f"✅ Generado: {json_path}")
 
+# ---------------------------------------------------------
+# GENERADOR POR BLOQUES (volúmenes realistas, hasta 100M filas)
+# ---------------------------------------------------------
+def _format_ids(prefix: str, numbers: np.ndarray, width: int) -> pa.Array:
+    """IDs tipo C0001 / TX000001 construidos con kernels de Arrow (sin bucles Python)."""
+    digits = pc.utf8_lpad(pc.cast(pa.array(numbers), pa.string()), width=width, padding="0")
+    return pc.binary_join_element_wise(prefix, digits, "")
+
+def _inject(rng, n: int, rate: float) -> np.ndarray:
+    """Máscara booleana con la proporción 'rate' de filas marcadas al azar."""
+    return rng.random(n) < rate if rate else np.zeros(n, dtype=bool)
+
+def _clientes_chunk(chunk_idx: int, start: int, n: int, n_clientes: int, seed: int, rates: dict) -> pa.Table:
+    rng = np.random.default_rng([seed, 1, chunk_idx])
+    width = max(4, len(str(n_clientes)))
+    numbers = np.arange(start + 1, start + n + 1)
+
+    id_numbers = numbers.copy()
+    dup = _inject(rng, n, rates["duplicate_id"])
+    id_numbers[dup] = rng.integers(1, n_clientes + 1, dup.sum())
+
+    nombre = pc.binary_join_element_wise("Cliente_", pc.cast(pa.array(numbers), pa.string()), "")
+    email = pc.binary_join_element_wise("cliente", pc.cast(pa.array(numbers), pa.string()), "@email.com", "")
+    bad_email = _inject(rng, n, rates["bad_email"])
+    email = pc.if_else(pa.array(bad_email), "email_sin_arroba.com", email)
+    null_name = _inject(rng, n, rates["null_name"])
+    nombre = pc.if_else(pa.array(null_name), pa.scalar(None, pa.string()), nombre)
+
+    registro = (np.datetime64("2023-01-01", "D") + (numbers - 1) % 3650).astype("datetime64[s]")
+    return pa.table({
+        "cliente_id": _format_ids("C", id_numbers, width),
+        "nombre": nombre,
+        "email": email,
+        "fecha_registro": pc.strftime(pa.array(registro), "%Y-%m-%d"),
+        "segmento": pa.array(rng.choice(["PREMIUM", "REGULAR", "JUNIOR"], n)),
+    })
+
+def _tx_chunk(chunk_idx: int, start: int, n: int, n_tx: int, n_clientes: int, seed: int,
+              rates: dict, tx_span_days: int, text_dates: bool) -> pa.Table:
+    rng = np.random.default_rng([seed, 2, chunk_idx])
+    numbers = np.arange(start + 1, start + n + 1)
+
+    monto = np.round(rng.uniform(10.0, 5000.0, n), 2)
+    negative = _inject(rng, n, rates["negative_amount"])
+    monto[negative] = -monto[negative]
+
+    # Fechas ordenadas y repartidas uniformemente en la ventana (bloques contiguos en el tiempo)
+    offsets = (numbers - 1) * (tx_span_days * 86400) // max(n_tx, 1)
+    fechas = pa.array(TX_EPOCH + offsets.astype("timedelta64[s]"))
+    if text_dates:
+        fechas = pc.strftime(fechas, "%Y-%m-%d %H:%M:%S")
+
+    return pa.table({
+        "transaccion_id": _format_ids("TX", numbers, max(6, len(str(n_tx)))),
+        "cliente_id": _format_ids("C", rng.integers(1, n_clientes + 1, n), max(4, len(str(n_clientes)))),
+        "producto_id": pa.array(rng.choice(PRODUCTOS_TX, n)),
+        "monto": pa.array(monto),
+        "fecha_transaccion": fechas,
+        "tipo_movimiento": pa.array(rng.choice(["ENTRADA", "SALIDA"], n)),
+    })
+
+def _write_part(table: pa.Table, path: str, fmt: str, include_header: bool):
+    if fmt == "csv":
+        pa_csv.write_csv(table, path, pa_csv.WriteOptions(include_header=include_header))
+    elif fmt == "ndjson":
+        table.to_pandas().to_json(path, orient="records", lines=True)
+    else:
+        pq.write_table(table, path)
+
+def _chunk_worker(task: dict) -> str:
+    """Genera y escribe un bloque en un proceso worker. Retorna la ruta escrita."""
+    fmt = task["fmt"]
+    if task["entity"] == "clientes":
+        table = _clientes_chunk(task["chunk_idx"], task["start"], task["n"],
+                                task["n_clientes"], task["seed"], task["rates"])
+    else:
+        table = _tx_chunk(task["chunk_idx"], task["start"], task["n"], task["n_tx"], task["n_clientes"],
+                          task["seed"], task["rates"], task["tx_span_days"],
+                          text_dates=fmt in ("csv", "ndjson"))
+
+    if fmt == "partitioned":
+        # Un archivo por (mes, bloque): mes=YYYY-MM/part-00000.parquet
+        meses = pc.strftime(table["fecha_transaccion"], "%Y-%m")
+        for mes in pc.unique(meses).to_pylist():
+            part_dir = os.path.join(task["out_dir"], f"mes={mes}")
+            os.makedirs(part_dir, exist_ok=True)
+            pq.write_table(table.filter(pc.equal(meses, mes)),
+                           os.path.join(part_dir, f"part-{task['chunk_idx']:05d}.parquet"))
+        return task["out_dir"]
+
+    path = os.path.join(task["out_dir"], f"part-{task['chunk_idx']:05d}")
+    _write_part(table, path, fmt, include_header=task["chunk_idx"] == 0)
+    return path
+
+def _merge_parts(parts: list, dest: str, fmt: str):
+    """Une los bloques (en orden) en un único archivo, en streaming."""
+    if fmt == "parquet":
+        writer = None
+        for part in parts:
+            table = pq.read_table(part)
+            if writer is None:
+                writer = pq.ParquetWriter(dest, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+        return
+    with open(dest, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, length=16 * 1024 * 1024)
+                # NDJSON: garantizar salto de línea entre bloques
+                if fmt == "ndjson" and f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        out.write(b"\n")
+
+def _generate_entity(pool, entity: str, n_rows: int, dest: str, fmt: str, chunk_size: int, **params):
+    tmp_dir = tempfile.mkdtemp(prefix=f"gen_{entity}_", dir=os.path.dirname(dest))
+    out_dir = dest if fmt == "partitioned" else tmp_dir
+    if fmt == "partitioned":
+        shutil.rmtree(dest, ignore_errors=True)
+        os.makedirs(dest)
+
+    tasks = [
+        dict(params, entity=entity, fmt=fmt, chunk_idx=i, start=start,
+             n=min(chunk_size, n_rows - start), out_dir=out_dir)
+        for i, start in enumerate(range(0, n_rows, chunk_size))
+    ]
+    # imap conserva el orden de los bloques; cada worker escribe su parte a disco
+    parts = list(pool.imap(_chunk_worker, tasks))
+    if fmt != "partitioned":
+        _merge_parts(parts, dest, fmt)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"✅ Generado: {dest} ({n_rows:,} filas, {len(tasks)} bloques)")
+
+def generate_chunked(output_dir: str = RAW_DIR, n_clientes: int = 100_000, n_tx: int = 10_000_000,
+                     fmt: str = "ndjson", chunk_size: int = 1_000_000, workers: int = None,
+                     seed: int = 0, dirty_rates: dict = None, tx_span_days: int = 365):
+    """
+    Generador por bloques para volúmenes realistas (hasta 100M transacciones).
+
+    Cada bloque se genera en un proceso worker con una semilla derivada de
+    (seed, entidad, nro_bloque), por lo que el resultado es determinista sin
+    importar el número de workers. La memoria queda acotada a
+    workers x chunk_size filas. Se conserva la inyección de suciedad
+    (IDs duplicados, emails inválidos, nombres nulos, montos negativos)
+    con tasas configurables en 'dirty_rates'.
+
+    Formatos de transacciones: csv, ndjson, parquet (un archivo) o
+    partitioned (directorio Parquet particionado por mes). Clientes se
+    escribe siempre en CSV y productos en Excel, como en el set histórico.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {OUTPUT_FORMATS}")
+    rates = dict(DEFAULT_DIRTY_RATES, **(dirty_rates or {}))
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"⚙️ Generando {n_tx:,} transacciones ({fmt}) en: {output_dir}")
+
+    tx_name = "transacciones_raw" if fmt == "partitioned" else f"transacciones_raw.{fmt}"
+    params = dict(n_clientes=n_clientes, n_tx=n_tx, seed=seed, rates=rates, tx_span_days=tx_span_days)
+    with Pool(processes=workers or os.cpu_count()) as pool:
+        _generate_entity(pool, "clientes", n_clientes, os.path.join(output_dir, "clientes_raw.csv"),
+                         "csv", chunk_size, **params)
+        _generate_entity(pool, "transacciones", n_tx, os.path.join(output_dir, tx_name),
+                         fmt, chunk_size, **params)
+
+    pd.DataFrame({
+        "producto_id": ["P01", "P02", "P03", "P04"],
+        "nombre_producto": ["Cuenta Ahorro", "Tarjeta Oro", "Hipoteca", "Inversión 365"],
+        "tipo": ["DEBITO", "CREDITO", "CREDITO", "INVERSION"],
+        "tasa_interes": [0.01, 0.45, 0.12, 0.11]
+    }).to_excel(os.path.join(output_dir, "productos_master.xlsx"), index=False)
+
 if __name__ == "__main__":
-    generate_mock_data()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos financieros")
+    parser.add_argument("--output-dir", default=RAW_DIR)
+    parser.add_argument("--n-clientes", type=int, default=100)
+    parser.add_argument("--n-tx", type=int, default=500)
+    parser.add_argument("--dirty-ratio", type=float, default=None,
+                        help="Proporción de filas sucias por tipo de error (por defecto: una fila)")
+    parser.add_argument("--tx-span-days", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+                        help="Usar el generador por bloques con este formato de transacciones")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.format:
+        rates = {k: args.dirty_ratio for k in DEFAULT_DIRTY_RATES} if args.dirty_ratio is not None else None
+        generate_chunked(
+            output_dir=args.output_dir,
+            n_clientes=args.n_clientes,
+            n_tx=args.n_tx,
+            fmt=args.format,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            seed=args.seed or 0,
+            dirty_rates=rates,
+            tx_span_days=args.tx_span_days or 365,
+        )
+        raise SystemExit(0)
+
+    generate_mock_data(
+        output_dir=args.output_dir,
+        n_clientes=args.n_clientes,
+        n_tx=args.n_tx,
+        dirty_ratio=args.dirty_ratio,
+        tx_span_days=args.tx_span_days,
+        seed=args.seed,
+    )
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+# Base PostgreSQL desechable para las pruebas de carga (se vacía en cada prueba).
+# Nunca apuntarla a la base del .env.
+TEST_DSN_ENV = "ETL_TEST_DATABASE_URL"
+
+TABLES = ("transacciones", "productos_financieros", "clientes", "clientes_historia",
+          "agg_transacciones_diarias", "agg_segmento_histograma", "agg_segmento_cuantiles",
+          "cuarentena_recuperados", "etl_runs", "etl_stage_stats")
+
+
+@pytest.fixture
+def db_loader():
+    """DataLoader sobre ETL_TEST_DATABASE_URL con el esquema creado y las tablas vacías."""
+    url = os.getenv(TEST_DSN_ENV)
+    if not url:
+        pytest.skip(f"{TEST_DSN_ENV} no configurada")
+    from sqlalchemy import text
+    from src.load.loader import DataLoader
+
+    loader = DataLoader(url)
+    assert loader.ensure_schema()
+    with loader.engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {', '.join(TABLES)} CASCADE"))
+    yield loader
+    loader.engine.dispose()
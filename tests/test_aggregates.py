@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.load.aggregates import (CUANTILES, HIST_GROWTH, AggregateManager, histogram_bucket,
+                                 quantiles_from_histogram)
+
+
+def _histogram(montos) -> pd.DataFrame:
+    """Lo que produce el INSERT ... GROUP BY bucket de refresh(), en memoria."""
+    df = pd.DataFrame({"monto": montos, "bucket": histogram_bucket(montos)})
+    return (df.groupby("bucket")["monto"].agg(n="count", minimo="min", maximo="max")
+            .reset_index().sort_values("bucket"))
+
+
+def _merge(*hists) -> pd.DataFrame:
+    """Suma de histogramas de varios días (mismo GROUP BY que _refresh_cuantiles)."""
+    return (pd.concat(hists).groupby("bucket")
+            .agg(n=("n", "sum"), minimo=("minimo", "min"), maximo=("maximo", "max"))
+            .reset_index().sort_values("bucket"))
+
+
+def test_quantiles_within_bucket_error():
+    rng = np.random.default_rng(0)
+    montos = np.round(rng.lognormal(6, 1.5, 50_000), 2)
+    hist = _histogram(montos)
+    approx = quantiles_from_histogram(hist["n"], hist["minimo"], hist["maximo"])
+    exact = np.percentile(montos, [q * 100 for q in CUANTILES])
+    np.testing.assert_allclose(approx, exact, rtol=HIST_GROWTH - 1)
+
+
+def test_daily_histograms_merge_like_the_union():
+    rng = np.random.default_rng(1)
+    dias = [np.round(rng.uniform(1, 10_000, 3_000), 2) for _ in range(5)]
+    merged = _merge(*[_histogram(d) for d in dias])
+    union = _histogram(np.concatenate(dias))
+    assert merged["n"].tolist() == union["n"].tolist()
+    assert merged["minimo"].tolist() == union["minimo"].tolist()
+    assert quantiles_from_histogram(merged["n"], merged["minimo"], merged["maximo"]) == \
+        quantiles_from_histogram(union["n"], union["minimo"], union["maximo"])
+
+
+def test_quantiles_exact_for_single_value_buckets():
+    montos = np.array([10.0, 20.0, 30.0, 40.0, 50.0])
+    hist = _histogram(montos)
+    assert quantiles_from_histogram(hist["n"], hist["minimo"], hist["maximo"]) == \
+        pytest.approx(np.percentile(montos, [25, 50, 75]).tolist())
+
+
+def test_quantiles_interpolate_across_bucket_boundaries():
+    # La mediana cae entre dos buckets: percentile_cont da 500.5, no el máximo del bucket inferior
+    montos = np.array([1.0, 1.0, 1000.0, 1000.0])
+    hist = _histogram(montos)
+    assert quantiles_from_histogram(hist["n"], hist["minimo"], hist["maximo"]) == \
+        pytest.approx(np.percentile(montos, [25, 50, 75]).tolist())
+
+    # Pocos valores muy dispersos: casi todos los rangos caen en una frontera
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        montos = np.round(rng.lognormal(4, 2, rng.integers(2, 12)), 2)
+        hist = _histogram(montos)
+        approx = quantiles_from_histogram(hist["n"], hist["minimo"], hist["maximo"])
+        np.testing.assert_allclose(approx, np.percentile(montos, [25, 50, 75]), rtol=HIST_GROWTH - 1)
+
+
+def test_non_positive_amounts_share_a_bucket():
+    buckets = histogram_bucket([-5.0, 0.0, 1.0])
+    assert buckets[0] == buckets[1] != buckets[2]
+    assert quantiles_from_histogram([], [], []) == [None, None, None]
+
+
+def test_affected_keys_from_pandas_and_arrow():
+    import pyarrow as pa
+
+    df = pd.DataFrame({
+        "fecha_transaccion": pd.to_datetime(["2024-01-02 10:00", "2024-01-01 00:00", None]),
+        "producto_id": ["P02", "P01", "P02"],
+    })
+    expected = AggregateManager.affected_keys(df)
+    assert [d.isoformat() for d in expected[0]] == ["2024-01-01", "2024-01-02"]
+    assert expected[1] == ["P01", "P02"]
+    assert AggregateManager.affected_keys(pa.Table.from_pandas(df)) == expected
+
+
+def _assert_summary_matches_facts(loader):
+    """agg_segmento_cuantiles y el cubo diario frente a la tabla de hechos con el segmento vigente."""
+    from sqlalchemy import text
+
+    with loader.engine.connect() as conn:
+        cube = dict(conn.execute(text(
+            "SELECT segmento, SUM(n_transacciones) FROM agg_transacciones_diarias GROUP BY 1")).all())
+        summary = pd.read_sql(text("SELECT * FROM agg_segmento_cuantiles ORDER BY segmento"), conn)
+        exact = pd.read_sql(text("""
+            SELECT COALESCE(c.segmento, 'SIN_SEGMENTO') AS segmento, COUNT(*) AS n, SUM(t.monto) AS total,
+                   MIN(t.monto) AS minimo, MAX(t.monto) AS maximo,
+                   percentile_cont(0.25) WITHIN GROUP (ORDER BY t.monto) AS q1,
+                   percentile_cont(0.50) WITHIN GROUP (ORDER BY t.monto) AS mediana,
+                   percentile_cont(0.75) WITHIN GROUP (ORDER BY t.monto) AS q3
+            FROM transacciones t JOIN clientes c USING (cliente_id)
+            GROUP BY 1 ORDER BY 1
+        """), conn)
+
+    assert summary["segmento"].tolist() == exact["segmento"].tolist()
+    assert summary["n_transacciones"].tolist() == exact["n"].tolist()
+    assert summary["monto_total"].tolist() == exact["total"].tolist()
+    assert summary["monto_min"].tolist() == exact["minimo"].tolist()
+    assert summary["monto_max"].tolist() == exact["maximo"].tolist()
+    for column in ("q1", "mediana", "q3"):
+        np.testing.assert_allclose(summary[column], exact[column], rtol=HIST_GROWTH - 1)
+    assert cube == dict(zip(exact["segmento"], exact["n"]))
+
+
+def test_incremental_loads_keep_segment_summary_in_sync(db_loader):
+    day = pd.Timestamp("2024-01-01")
+    assert db_loader.load_data(pd.DataFrame({
+        "cliente_id": ["C0001", "C0002"], "nombre": ["Ana", "Luis"], "email": ["ana@mail.com", "luis@mail.com"],
+        "fecha_registro": [day, day], "segmento": ["PREMIUM", None],
+    }), "clientes")
+    assert db_loader.load_data(pd.DataFrame({
+        "producto_id": ["P01"], "nombre_producto": ["Credito"], "tipo": ["CREDITO"],
+    }), "productos_financieros")
+
+    rng = np.random.default_rng(5)
+    n = 2_000
+    tx = pd.DataFrame({
+        "transaccion_id": [f"TX{i:06d}" for i in range(n)],
+        "cliente_id": rng.choice(["C0001", "C0002"], n),
+        "producto_id": "P01",
+        "monto_centavos": pd.array(np.round(rng.lognormal(5, 1, n) * 100).astype(int), dtype="Int64"),
+        "fecha_transaccion": pd.date_range("2024-01-01", periods=n, freq="4h"),
+        "tipo_movimiento": "ENTRADA",
+    })
+    # Dos cargas sobre días distintos: la segunda solo relee sus propios días
+    assert db_loader.load_data(tx.iloc[:1_000], "transacciones")
+    assert db_loader.load_data(tx.iloc[1_000:], "transacciones")
+
+    _assert_summary_matches_facts(db_loader)
+
+
+def test_segment_change_reaggregates_loaded_days(db_loader):
+    day = pd.Timestamp("2024-01-01")
+
+    def clientes(segmento_luis):
+        return pd.DataFrame({
+            "cliente_id": ["C0001", "C0002"], "nombre": ["Ana", "Luis"],
+            "email": ["ana@mail.com", "luis@mail.com"], "fecha_registro": [day, day],
+            "segmento": ["PREMIUM", segmento_luis],
+        })
+
+    assert db_loader.load_data(clientes(None), "clientes")
+    assert db_loader.load_data(pd.DataFrame({
+        "producto_id": ["P01", "P02"], "nombre_producto": ["Credito", "Debito"], "tipo": ["CREDITO", "DEBITO"],
+    }), "productos_financieros")
+    n = 300
+    assert db_loader.load_data(pd.DataFrame({
+        "transaccion_id": [f"TX{i:06d}" for i in range(n)],
+        "cliente_id": ["C0001", "C0002", "C0002"] * (n // 3),
+        "producto_id": ["P01", "P02"] * (n // 2),
+        "monto_centavos": pd.array(np.arange(1, n + 1) * 137, dtype="Int64"),
+        "fecha_transaccion": pd.date_range("2024-01-01", periods=n, freq="7h"),
+        "tipo_movimiento": "ENTRADA",
+    }), "transacciones")
+    _assert_summary_matches_facts(db_loader)
+
+    # Solo cambia la dimensión: los días ya cargados de Luis pasan a su nuevo segmento
+    assert db_loader.load_data(clientes("BASICO"), "clientes")
+    _assert_summary_matches_facts(db_loader)
+
+    from sqlalchemy import text
+    with db_loader.engine.connect() as conn:
+        segmentos = conn.execute(text("SELECT segmento FROM agg_segmento_cuantiles ORDER BY 1")).scalars().all()
+    assert segmentos == ["BASICO", "PREMIUM"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.quality.validator import DataValidator
+from src.transform.transformer import DataTransformer
+
+
+@pytest.fixture
+def dirty_transacciones():
+    return pd.DataFrame({
+        "transaccion_id": ["TX000001", None, " tx000003 ", "TX000004", "TX000005", "TX000006", np.nan],
+        "cliente_id": [" c0001", "C0002", None, "C0004", "C0005", "C0006", "C0007"],
+        "producto_id": ["P01", "p02 ", "P03", None, "P05", "P06", "P07"],
+        "monto": ["abc", 12.5, None, "", "1e3", -3, 10.25],
+        "fecha_transaccion": ["2024-01-05", "not a date", None, "2024-02-30",
+                              "2024-03-01 10:00:00", "2024-03-02", "2024-03-03T01:02:03"],
+        "tipo_movimiento": [" entrada", "SALIDA", None, "salida", "x", "ENTRADA", "entrada"],
+    })
+
+
+@pytest.fixture
+def dirty_clientes():
+    return pd.DataFrame({
+        "cliente_id": ["C0001", " c0002 ", None, "C0001", "X9", "C0006", np.nan],
+        "nombre": ["Ana", "Luis", "Eva", "Ana", None, "", "Sol"],
+        "email": ["ANA@mail.com ", "luis@mail", "eva@mail.com", None, "x@y.io", "sol@mail.com", "no-email"],
+        "fecha_registro": ["2023-01-01", "garbage", None, "2023-02-30", "2023-05-05 12:00:00", "2023-06-06", ""],
+        "segmento": [" premium", "BASICO", None, "premium", "gold", "Basico", "VIP"],
+    })
+
+
+def _run(backend, tmp_path, clean, validate, df):
+    transformer = DataTransformer(backend)
+    validator = DataValidator(backend, error_dir=str(tmp_path / backend))
+    clean_df = getattr(transformer, clean)(df)
+    valid_df = getattr(validator, validate)(clean_df)
+    return clean_df, valid_df, validator.rule_counts
+
+
+@pytest.mark.parametrize("clean,validate,fixture", [
+    ("clean_transacciones", "validate_transacciones", "dirty_transacciones"),
+    ("clean_clientes", "validate_clientes", "dirty_clientes"),
+])
+def test_backends_agree_on_dirty_input(tmp_path, request, clean, validate, fixture):
+    df = request.getfixturevalue(fixture)
+    clean_pd, valid_pd, counts_pd = _run("pandas", tmp_path, clean, validate, df)
+    clean_ar, valid_ar, counts_ar = _run("arrow", tmp_path, clean, validate, df)
+
+    pd.testing.assert_frame_equal(clean_ar, clean_pd)
+    pd.testing.assert_frame_equal(valid_ar.reset_index(drop=True), valid_pd.reset_index(drop=True))
+    assert counts_ar == counts_pd
+
+
+def test_cents_are_int64_and_null_ids_normalise_alike(tmp_path, dirty_transacciones):
+    for backend in ("pandas", "arrow"):
+        out = DataTransformer(backend).clean_transacciones(dirty_transacciones)
+        assert str(out["monto_centavos"].dtype) == "Int64"
+        assert out["monto_centavos"].tolist()[1] == 1250
+        assert out["transaccion_id"].tolist()[1] == "NAN"
+        assert out["cliente_id"].tolist()[2] == "NAN"
@@ -0,0 +1,82 @@
+import inspect
+import os
+
+import pandas as pd
+import pytest
+
+from src.orchestration.checkpoint import CheckpointStore, code_fingerprint, source_files
+from src.transform.transformer import DataTransformer
+
+
+class _Stage:
+    """Clase de etapa de prueba (su huella es la de este archivo)."""
+
+
+def _steps(source, calls, raw):
+    def extract():
+        calls.append("extract")
+        return raw.copy()
+
+    def transform(df):
+        calls.append("transform")
+        return df.assign(monto=pd.to_numeric(df["monto"], errors="coerce"))
+
+    return [("extract", extract, _Stage), ("transform", transform, _Stage)]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text("cliente_id,monto\nC0001,10\n")
+    return str(path)
+
+
+def test_resume_skips_stages_with_valid_checkpoint(tmp_path, source):
+    raw = pd.DataFrame({"cliente_id": ["C0001", "C0002"], "monto": [10.0, 20.5]})
+    calls = []
+    first = CheckpointStore(str(tmp_path / "ckpt")).run_stages("clientes", source, _steps(source, calls, raw))
+    assert calls == ["extract", "transform"]
+
+    calls.clear()
+    store = CheckpointStore(str(tmp_path / "ckpt"), resume=True)
+    resumed = store.run_stages("clientes", source, _steps(source, calls, raw))
+    assert calls == []
+    pd.testing.assert_frame_equal(resumed, first)
+
+
+def test_changed_input_invalidates_checkpoints(tmp_path, source):
+    raw = pd.DataFrame({"cliente_id": ["C0001"], "monto": [10.0]})
+    CheckpointStore(str(tmp_path / "ckpt")).run_stages("clientes", source, _steps(source, [], raw))
+
+    with open(source, "a") as f:
+        f.write("C0002,5\n")
+    calls = []
+    CheckpointStore(str(tmp_path / "ckpt"), resume=True).run_stages("clientes", source, _steps(source, calls, raw))
+    assert calls == ["extract", "transform"]
+
+
+def test_changed_settings_invalidate_checkpoints(tmp_path, source, monkeypatch):
+    raw = pd.DataFrame({"cliente_id": ["C0001"], "monto": [10.0]})
+    monkeypatch.delenv("ETL_PATTERNS", raising=False)
+    CheckpointStore(str(tmp_path / "ckpt")).run_stages("clientes", source, _steps(source, [], raw))
+
+    monkeypatch.setenv("ETL_PATTERNS", '{"email": null}')
+    calls = []
+    CheckpointStore(str(tmp_path / "ckpt"), resume=True).run_stages("clientes", source, _steps(source, calls, raw))
+    assert calls == ["extract", "transform"]
+
+
+def test_mixed_type_column_does_not_abort_run(tmp_path, source):
+    # 'monto' crudo con texto y números: justo lo que el validador debe poner en cuarentena
+    raw = pd.DataFrame({"cliente_id": ["C0001", "C0002", "C0003"], "monto": ["abc", 12.5, 3.0]})
+    result = CheckpointStore(str(tmp_path / "ckpt")).run_stages("clientes", source, _steps(source, [], raw))
+    assert result["monto"].isna().tolist() == [True, False, False]
+    assert result["monto"].iloc[1] == 12.5
+
+
+def test_code_fingerprint_covers_imported_src_modules():
+    files = {os.path.relpath(p, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+             for p in source_files(inspect.getsourcefile(DataTransformer))}
+    assert os.path.join("src", "transform", "arrow_backend.py") in files
+    assert os.path.join("src", "transform", "money.py") in files
+    assert code_fingerprint(DataTransformer) != code_fingerprint(_Stage)
@@ -0,0 +1,81 @@
+import os
+
+from src import cli, run_pipeline
+from src.config import init_db
+from src.orchestration.scheduler import SUCCESS
+
+
+def test_load_creates_schema_before_loading(monkeypatch):
+    calls = []
+    monkeypatch.setattr(init_db, "create_tables", lambda: calls.append("ddl") or True)
+    monkeypatch.setattr(run_pipeline, "run_pipeline", lambda **kwargs: calls.append(("run", kwargs["only"])))
+    assert cli.main(["load", "--entity", "clientes"]) == 0
+    assert calls == ["ddl", ("run", ["clientes"])]
+
+
+def test_load_reloads_truncated_entities_together():
+    full = [run_pipeline.TASK_PREPARE, "productos", "transacciones"]
+    assert cli.load_tasks(["transacciones"]) == full
+    assert cli.load_tasks(["productos"]) == full
+    assert cli.load_tasks(["transacciones", "clientes"]) == [run_pipeline.TASK_PREPARE] + list(run_pipeline.ENTITIES)
+    assert cli.load_tasks(["clientes"]) == ["clientes"]
+    assert cli.PREPARE_TASK == run_pipeline.TASK_PREPARE
+
+
+def test_load_stops_when_schema_cannot_be_created(monkeypatch):
+    calls = []
+    monkeypatch.setattr(init_db, "create_tables", lambda: False)
+    monkeypatch.setattr(run_pipeline, "run_pipeline", lambda **kwargs: calls.append("run"))
+    assert cli.main(["load"]) == 1
+    assert calls == []
+
+
+class _Loader:
+    def __init__(self):
+        self.calls = []
+
+    def ensure_schema(self):
+        self.calls.append("ensure_schema")
+        return True
+
+    def clean_tables(self):
+        self.calls.append("clean_tables")
+        return True
+
+
+class _Checkpoints:
+    def mark_task_done(self, name):
+        pass
+
+
+def test_prepare_task_creates_schema_before_truncating():
+    loader = _Loader()
+    dag = run_pipeline.build_dag(None, None, None, loader, "raw", _Checkpoints(), max_workers=1)
+    status = dag.run(only=[run_pipeline.TASK_PREPARE])
+    assert status[run_pipeline.TASK_PREPARE] == SUCCESS
+    assert loader.calls == ["ensure_schema", "clean_tables"]
+
+
+def test_load_twice_leaves_the_same_rows(db_loader, tmp_path):
+    from sqlalchemy import text
+
+    from src.extract.extractor import DataExtractor
+    from src.orchestration.checkpoint import CheckpointStore
+    from src.quality.validator import DataValidator
+    from src.transform.transformer import DataTransformer
+
+    raw_dir = os.path.join(cli.BASE_DIR, "data", "raw")
+    validator = DataValidator(error_dir=str(tmp_path / "error"))
+    counts = []
+    for tasks in (list(run_pipeline.ENTITIES), ["transacciones"], ["transacciones"], ["clientes"]):
+        checkpoints = CheckpointStore(str(tmp_path / "ckpt"), resume=True)
+        dag = run_pipeline.build_dag(DataExtractor(), DataTransformer(), validator, db_loader, raw_dir,
+                                     checkpoints, max_workers=1)
+        status = dag.run(only=cli.load_tasks(tasks))
+        assert set(status[name] for name in cli.load_tasks(tasks)) == {SUCCESS}
+        with db_loader.engine.connect() as conn:
+            counts.append(tuple(conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                                for table in ("clientes", "productos_financieros", "transacciones")))
+
+    assert counts[0][2] > 0
+    assert counts == [counts[0]] * 4
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reporting.downsampling import downsample_serie, granularidad_para_rango, lttb_indices
+
+
+@pytest.mark.parametrize("n,n_out", [(10_000, 1000), (1001, 1000), (50, 3), (7, 5)])
+def test_lttb_keeps_endpoints_and_length(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n).cumsum()
+    idx = lttb_indices(x, y, n_out)
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_isolated_peak():
+    y = np.zeros(5_000)
+    y[2_345] = 100.0
+    idx = lttb_indices(np.arange(5_000), y, 100)
+    assert 2_345 in idx
+
+
+def test_lttb_returns_everything_when_not_needed():
+    assert lttb_indices([1, 2, 3], [1, 2, 3], 10).tolist() == [0, 1, 2]
+    assert lttb_indices(np.arange(10), np.arange(10), 2).tolist() == list(range(10))
+
+
+def test_downsample_serie_on_dates():
+    fechas = pd.date_range("2000-01-01", periods=3_000, freq="D")
+    df = pd.DataFrame({"fecha": fechas, "monto": np.sin(np.arange(3_000) / 30.0)})
+    out = downsample_serie(df, "fecha", "monto", max_puntos=500)
+    assert len(out) == 500
+    assert out["fecha"].iloc[0] == fechas[0] and out["fecha"].iloc[-1] == fechas[-1]
+    assert len(downsample_serie(df.head(100), "fecha", "monto", max_puntos=500)) == 100
+
+
+def test_granularidad_para_rango():
+    assert granularidad_para_rango("2024-01-01", "2024-12-31") == "day"
+    assert granularidad_para_rango("2020-01-01", "2024-12-31") == "week"
+    assert granularidad_para_rango("2000-01-01", "2024-12-31") == "month"
+    assert granularidad_para_rango("2000-01-01", "2024-12-31", max_puntos=30) == "year"
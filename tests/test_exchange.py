@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.utils.exchange import iter_ipc_batches, open_ipc, write_ipc
+from src.utils.frames import to_arrow
+
+
+def test_to_arrow_casts_mixed_columns_to_text_and_keeps_nulls():
+    df = pd.DataFrame({
+        "transaccion_id": ["TX000001", "TX000002", "TX000003"],
+        "monto": ["abc", 12.5, None],
+        "cantidad": [1, 2, 3],
+    })
+    table = to_arrow(df)
+    assert table.schema.field("monto").type == pa.string()
+    assert table["monto"].to_pylist() == ["abc", "12.5", None]
+    assert table.schema.field("cantidad").type == pa.int64()
+
+
+def test_to_arrow_keeps_typed_frames_untouched():
+    df = pd.DataFrame({"monto_centavos": pd.array([100, None], dtype="Int64"), "x": [1.0, np.nan]})
+    table = to_arrow(df)
+    assert table.schema.field("monto_centavos").type == pa.int64()
+    pd.testing.assert_frame_equal(table.to_pandas(), df)
+
+
+def test_ipc_round_trip_with_mixed_column(tmp_path):
+    df = pd.DataFrame({"cliente_id": ["C0001", None], "monto": [3.5, "n/a"]})
+    path = write_ipc(df, str(tmp_path / "stage.arrow"), batch_rows=1)
+    table = open_ipc(path)
+    assert table.num_rows == 2
+    assert table["monto"].to_pylist() == ["3.5", "n/a"]
+    assert table["cliente_id"].to_pylist() == ["C0001", None]
+    assert sum(batch.num_rows for batch in iter_ipc_batches(path)) == 2
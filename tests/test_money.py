@@ -0,0 +1,72 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.quality.validator import DataValidator
+from src.transform import money
+from src.transform.transformer import DataTransformer
+
+
+def _numeric_cents(text: str) -> int:
+    """Lo que hace PostgreSQL con '1.005'::NUMERIC(15, 2): redondeo half away from zero."""
+    return int(Decimal(text).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+
+
+def _both(values) -> list:
+    """Centavos de ambos motores (deben coincidir), con None para los nulos."""
+    series = pd.Series(values, dtype="float64")
+    pandas_cents = money.cents_from_float(series)
+    pandas_cents = pandas_cents.astype(object).where(pandas_cents.notna(), None).tolist()
+    arrow_cents = money.arrow_cents_from_float(pa.array(series, from_pandas=True)).to_pylist()
+    assert pandas_cents == arrow_cents
+    return pandas_cents
+
+
+@pytest.mark.parametrize("text", ["1.005", "-1.005", "2.675", "0.125", "10.015", "0.005", "-0.005",
+                                  "1234567.895", "99.994", "99.995"])
+def test_half_cents_round_like_postgres_numeric(text):
+    assert _both([float(text)]) == [_numeric_cents(text)]
+
+
+def test_out_of_range_and_non_finite_become_null():
+    limit = money.MAX_CENTS / 100
+    assert _both([1e20, -1e20, np.inf, np.nan, limit, -limit]) == \
+        [None, None, None, None, money.MAX_CENTS, -money.MAX_CENTS]
+
+
+def test_amounts_reconcile_to_the_cent_from_text_to_decimal():
+    rng = np.random.default_rng(3)
+    cents = rng.integers(-10**11, 10**11, 20_000)
+    # Montos crudos como texto con 2 y 3 decimales (estos últimos se redondean)
+    texts = [f"{c // 100}.{c % 100:02d}" if c >= 0 else f"-{-c // 100}.{-c % 100:02d}" for c in cents]
+    texts += [f"{v:.3f}" for v in rng.uniform(-1e6, 1e6, 5_000)]
+    expected = [_numeric_cents(t) for t in texts]
+
+    raw = pd.DataFrame({"monto": texts})
+    for backend in ("pandas", "arrow"):
+        out = DataTransformer(backend).clean_transacciones(raw)
+        assert out["monto_centavos"].tolist() == expected
+        assert money.total_cents(out["monto_centavos"]) == sum(expected)
+
+        decimals = money.encode_money(out)["monto"].tolist()
+        assert decimals == [Decimal(c).scaleb(-2) for c in expected]
+
+
+def test_validator_rejects_unparseable_and_out_of_range_amounts(tmp_path):
+    raw = pd.DataFrame({
+        "transaccion_id": ["TX000001", "TX000002", "TX000003", "TX000004"],
+        "cliente_id": ["C0001"] * 4,
+        "producto_id": ["P01"] * 4,
+        "monto": ["10.50", "abc", 1e20, -4],
+        "fecha_transaccion": ["2024-01-01"] * 4,
+        "tipo_movimiento": ["ENTRADA"] * 4,
+    })
+    for backend in ("pandas", "arrow"):
+        validator = DataValidator(backend, error_dir=str(tmp_path / backend))
+        valid = validator.validate_transacciones(DataTransformer(backend).clean_transacciones(raw))
+        assert valid["transaccion_id"].tolist() == ["TX000001"]
+        assert validator.rule_counts["transacciones"]["monto_nulo"] == 2
+        assert validator.rule_counts["transacciones"]["monto_no_positivo"] == 1
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import text
+
+
+def _seed_dimensions(loader):
+    assert loader.load_data(pd.DataFrame({
+        "cliente_id": ["C0001"], "nombre": ["Ana"], "email": ["ana@mail.com"],
+        "fecha_registro": [pd.Timestamp("2024-01-01")], "segmento": ["PREMIUM"],
+    }), "clientes")
+    assert loader.load_data(pd.DataFrame({
+        "producto_id": ["P01"], "nombre_producto": ["Credito"], "tipo": ["CREDITO"],
+    }), "productos_financieros")
+
+
+def _tx(ids, fechas):
+    return pd.DataFrame({
+        "transaccion_id": ids,
+        "cliente_id": "C0001",
+        "producto_id": "P01",
+        "monto_centavos": pd.array([100] * len(ids), dtype="Int64"),
+        "fecha_transaccion": pd.to_datetime(fechas),
+        "tipo_movimiento": "ENTRADA",
+    })
+
+
+def test_archived_month_is_not_loaded_through_its_detached_table(db_loader):
+    _seed_dimensions(db_loader)
+    assert db_loader.load_data(_tx(["TX000001", "TX000002"], ["2020-01-15", "2020-02-15"]), "transacciones")
+
+    archived = db_loader.partitions.detach_partitions_before(date(2020, 2, 1))
+    assert archived == ["transacciones_y2020m01"]
+    try:
+        # Recargar el mes archivado falla en vez de escribir en la tabla desacoplada
+        assert not db_loader.load_data(_tx(["TX000003"], ["2020-01-20"]), "transacciones")
+        # Un caché de particiones desactualizado tampoco deja escribir fuera del padre
+        db_loader.partitions._known.add("transacciones_y2020m01")
+        assert not db_loader.load_data(_tx(["TX000004"], ["2020-01-21"]), "transacciones")
+
+        with db_loader.engine.connect() as conn:
+            in_parent = conn.execute(text("SELECT transaccion_id FROM transacciones ORDER BY 1")).scalars().all()
+            in_archive = conn.execute(text("SELECT COUNT(*) FROM transacciones_y2020m01")).scalar()
+        assert in_parent == ["TX000002"]
+        assert in_archive == 1
+
+        # Los meses adjuntos siguen cargando con normalidad
+        assert db_loader.load_data(_tx(["TX000005"], ["2020-02-20"]), "transacciones")
+    finally:
+        with db_loader.engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS transacciones_y2020m01"))
@@ -0,0 +1,79 @@
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.quality.patterns import PatternValidator
+
+
+def test_default_patterns():
+    validator = PatternValidator()
+    emails = pd.Series(["ana@mail.com", "Ana.Perez+x@Sub.Mail.MX", "sin-arroba", "a@b", None])
+    assert validator.invalid_series("email", emails).tolist() == [False, False, True, True, False]
+    assert validator.invalid_series("email", emails, null_fails=True).tolist()[-1] is True
+
+    ids = pd.Series(["C0001", "C12", "c0001", "C00012"])
+    assert validator.invalid_series("cliente_id", ids).tolist() == [False, True, True, False]
+    assert validator.matches("transaccion_id", pa.array(["TX000001", "TX1", None])).to_pylist() == [True, False, None]
+
+
+def test_env_overrides_and_disables_patterns(monkeypatch):
+    monkeypatch.setenv("ETL_PATTERNS", '{"cliente_id": "^CLI-\\\\d+$", "email": null}')
+    validator = PatternValidator.from_env()
+    assert not validator.has("email")
+    assert validator.invalid_series("cliente_id", pd.Series(["CLI-7", "C0001"])).tolist() == [False, True]
+    assert validator.has("producto_id")
+
+
+def test_invalid_pattern_fails_at_init():
+    with pytest.raises(pa.ArrowInvalid):
+        PatternValidator({"cliente_id": "^C(\\d+$"})
+
+
+def test_cache_is_bounded_and_evicts_oldest():
+    validator = PatternValidator(cache_size=5)
+    validator.matches("producto_id", pa.array(["P01", "P02", "X03"]))
+    validator.matches("producto_id", pa.array(["P02", "P04", "P05", "X06"]))
+    values, results = validator._cache["producto_id"]
+    # Se descartó "P01", el más antiguo; los resultados siguen alineados
+    assert values.to_pylist() == ["P02", "X03", "P04", "P05", "X06"]
+    assert results.to_pylist() == [True, False, True, True, False]
+
+    # Un lote que ya no está entero en caché sigue dando el resultado correcto
+    assert validator.matches("producto_id", pa.array(["P01", "X03", "P07"])).to_pylist() == [True, False, True]
+    assert len(validator._cache["producto_id"][0]) == 5
+
+
+def test_batch_larger_than_cache_skips_it():
+    validator = PatternValidator(cache_size=3)
+    validator.matches("cliente_id", pa.array(["C0001"]))
+    batch = pa.array(["C0001", "C0002", "X", "C0004", "C5"])
+    assert validator.matches("cliente_id", batch).to_pylist() == [True, True, False, True, False]
+    assert validator._cache["cliente_id"][0].to_pylist() == ["C0001"]
+
+
+def test_concurrent_batches_keep_cache_consistent():
+    validator = PatternValidator(cache_size=500)
+    errors = []
+
+    def worker(offset):
+        try:
+            for start in range(0, 2000, 100):
+                ids = [f"C{n:04d}" if n % 3 else f"X{n}" for n in range(start + offset, start + offset + 150)]
+                got = validator.matches("cliente_id", pa.array(ids)).to_pylist()
+                assert got == [value.startswith("C") for value in ids]
+        except AssertionError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in (0, 37, 71, 113)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    values, results = validator._cache["cliente_id"]
+    assert len(values) == len(results) <= 500
+    assert len(set(values.to_pylist())) == len(values)
+    assert results.to_pylist() == [value.startswith("C") for value in values.to_pylist()]
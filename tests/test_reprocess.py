@@ -0,0 +1,131 @@
+import glob
+import os
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from sqlalchemy import text
+
+from src import cli
+from src.quality.reprocess import QuarantineReprocessor
+from src.quality.validator import DataValidator
+from src.transform.raw import RAW_PREFIX
+from src.transform.transformer import DataTransformer
+from src.utils.exchange import open_ipc
+
+
+def test_cli_rejects_entities_without_quarantine(capsys):
+    with pytest.raises(SystemExit) as exc:
+        cli.build_parser().parse_args(["reprocess", "--entity", "productos"])
+    assert exc.value.code == 2
+    assert "productos" in capsys.readouterr().err
+    assert cli.build_parser().parse_args(["reprocess", "--entity", "all"]).entity == ["clientes", "transacciones"]
+
+
+def test_run_rejects_entities_without_quarantine(tmp_path):
+    with pytest.raises(ValueError, match="productos"):
+        QuarantineReprocessor(loader=None, error_dir=str(tmp_path)).run(["productos"])
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_quarantine_keeps_the_raw_row(tmp_path, backend):
+    raw = pd.DataFrame({
+        "transaccion_id": ["TX000001", " tx000002 ", None],
+        "cliente_id": ["C0001", "C0001", "C0002"],
+        "producto_id": ["P01", "P01", "P01"],
+        "monto": ["10.50", "12,50", "7"],
+        "fecha_transaccion": ["2024-01-05", "2024-01-06", "2024/01/07"],
+        "tipo_movimiento": ["ENTRADA", " salida", "ENTRADA"],
+    })
+    validator = DataValidator(backend, error_dir=str(tmp_path))
+    approved = validator.validate_transacciones(DataTransformer(backend).clean_transacciones(raw))
+    assert approved["transaccion_id"].tolist() == ["TX000001"]
+    assert not [c for c in approved.columns if c.startswith(RAW_PREFIX)]
+
+    [path] = glob.glob(os.path.join(tmp_path, "cuarentena", "transacciones", "*.arrow"))
+    rejected = open_ipc(path)
+    assert rejected.column_names == list(raw.columns) + ["error_reason"]
+    # Lo que llegó, no lo convertido: monto en texto, ID nulo (no 'NAN'), fecha sin parsear
+    assert rejected["monto"].to_pylist() == ["12,50", "7"]
+    assert rejected["transaccion_id"].to_pylist() == [" tx000002 ", None]
+    assert rejected["fecha_transaccion"].to_pylist() == ["2024-01-06", "2024/01/07"]
+
+    # El filtro por fecha del reproceso parsea la fecha cruda como la limpieza
+    reprocessor = QuarantineReprocessor(loader=None, error_dir=str(tmp_path))
+    chunk = pa.concat_tables(reprocessor.chunks("transacciones", desde="2024-01-06", hasta="2024-01-06"))
+    assert chunk["transaccion_id"].to_pylist() == [" tx000002 "]
+
+
+def test_recovered_marks_are_cleared_by_a_full_reload(db_loader, tmp_path):
+    day = pd.Timestamp("2024-01-01")
+    raw = pd.DataFrame({
+        "transaccion_id": ["TX000001"], "cliente_id": ["C0001"], "producto_id": ["P01"],
+        "monto": [10.5], "fecha_transaccion": ["2024-01-05"], "tipo_movimiento": ["ENTRADA"],
+    })
+    # Llega antes que su cliente: queda huérfana en la cuarentena
+    DataValidator(error_dir=str(tmp_path)).filter_referential(
+        DataTransformer().clean_transacciones(raw), {"cliente_id": [], "producto_id": []},
+        quarantine_file="transacciones_huerfanas.csv")
+
+    assert db_loader.load_data(pd.DataFrame({
+        "cliente_id": ["C0001"], "nombre": ["Ana"], "email": ["ana@mail.com"],
+        "fecha_registro": [day], "segmento": ["PREMIUM"],
+    }), "clientes")
+    assert db_loader.load_data(pd.DataFrame({
+        "producto_id": ["P01"], "nombre_producto": ["Credito"], "tipo": ["CREDITO"],
+    }), "productos_financieros")
+
+    report = QuarantineReprocessor(db_loader, error_dir=str(tmp_path)).run(["transacciones"])
+    assert report["transacciones"]["recuperadas"] == 1
+    with db_loader.engine.connect() as conn:
+        assert conn.execute(text("SELECT monto FROM transacciones")).scalar() == Decimal("10.50")
+    report = QuarantineReprocessor(db_loader, error_dir=str(tmp_path)).run(["transacciones"])
+    assert report["transacciones"]["ya_recuperadas"] == 1
+
+    with db_loader.engine.begin() as conn:
+        conn.execute(text("INSERT INTO cuarentena_recuperados (entidad, llave) VALUES ('clientes', 'C0009')"))
+    assert db_loader.clean_tables()
+    with db_loader.engine.connect() as conn:
+        marks = conn.execute(text("SELECT entidad, llave FROM cuarentena_recuperados")).all()
+    assert marks == [("clientes", "C0009")]
+
+
+def test_reprocess_skips_quarantine_older_than_the_last_full_reload(db_loader, tmp_path):
+    from datetime import datetime, timedelta
+
+    from src.monitoring.run_registry import RUN_SUCCESS, RunRegistry
+
+    def orphan(tx_id, monto):
+        raw = pd.DataFrame({
+            "transaccion_id": [tx_id], "cliente_id": ["C0001"], "producto_id": ["P01"],
+            "monto": [monto], "fecha_transaccion": ["2024-01-05"], "tipo_movimiento": ["ENTRADA"],
+        })
+        DataValidator(error_dir=str(tmp_path)).filter_referential(
+            DataTransformer().clean_transacciones(raw), {"cliente_id": [], "producto_id": []},
+            quarantine_file="transacciones_huerfanas.csv")
+
+    # Huérfana de un extracto anterior a la recarga completa (archivo fechado ayer)
+    orphan("TX000001", 10.5)
+    [old] = glob.glob(os.path.join(tmp_path, "cuarentena", "transacciones", "*.arrow"))
+    stamp = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d_%H%M%S")
+    os.rename(old, os.path.join(os.path.dirname(old), stamp + os.path.basename(old)[15:]))
+
+    reload_start = datetime.now() - timedelta(hours=1)
+    RunRegistry(db_loader.engine).record("recarga", reload_start, datetime.now(), RUN_SUCCESS, full_reload=True)
+    orphan("TX000002", 20.0)
+
+    assert db_loader.load_data(pd.DataFrame({
+        "cliente_id": ["C0001"], "nombre": ["Ana"], "email": ["ana@mail.com"],
+        "fecha_registro": [pd.Timestamp("2024-01-01")], "segmento": ["PREMIUM"],
+    }), "clientes")
+    assert db_loader.load_data(pd.DataFrame({
+        "producto_id": ["P01"], "nombre_producto": ["Credito"], "tipo": ["CREDITO"],
+    }), "productos_financieros")
+
+    reprocessor = QuarantineReprocessor(db_loader, error_dir=str(tmp_path))
+    assert len(reprocessor.files("transacciones")) == 2
+    report = reprocessor.run(["transacciones"])
+    assert report["transacciones"]["leidas"] == 1
+    with db_loader.engine.connect() as conn:
+        assert conn.execute(text("SELECT transaccion_id FROM transacciones")).scalars().all() == ["TX000002"]
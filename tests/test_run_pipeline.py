@@ -0,0 +1,34 @@
+import os
+
+from src.run_pipeline import _find_source
+
+
+def _touch(path, mtime):
+    with open(path, "w") as f:
+        f.write("x")
+    os.utime(path, (mtime, mtime))
+
+
+def test_find_source_prefers_newest_candidate(tmp_path):
+    _touch(tmp_path / "transacciones_raw.json", 1_000)
+    _touch(tmp_path / "transacciones_raw.csv", 2_000)
+    found = _find_source(str(tmp_path), "transacciones_raw", "transacciones_raw.json")
+    assert found == str(tmp_path / "transacciones_raw.csv")
+
+
+def test_find_source_uses_newest_file_inside_partitioned_directory(tmp_path):
+    _touch(tmp_path / "transacciones_raw.csv", 2_000)
+    part = tmp_path / "transacciones_raw" / "mes=2024-01"
+    part.mkdir(parents=True)
+    _touch(part / "part-0.parquet", 3_000)
+    os.utime(tmp_path / "transacciones_raw", (1_000, 1_000))
+    found = _find_source(str(tmp_path), "transacciones_raw", "transacciones_raw.json")
+    assert found == str(tmp_path / "transacciones_raw")
+
+
+def test_find_source_override_and_default(tmp_path):
+    _touch(tmp_path / "transacciones_raw.csv", 2_000)
+    assert _find_source(str(tmp_path), "transacciones_raw", "x.json", override="otro.ndjson") == \
+        str(tmp_path / "otro.ndjson")
+    assert _find_source(str(tmp_path / "vacio"), "transacciones_raw", "transacciones_raw.json") == \
+        str(tmp_path / "vacio" / "transacciones_raw.json")
@@ -0,0 +1,59 @@
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import text
+
+from src.load.loader import SCD2_DIMENSIONS
+
+
+def _clientes(rows):
+    return pd.DataFrame(rows, columns=["cliente_id", "nombre", "email", "fecha_registro", "segmento"])
+
+
+def test_row_hash_is_stable_and_detects_changes():
+    dim = SCD2_DIMENSIONS["clientes"]
+    df = _clientes([("C0001", "Ana", "ana@mail.com", "2024-01-01", "PREMIUM"),
+                    ("C0002", "Luis", None, "2024-01-01", "BASICO")])
+    first = dim.row_hash(pa.Table.from_pandas(df)).to_pylist()
+    assert first == dim.row_hash(pa.Table.from_pandas(df.copy())).to_pylist()
+
+    changed = df.copy()
+    changed.loc[1, "segmento"] = "PREMIUM"
+    again = dim.row_hash(pa.Table.from_pandas(changed)).to_pylist()
+    assert again[0] == first[0] and again[1] != first[1]
+
+    # Nulo y cadena vacía no colisionan
+    blank = df.copy()
+    blank.loc[1, "email"] = ""
+    assert dim.row_hash(pa.Table.from_pandas(blank)).to_pylist()[1] != first[1]
+
+
+def test_sync_opens_and_closes_versions(db_loader):
+    day = pd.Timestamp("2024-01-01")
+    assert db_loader.load_data(_clientes([
+        ("C0001", "Ana", "ana@mail.com", day, "PREMIUM"),
+        ("C0002", "Luis", "luis@mail.com", day, "BASICO"),
+    ]), "clientes")
+    assert db_loader.dimension_changes["clientes"] == {"nuevo": 2, "cambio": 0, "sin_cambio": 0}
+
+    assert db_loader.load_data(_clientes([
+        ("C0001", "Ana", "ana@mail.com", day, "PREMIUM"),
+        ("C0002", "Luis", "luis@mail.com", day, "PREMIUM"),
+        ("C0003", "Eva", "eva@mail.com", day, "BASICO"),
+    ]), "clientes")
+    assert db_loader.dimension_changes["clientes"] == {"nuevo": 1, "cambio": 1, "sin_cambio": 1}
+
+    with db_loader.engine.connect() as conn:
+        history = pd.read_sql(text("""
+            SELECT cliente_id, segmento, valido_desde, valido_hasta, es_actual
+            FROM clientes_historia ORDER BY cliente_id, valido_desde
+        """), conn)
+        current = dict(conn.execute(text("SELECT cliente_id, segmento FROM clientes")).all())
+
+    assert history.groupby("cliente_id").size().to_dict() == {"C0001": 1, "C0002": 2, "C0003": 1}
+    luis = history[history["cliente_id"] == "C0002"].reset_index(drop=True)
+    assert luis["segmento"].tolist() == ["BASICO", "PREMIUM"]
+    assert luis["es_actual"].tolist() == [False, True]
+    assert luis.loc[0, "valido_hasta"] == luis.loc[1, "valido_desde"]
+    assert pd.isna(luis.loc[1, "valido_hasta"])
+    assert history.loc[history["cliente_id"] != "C0002", "es_actual"].all()
+    assert current == {"C0001": "PREMIUM", "C0002": "PREMIUM", "C0003": "BASICO"}
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.orchestration.sharding import ShardedProcessor
+from src.quality.validator import DataValidator
+from src.transform.transformer import DataTransformer
+
+
+@pytest.fixture
+def transacciones():
+    rng = np.random.default_rng(7)
+    n = 600
+    monto = rng.uniform(-50, 5_000, n).round(2).astype(object)
+    monto[::37] = "n/a"
+    clientes = np.array([f"C{i:04d}" for i in rng.integers(1, 80, n)], dtype=object)
+    clientes[::29] = np.char.lower(clientes[::29].astype(str))
+    clientes[::53] = None
+    fechas = pd.date_range("2024-01-01", periods=n, freq="6h").strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+    fechas[::41] = "sin fecha"
+    return pd.DataFrame({
+        "transaccion_id": [f"TX{i:06d}" for i in range(n)],
+        "cliente_id": clientes,
+        "producto_id": [f"P{i:02d}" for i in rng.integers(1, 6, n)],
+        "monto": monto,
+        "fecha_transaccion": fechas,
+        "tipo_movimiento": rng.choice(["ENTRADA", "SALIDA"], n),
+    })
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_sharded_matches_unsharded(tmp_path, transacciones, backend):
+    validator = DataValidator(backend, error_dir=str(tmp_path / "single"))
+    expected = validator.validate_transacciones(DataTransformer(backend).clean_transacciones(transacciones))
+
+    sharder = ShardedProcessor(n_shards=4, workers=2, backend=backend,
+                               work_dir=str(tmp_path), error_dir=str(tmp_path / "sharded"))
+    result = sharder.process_transacciones(transacciones)
+
+    def ordered(df):
+        return df.sort_values("transaccion_id").reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(ordered(result), ordered(expected))
+    assert sharder.rule_counts == validator.rule_counts
+    rejected = pd.read_csv(tmp_path / "sharded" / "transacciones_rejected.csv")
+    assert len(rejected) == len(transacciones) - len(expected)
+
+
+def test_same_cliente_lands_in_one_shard():
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(pd.DataFrame({"cliente_id": [" c0001", "C0001", "C0001 ", "C0002"]}))
+    ids = ShardedProcessor(n_shards=8).shard_ids(table).to_pylist()
+    assert ids[0] == ids[1] == ids[2]